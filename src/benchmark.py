@@ -0,0 +1,481 @@
+#!/usr/bin/python3 python3.11
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+import gurobipy as gp
+
+from cross_docking_model import (
+    instance as Instance,
+    CrossDockingSolver as Model
+)
+from cross_docking_model.cache import ModelCache
+from cross_docking_model.estimate import (
+    build_estimate,
+    eliminated
+)
+
+
+# Version of the layout of the results file
+RESULTS_VERSION: int = 1
+
+
+def main(args):
+    if args.results is not None:
+        with open(args.results, 'r') as file:
+            results = json.load(file)
+    else:
+        results = run_benchmark(args)
+
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+        print(f'Results written to {args.output}')
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+
+        regressions = compare(baseline, results, args.tolerance, args.min_delta)
+        print_regressions(regressions)
+
+        if regressions:
+            sys.exit(1)
+
+
+def find_instances(directories: List[str], limit: Optional[int]) -> List[Tuple[str, str]]:
+    """
+    Lists the instance files of each directory, recursively and in name order.
+
+    Args:
+        directories (List[str]): The directories to search.
+        limit (Optional[int]): The max number of instances taken from each directory.
+
+    Returns:
+        List[Tuple[str, str]]: The path of each instance and its name relative to the parent of its directory,
+        which identifies it across runs.
+    """
+    instances = []
+
+    for directory in directories:
+        parent = os.path.dirname(os.path.abspath(directory))
+        files = sorted(glob.glob(os.path.join(directory, '**', '*.txt'), recursive=True))
+
+        instances.extend((path, os.path.relpath(os.path.abspath(path), parent)) for path in files[:limit])
+
+    return instances
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Parses, builds and solves every instance of the benchmark.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        Dict[str, Any]: The environment, the options and the result of every instance.
+    """
+    options = {
+        'mode': args.mode,
+        'builder': args.builder,
+        'backend': args.backend,
+        'sparse_rho': args.sparse_rho,
+        'lazy': args.lazy,
+        'tight_big_m': not args.loose_big_m,
+        'eliminate_pairs': args.eliminate_pairs,
+        'aggregate_flows': args.aggregate_flows,
+        'decomposition': args.decomposition,
+        'model_cache': args.model_cache is not None,
+        'time_limit': args.time_limit,
+        'time_unit': args.time_unit,
+        'threads': args.threads,
+        'max_variables': args.max_variables,
+        'max_constraints': args.max_constraints,
+        'max_memory': args.max_memory
+    }
+    results = []
+
+    for path, name in find_instances(args.directories, args.limit):
+        result = run_instance(args, path, name)
+        results.append(result)
+
+        summary = result.get('error') or result.get('skipped') or f"solve {result.get('solve', 0.0):.3f}s"
+        if 'eliminated' in result:
+            rows = sum(result['eliminated'][family] for family in ['18', '19', 'volume_of_flows'])
+            summary += f", eliminated {rows} rows"
+        print(f"{result['instance']}: parse {result.get('parse', 0.0):.4f}s, {summary}")
+
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'gurobi': '.'.join(str(number) for number in gp.gurobi.version()),
+            'machine': platform.machine(),
+            'processor': platform.processor()
+        },
+        'options': options,
+        'results': results
+    }
+
+
+def run_instance(args: argparse.Namespace, path: str, name: str) -> Dict[str, Any]:
+    """
+    Times the parsing, the construction and the solves of one instance. The model is only built when it fits in
+    the size limits, so a size-limited license can run the benchmark.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+        path (str): The path of the instance.
+        name (str): The name of the instance in the results.
+
+    Returns:
+        Dict[str, Any]: The timings, in seconds, and the size and outcome of the solve.
+    """
+    result: Dict[str, Any] = {'instance': name}
+
+    start = time.perf_counter()
+    try:
+        data = Instance.read_data(path)
+    except ValueError as e:
+        result['error'] = f'parse: {e}'
+        return result
+    result['parse'] = time.perf_counter() - start
+
+    size = build_estimate(
+        data, args.builder, args.sparse_rho, args.lazy, args.eliminate_pairs, args.aggregate_flows, not args.loose_big_m
+    )
+    result.update(size)
+
+    if args.eliminate_pairs:
+        result['eliminated'] = eliminated(data, args.sparse_rho, args.lazy, args.aggregate_flows)
+
+    if size['variables'] > args.max_variables or size['constraints'] > args.max_constraints:
+        result['skipped'] = 'size'
+        return result
+
+    if size['memory'] > args.max_memory:
+        result['skipped'] = 'memory'
+        return result
+
+    fd, log_file = tempfile.mkstemp(prefix='grbtune-', suffix='.log')
+    os.close(fd)
+
+    model_cache = None
+    if args.model_cache is not None:
+        model_cache = ModelCache(args.model_cache, max_bytes=args.model_cache_size)
+
+    model = None
+    try:
+        model = Model.CrossDockingSolver(
+            data,
+            args.mode,
+            args.time_limit,
+            args.time_unit,
+            builder=args.builder,
+            backend=args.backend,
+            sparse_rho=args.sparse_rho,
+            lazy=args.lazy,
+            tight_big_m=not args.loose_big_m,
+            eliminate_pairs=args.eliminate_pairs,
+            aggregate_flows=args.aggregate_flows,
+            decomposition=args.decomposition,
+            model_cache=model_cache,
+            log_file=log_file,
+            threads=args.threads
+        )
+        result['build'] = model.build_time
+        result['families'] = {name: profile['time'] for name, profile in model.build_profile.items()}
+        result['reference'] = model.reference_time
+
+        model.solve()
+        result['solve'] = model.results.Runtime
+        result['status'] = model.results.Status
+        result['objective'] = model.results.ObjVal if model.results.SolCount > 0 else None
+
+        if args.decomposition:
+            result['solve'] = model.decomposition_stats['time']
+            result['status'] = model.decomposition_stats['status']
+            result['bound'] = model.decomposition_stats['lower']
+    except gp.GurobiError as e:
+        result['error'] = f'solver: {e}'
+    finally:
+        if model is not None:
+            model.clear()
+
+        try:
+            os.remove(log_file)
+        except OSError:
+            pass
+
+    return result
+
+
+def metrics(result: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Flattens the timings of one instance.
+
+    Args:
+        result (Dict[str, Any]): The result of the instance.
+
+    Returns:
+        Dict[str, float]: Every timing of the instance, with the variables and constraint families of the build as
+        'family:<name>'.
+    """
+    values = {
+        name: result[name]
+        for name in ['parse', 'build', 'reference', 'solve']
+        if result.get(name) is not None
+    }
+
+    for name, value in result.get('families', {}).items():
+        values[f'family:{name}'] = value
+
+    return values
+
+
+def compare(
+        baseline: Dict[str, Any],
+        current: Dict[str, Any],
+        tolerance: float,
+        min_delta: float
+    ) -> List[Dict[str, Any]]:
+    """
+    Finds the timings that got slower than the baseline.
+
+    Args:
+        baseline (Dict[str, Any]): The stored results to compare against.
+        current (Dict[str, Any]): The new results.
+        tolerance (float): The relative slowdown allowed before a timing is a regression.
+        min_delta (float): The absolute slowdown in seconds below which a timing is never a regression, so noise
+            on very short timings is ignored.
+
+    Returns:
+        List[Dict[str, Any]]: The instance, metric, baseline and current timing of every regression.
+    """
+    if baseline.get('options') != current.get('options'):
+        print('Warning: the baseline was run with different options', file=sys.stderr)
+
+    previous = {result['instance']: metrics(result) for result in baseline['results']}
+    regressions = []
+
+    for result in current['results']:
+        old = previous.get(result['instance'], {})
+
+        for name, value in metrics(result).items():
+            if name not in old:
+                continue
+
+            if value > old[name] * (1 + tolerance) and value - old[name] > min_delta:
+                regressions.append({
+                    'instance': result['instance'],
+                    'metric': name,
+                    'baseline': old[name],
+                    'current': value
+                })
+
+    return regressions
+
+
+def print_regressions(regressions: List[Dict[str, Any]]) -> None:
+    if not regressions:
+        print('No regressions against the baseline')
+        return
+
+    width = max(len(regression['instance']) for regression in regressions)
+
+    print(f'{len(regressions)} regression(s) against the baseline:')
+    for regression in regressions:
+        ratio = regression['current'] / regression['baseline'] if regression['baseline'] > 0 else float('inf')
+        print(
+            f"{regression['instance']:<{width}}  {regression['metric']:<28}"
+            f"{regression['baseline']:>10.4f}s -> {regression['current']:>10.4f}s  (x{ratio:.2f})"
+        )
+
+
+def get_cli_args():
+    generation = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'generation')
+
+    parser = argparse.ArgumentParser(
+        prog='Cross Docking Benchmark',
+        description='Time the parsing, construction and solves of the cross-docking model over the instances'
+    )
+
+    parser.add_argument(
+        '-t',
+        '--time-limit',
+        default=60.0,
+        type=float,
+        help='Max amount of time each solve can run in seconds'
+    )
+    parser.add_argument(
+        '-u',
+        '--time-unit',
+        default=1,
+        type=int,
+        help='Time unit value'
+    )
+    parser.add_argument(
+        '-m',
+        '--mode',
+        choices=['single', 'multi', 'wsm', 'r-e'],
+        default='wsm',
+        type=str,
+        help='Solution method benchmarked, only \'wsm\' and \'r-e\' have a reference solve'
+    )
+    parser.add_argument(
+        '-b',
+        '--builder',
+        choices=['quicksum', 'matrix'],
+        default='quicksum',
+        type=str,
+        help='Select how the model is built: expression by expression or from sparse coefficient matrices'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['gurobi', 'highs'],
+        default='gurobi',
+        type=str,
+        help='Select the solver of the built model: Gurobi, or HiGHS in the single, wsm, r-e and pareto modes'
+    )
+    parser.add_argument(
+        '--sparse-rho',
+        action='store_true',
+        help='Only create flow variables for the product, supplier and customer combinations that can carry flow'
+    )
+    parser.add_argument(
+        '--lazy',
+        choices=['19', '6', 'sort_inbound_loads'],
+        default=[],
+        nargs='+',
+        type=str,
+        help='Constraint families left out of the model and added as lazy constraints when a solution violates them'
+    )
+    parser.add_argument(
+        '--aggregate-flows',
+        action='store_true',
+        help='Split the flow variables into product flows and volume flows between docks, which is exact because '
+             'the transfer time is the volume of a product times a time of the pair of docks'
+    )
+    parser.add_argument(
+        '--eliminate-pairs',
+        action='store_true',
+        help='Fix to zero the arcs and vehicle assignments of customers whose pallets do not fit in one vehicle'
+    )
+    parser.add_argument(
+        '--loose-big-m',
+        action='store_true',
+        help='Use M = 1000 in every disjunctive constraint instead of the constants derived from the instance'
+    )
+    parser.add_argument(
+        '--decomposition',
+        action='store_true',
+        help='Solve by Benders decomposition between the routing and the dock scheduling'
+    )
+    parser.add_argument(
+        '--model-cache',
+        default=None,
+        type=str,
+        help='Directory where the built models are cached, so the build time of later runs is the time to read them'
+    )
+    parser.add_argument(
+        '--model-cache-size',
+        default=1 << 32,
+        type=int,
+        help='Max size of the model cache in bytes, the least recently used entries are evicted first'
+    )
+    parser.add_argument(
+        '--threads',
+        default=0,
+        type=int,
+        help='Number of threads of each solve, 0 lets Gurobi decide'
+    )
+    parser.add_argument(
+        '--max-variables',
+        default=sys.maxsize,
+        type=int,
+        help='Skip the build and solves of instances with more variables, e.g. 2000 for a size-limited license'
+    )
+    parser.add_argument(
+        '--max-constraints',
+        default=sys.maxsize,
+        type=int,
+        help='Skip the build and solves of instances with more constraints, e.g. 2000 for a size-limited license'
+    )
+    parser.add_argument(
+        '--max-memory',
+        default=float('inf'),
+        type=float,
+        help='Skip the build and solves of instances whose estimated peak build memory in bytes is larger'
+    )
+    parser.add_argument(
+        '-l',
+        '--limit',
+        default=None,
+        type=int,
+        help='Max number of instances taken from each directory'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        default='benchmark.json',
+        type=str,
+        help='File where the results are written'
+    )
+    parser.add_argument(
+        '--results',
+        default=None,
+        type=str,
+        help='Compare a stored results file against the baseline instead of running the benchmark'
+    )
+    parser.add_argument(
+        '--baseline',
+        default=None,
+        type=str,
+        help='Stored results to compare against, the exit code is 1 when a timing regressed'
+    )
+    parser.add_argument(
+        '--tolerance',
+        default=0.2,
+        type=float,
+        help='Relative slowdown allowed before a timing is reported as a regression'
+    )
+    parser.add_argument(
+        '--min-delta',
+        default=0.05,
+        type=float,
+        help='Absolute slowdown in seconds below which a timing is never reported as a regression'
+    )
+    parser.add_argument(
+        'directories',
+        nargs='*',
+        default=[
+            os.path.join(generation, family)
+            for family in ['15clientes', '25clientes', '50clientes', 'solomon_50']
+        ],
+        type=str,
+        help='Directories searched recursively for instances'
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_cli_args()
+    main(args)
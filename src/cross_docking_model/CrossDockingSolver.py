@@ -1,8 +1,18 @@
+import time
+import tracemalloc
+
 import gurobipy as gp
+import numpy as np
+import numpy.typing as npt
+import scipy.sparse as sp
 
 from typing import (
+    Any,
+    Iterator,
     List,
-    Dict
+    Dict,
+    Optional,
+    Tuple
 )
 from cross_docking_model.__conversions import (
     create_label,
@@ -10,12 +20,80 @@ from cross_docking_model.__conversions import (
     create_dict_from_2d_matrix,
     create_dict_from_3d_matrix
 )
+from cross_docking_model.__matrix import (
+    ColumnLayout,
+    ConstraintBlock,
+    match_keys
+)
+from cross_docking_model.alns import AdaptiveLargeNeighbourhoodSearch
+from cross_docking_model.cache import (
+    ModelCache,
+    ReferenceCache
+)
+from cross_docking_model.heuristic import construct_solution
+from cross_docking_model.pareto import ParetoArchive
+from cross_docking_model.preprocessing import (
+    admissible_flows,
+    big_m_values,
+    compatible_pairs,
+    transfer_factors
+)
+from cross_docking_model.estimate import (
+    build_estimate,
+    eliminated,
+    lighter_formulation
+)
+from cross_docking_model.telemetry import Telemetry
+
+
+# Version of the formulation built by both builders, part of the key of cached reference solves
+FORMULATION_VERSION: int = 2
 
 
 class CrossDockingSolver:
-    __modes: List[str] = ['single', 'multi', 'wsm', 'r-e']
+    __modes: List[str] = ['single', 'multi', 'wsm', 'r-e', 'pareto']
+    __builders: List[str] = ['quicksum', 'matrix']
+    __backends: List[str] = ['gurobi', 'highs']
+    __start_variables: List[str] = ['z_in', 'z_out', 'x', 'v', 'w_in', 'w_out', 'y']
+    __lazy_families: List[str] = ['19', '6', 'sort_inbound_loads']
+    __routing_variables: List[str] = ['x', 'v', 'dt', 'dt_max', 't', 't_n-plus-1', 'et', 'lt']
+    # Axes of the variable families indexed by customers, which follow the customers when they are added or removed
+    __customer_axes: Dict[str, Tuple[int, ...]] = {
+        'z_out': (0,), 'w_out': (0, 1), 'y': (1,), 'x': (0, 1), 'v': (0, 1), 'rt': (0,), 'dt': (0,), 'rho': (3,),
+        'rho_product': (2,), 'rho_volume': (2,), 't': (0,), 'et': (0,), 'lt': (0,)
+    }
+    __supplier_axes: Dict[str, Tuple[int, ...]] = {'z_in': (0,), 'w_in': (0, 1), 'y': (0,)}
+    __scheduling_families: List[str] = [
+        'assign_inbound_load', 'sort_inbound_loads', 'unloading_time_gt_processing_time', 'unloading_time_order',
+        '5', '6', '8', '9', '9-1', '9-2', 'volume_of_flows', '10', '11', '12', '14', '15'
+    ]
 
     mode: str
+    builder: str
+    backend: str
+    sparse_rho: bool
+    lazy: List[str]
+    tight_big_m: bool
+    eliminate_pairs: bool
+    aggregate_flows: bool
+    decomposition: bool
+    decomposition_stats: Optional[Dict[str, float]] = None
+    eliminated: Dict[str, int]
+    # The estimated size and peak build memory of the formulation, and the options switched to fit the budget
+    estimate: Dict[str, int]
+    downgrades: List[str]
+    cache: Optional[ReferenceCache]
+    model_cache: Optional[ModelCache]
+    telemetry: Optional[Telemetry]
+    # The solved model itself, or the `highs.HighsResult` of the last solve of the 'highs' backend
+    results: Any
+    oc_val: Optional[float] = None
+    pool_solutions: int
+    front: ParetoArchive
+    build_profile: Dict[str, Dict[str, float]]
+    build_time: float
+    reference_time: Optional[float] = None
+    update_time: Optional[float] = None
 
 
     def __init__(
@@ -25,7 +103,26 @@ class CrossDockingSolver:
         time_limit: float,
         time_unit: int,
         alpha: float = 0.5,
-        epsilon: float = 0.5
+        epsilon: float = 0.5,
+        builder: str = 'quicksum',
+        sparse_rho: bool = False,
+        cache: Optional[ReferenceCache] = None,
+        log_file: str = 'grbtune.log',
+        threads: int = 0,
+        heuristic_start: bool = False,
+        instrument: bool = False,
+        telemetry: Optional[Telemetry] = None,
+        lazy: Optional[List[str]] = None,
+        tight_big_m: bool = True,
+        eliminate_pairs: bool = False,
+        aggregate_flows: bool = False,
+        decomposition: bool = False,
+        pool_solutions: int = 0,
+        model_cache: Optional[ModelCache] = None,
+        backend: str = 'gurobi',
+        alns_iterations: int = 0,
+        memory_budget: Optional[float] = None,
+        downgrade: bool = False
     ):
         if time_unit <= 0:
             raise ValueError(f'time_unit must be an integer greater than 0: {str(time_unit)}')
@@ -33,27 +130,295 @@ class CrossDockingSolver:
         if mode not in self.__modes:
             raise ValueError(f'mode does not exist: {mode}')
 
+        self.__check_alpha(alpha)
+        self.__check_epsilon(epsilon)
+
+        if builder not in self.__builders:
+            raise ValueError(f'builder does not exist: {builder}')
+
+        if threads < 0:
+            raise ValueError(f'threads must be an integer greater than or equal to 0: {str(threads)}')
+
+        if pool_solutions < 0:
+            raise ValueError(f'pool_solutions must be an integer greater than or equal to 0: {str(pool_solutions)}')
+
+        if alns_iterations < 0:
+            raise ValueError(f'alns_iterations must be an integer greater than or equal to 0: {str(alns_iterations)}')
+
+        for family in lazy or []:
+            if family not in self.__lazy_families:
+                raise ValueError(f'family cannot be lazy: {family}')
+
+        if decomposition and mode == 'multi':
+            raise ValueError(f'decomposition is not available in mode: {mode}')
+
+        if backend not in self.__backends:
+            raise ValueError(f'backend does not exist: {backend}')
+
+        # HiGHS solves the same formulation, without the callbacks, objectives and pool of Gurobi. Its model is built
+        # from the matrix form without a Gurobi model, so it needs no Gurobi license
+        if backend == 'highs':
+            builder = 'matrix'
+
+            if mode == 'multi':
+                raise ValueError(f'mode is not available with the highs backend: {mode}')
+
+            if lazy:
+                raise ValueError('lazy constraints are not available with the highs backend')
+
+            if decomposition:
+                raise ValueError('decomposition is not available with the highs backend')
+
+            if pool_solutions > 0:
+                raise ValueError('pool_solutions is not available with the highs backend')
+
+            if model_cache is not None:
+                raise ValueError('model_cache is not available with the highs backend')
+
+        if memory_budget is not None and memory_budget <= 0:
+            raise ValueError(f'memory_budget must be a number greater than 0: {str(memory_budget)}')
+
+        # The size of the build is estimated before anything is built, so a build that does not fit the budget is
+        # refused, or made with lighter options that solve the same problem
+        options = {
+            'builder': builder,
+            'sparse_rho': sparse_rho,
+            'lazy': sorted(set(lazy or [])),
+            'eliminate_pairs': eliminate_pairs,
+            'aggregate_flows': aggregate_flows,
+            'tight_big_m': tight_big_m
+        }
+        self.estimate = build_estimate(data, **options)
+        self.downgrades = []
+
+        if memory_budget is not None and self.estimate['memory'] > memory_budget:
+            if downgrade:
+                options, self.downgrades, self.estimate = lighter_formulation(
+                    data, memory_budget, options, allow_lazy=backend == 'gurobi'
+                )
+
+            if self.estimate['memory'] > memory_budget:
+                raise ValueError(
+                    f"the build needs an estimated {self.estimate['memory'] / 2 ** 20:.1f} MB, over the memory budget "
+                    f"of {memory_budget / 2 ** 20:.1f} MB"
+                )
+
+            builder = options['builder']
+            sparse_rho = options['sparse_rho']
+            lazy = options['lazy']
+            eliminate_pairs = options['eliminate_pairs']
+            aggregate_flows = options['aggregate_flows']
+
+        self.mode = mode
+        self.builder = builder
+        self.backend = backend
+        self.sparse_rho = sparse_rho
+        self.lazy = sorted(set(lazy or []))
+        self.tight_big_m = tight_big_m
+        self.eliminate_pairs = eliminate_pairs
+        self.aggregate_flows = aggregate_flows
+        self.decomposition = decomposition
+        self.pool_solutions = pool_solutions
+        self.front = ParetoArchive()
+        self.eliminated = eliminated(data, sparse_rho, self.lazy, aggregate_flows) if eliminate_pairs else {}
+        if eliminate_pairs:
+            self.__pairs = compatible_pairs(data)
+        else:
+            self.__pairs = ~np.eye(data['number_of_customers'], dtype=bool)
+        self.__dimensions = (
+            data['number_of_suppliers'],
+            data['inbound_docks'],
+            data['number_of_customers'] + 2,
+            data['outbound_docks']
+        )
+        self.cache = cache
+        self.model_cache = model_cache
+        self.telemetry = telemetry
+        self.__point = {}
+        self.__flow_index = {}
+        self.__scenario = None
+        self.__loading = (
+            data['quantity_of_required_pallets_per_customer'],
+            data['time_to_load_one_pallet'],
+            data['changeover_time']
+        )
+        self.__fixed_bounds = None
+        # The instance the model was built or last updated for, and the id of each node of its customer index
+        self.__data = data
+        self.__time_unit = time_unit
+        self.__customer_ids = np.arange(data['number_of_customers'] + 2)
+        # The matrix form and the rows of each constraint family, only kept once the model is updated
+        self.__form = None
+        self.__constraints = None
+
+        if self.cache is not None:
+            self.__reference_key = self.cache.key(
+                data,
+                {
+                    'formulation': FORMULATION_VERSION,
+                    'time_limit': time_limit,
+                    'time_unit': time_unit,
+                    'sparse_rho': sparse_rho,
+                    'lazy': self.lazy,
+                    'tight_big_m': tight_big_m,
+                    'eliminate_pairs': eliminate_pairs,
+                    'aggregate_flows': aggregate_flows,
+                    'decomposition': decomposition,
+                    'backend': backend
+                }
+            )
+
+        snapshot = None
+        if self.model_cache is not None:
+            self.__model_key = self.model_cache.key(
+                data,
+                {
+                    'formulation': FORMULATION_VERSION,
+                    'builder': builder,
+                    'time_unit': time_unit,
+                    'sparse_rho': sparse_rho,
+                    'lazy': self.lazy,
+                    'tight_big_m': tight_big_m,
+                    'eliminate_pairs': eliminate_pairs,
+                    'aggregate_flows': aggregate_flows
+                }
+            )
+            snapshot = self.model_cache.get(self.__model_key)
+
+        # The build time also covers reading a cached model and deriving the constants of the formulation
+        start = time.perf_counter()
+        self.__setup_solver(time_limit, log_file, threads, snapshot[0] if snapshot is not None else None)
+
+        self.__big_m = big_m_values(data, tight=tight_big_m)
+        if aggregate_flows:
+            self.__volume, self.__docks = transfer_factors(data)
+        self.build_profile = {}
+        self.__instrument = instrument
+        tracing = instrument and not tracemalloc.is_tracing()
+
+        if tracing:
+            tracemalloc.start()
+
+        self.__start_profile()
+
+        try:
+            if snapshot is not None:
+                oc, nv = self.__attach_snapshot(snapshot[1])
+            elif self.builder == 'matrix':
+                oc, nv = self.__build_matrix_model(data, time_unit)
+            else:
+                oc, nv = self.__build_model(data, time_unit)
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+        self.model.update()
+        self.build_time = time.perf_counter() - start
+
+        if self.model_cache is not None and snapshot is None:
+            self.model_cache.put(self.__model_key, self.model, self.__snapshot_index(oc, nv))
+
+        # The search starts from the constructive heuristic, so its best solution is at least as good
+        if alns_iterations > 0:
+            search = AdaptiveLargeNeighbourhoodSearch(data, time_unit)
+            search.run(alns_iterations)
+            self.set_start(search.solution())
+        elif heuristic_start:
+            self.set_start(construct_solution(data, self.__big_m))
+
+        self.__set_objective(oc, nv, alpha, epsilon)
+
+
+    @staticmethod
+    def __check_alpha(alpha: float):
         if alpha < 0 or alpha > 1:
             raise ValueError(f'alpha must be a float between 0.0 and 1.0: {str(alpha)}')
 
+
+    @staticmethod
+    def __check_epsilon(epsilon: float):
         if epsilon < 0:
             raise ValueError(f'epsilon must a float greater than 0: {str(epsilon)}')
 
-        self.mode = mode
 
-        self.__setup_solver(time_limit)
-        self.__build_model(data, time_unit, alpha, epsilon)
+    def __setup_solver(self, time_limit: float, log_file: str, threads: int, snapshot: Optional[str]):
+        if self.backend == 'highs':
+            # highspy is only needed by the highs backend, which builds its own model instead of a Gurobi one
+            from cross_docking_model.highs import HighsModel, HighsResult, HighsSolver
 
+            self.model = HighsModel(f'Cross-Docking Model - {self.mode}')
+            self.__highs = HighsSolver(time_limit, log_file, threads)
+            self.results = HighsResult()
+            return
 
-    def __setup_solver(self, time_limit: float):
-        self.model = gp.Model(f'Cross-Docking Model - {self.mode}')
+        if snapshot is not None:
+            self.model = gp.read(snapshot)
+            self.model.ModelName = f'Cross-Docking Model - {self.mode}'
+        else:
+            self.model = gp.Model(f'Cross-Docking Model - {self.mode}')
 
-        self.model.Params.LogFile = 'grbtune.log'
-        self.model.Params.TimeLimit = time_limit
         self.model.Params.LogToConsole = 0
+        self.results = self.model
+
+        self.model.Params.LogFile = log_file
+        self.model.Params.TimeLimit = time_limit
+        self.model.Params.Threads = threads
+
+        if self.lazy:
+            self.model.Params.LazyConstraints = 1
+
+        if self.pool_solutions > 0:
+            self.model.Params.PoolSolutions = self.pool_solutions
+
+
+    def __snapshot_index(self, oc: gp.LinExpr, nv: gp.LinExpr) -> Dict[str, np.ndarray]:
+        # Everything the solver keeps from the build, as arrays of columns of the model
+        index = {}
 
+        for name, variables in self.__variables.items():
+            index[f'variables:{name}'] = np.array([variable.index for variable in variables], dtype=np.int64)
 
-    def __build_model(self, data: Dict, time_unit: int, alpha: float, epsilon: float):
+        for name, flows in self.__flow_index.items():
+            index[f'flow_index:{name}'] = np.stack(flows).astype(np.int64)
+
+        for name, expression in [('oc', oc), ('nv', nv)]:
+            coefficients = self.__coefficients(expression)
+
+            index[f'{name}:columns'] = np.array(list(coefficients.keys()), dtype=np.int64)
+            index[f'{name}:coefficients'] = np.array(list(coefficients.values()), dtype=np.float64)
+            index[f'{name}:constant'] = np.array(expression.getConstant())
+
+        return index
+
+
+    def __attach_snapshot(self, index: Dict[str, np.ndarray]) -> Tuple[gp.LinExpr, gp.LinExpr]:
+        # The model was read from the cache, so only the handles kept by the solver are rebuilt
+        variables = self.model.getVars()
+
+        self.__variables = {
+            name.split(':', 1)[1]: [variables[column] for column in columns.tolist()]
+            for name, columns in index.items()
+            if name.startswith('variables:')
+        }
+        self.__flow_index = {
+            name.split(':', 1)[1]: tuple(flows)
+            for name, flows in index.items()
+            if name.startswith('flow_index:')
+        }
+
+        oc, nv = [
+            gp.LinExpr(
+                index[f'{name}:coefficients'].tolist(),
+                [variables[column] for column in index[f'{name}:columns'].tolist()]
+            ) + float(index[f'{name}:constant'])
+            for name in ['oc', 'nv']
+        ]
+        self.__record_family('snapshot')
+
+        return oc, nv
+
+
+    def __build_model(self, data: Dict, time_unit: int) -> Tuple[gp.LinExpr, gp.LinExpr]:
         # Create labels
         products = create_label('product', data['number_of_products'])
         suppliers = create_label('supplier', data['number_of_suppliers'])
@@ -63,6 +428,12 @@ class CrossDockingSolver:
         customers.insert(0, 'c_inbound_dock')
         customers.append('c_outbound_dock')
 
+        # Pairs of distinct customers that cannot share a vehicle, whose arcs and assignments are fixed to zero
+        incompatible = {
+            (customers[i + 1], customers[j + 1])
+            for i, j in zip(*np.nonzero(~self.__pairs & ~np.eye(len(customers) - 2, dtype=bool)))
+        }
+
         # Create parameters
         PT = create_dict_from_array(data['processing_time_for_inbound_load'], suppliers)
         R = create_dict_from_2d_matrix(data['number_of_each_product_into_inbound_loads'], products, suppliers)
@@ -79,7 +450,12 @@ class CrossDockingSolver:
         LT = data['time_to_load_one_pallet']
         CT_ = data['changeover_time']
 
-        M = 1000
+        M4 = create_dict_from_2d_matrix(self.__big_m['unloading_time_order'], suppliers, suppliers)
+        M8 = create_dict_from_2d_matrix(self.__big_m['8'], customers, customers)
+        M12 = create_dict_from_2d_matrix(self.__big_m['12'], suppliers, customers)
+        M13 = create_dict_from_array(self.__big_m['13'], customers)
+        M15 = create_dict_from_array(self.__big_m['15'], customers)
+        M22 = create_dict_from_2d_matrix(self.__big_m['22'], customers, customers)
         CO = time_unit
         CE = time_unit
         CL = time_unit
@@ -98,16 +474,66 @@ class CrossDockingSolver:
         rt = self.model.addVars(customers, name='rt', vtype=gp.GRB.CONTINUOUS)
         dt = self.model.addVars(customers, name='dt', vtype=gp.GRB.CONTINUOUS)
         dt_max = self.model.addVar(name='dt_max', vtype=gp.GRB.CONTINUOUS)
-        rho = self.model.addVars(products, suppliers, inbound_docks, customers, outbound_docks, name='rho',
-                                 vtype=gp.GRB.CONTINUOUS)
+        if self.aggregate_flows:
+            self.__flow_index = self.__aggregate_flow_index(data, self.__pairs if self.sparse_rho else None)
+            rho_product = self.model.addVars(
+                [(products[p], suppliers[l], customers[i]) for p, l, i in zip(*self.__flow_index['rho_product'])],
+                name='rho_product',
+                vtype=gp.GRB.CONTINUOUS
+            )
+            rho_volume = self.model.addVars(
+                [
+                    (suppliers[l], inbound_docks[f], customers[i], outbound_docks[h])
+                    for l, f, i, h in zip(*self.__flow_index['rho_volume'])
+                ],
+                name='rho_volume',
+                vtype=gp.GRB.CONTINUOUS
+            )
+            flows = {'rho_product': list(rho_product.values()), 'rho_volume': list(rho_volume.values())}
+        elif self.sparse_rho:
+            self.__flow_index = {'rho': self.__sparse_rho_index(data, self.__pairs)}
+            rho = self.model.addVars(
+                [
+                    (products[p], suppliers[l], inbound_docks[f], customers[i], outbound_docks[h])
+                    for p, l, f, i, h in zip(*self.__flow_index['rho'])
+                ],
+                name='rho',
+                vtype=gp.GRB.CONTINUOUS
+            )
+            flows = {'rho': list(rho.values())}
+        else:
+            rho = self.model.addVars(products, suppliers, inbound_docks, customers, outbound_docks, name='rho',
+                                     vtype=gp.GRB.CONTINUOUS)
+            flows = {'rho': list(rho.values())}
         t = self.model.addVars(customers, name='t', vtype=gp.GRB.CONTINUOUS)
         t_np1 = self.model.addVar(name='t_n-plus-1', vtype=gp.GRB.CONTINUOUS)
         et = self.model.addVars(customers, name='et', vtype=gp.GRB.CONTINUOUS)
         lt = self.model.addVars(customers, name='lt', vtype=gp.GRB.CONTINUOUS)
 
+        self.__variables = {
+            'z_in': list(z_in.values()),
+            'z_out': list(z_out.values()),
+            'w_in': list(w_in.values()),
+            'w_out': list(w_out.values()),
+            'y': list(y.values()),
+            'x': list(x.values()),
+            'v': list(v.values()),
+            'ut': list(ut.values()),
+            'rt': list(rt.values()),
+            'dt': list(dt.values()),
+            'dt_max': [dt_max],
+            **flows,
+            't': list(t.values()),
+            't_n-plus-1': [t_np1],
+            'et': list(et.values()),
+            'lt': list(lt.values())
+        }
+        self.__fix_incompatible()
+        self.__record_family('variables')
+
         # Add constraints
         # Constraint 1: Each inbound load is assigned to one supplier
-        self.model.addConstrs(
+        self.__add_constrs(
             (
                 gp.quicksum(z_in[l, f] for f in inbound_docks) == 1
                 for l in suppliers
@@ -116,19 +542,20 @@ class CrossDockingSolver:
         )
 
         # Constraint 2: Ensure that inbound loads are sorted correctly
-        self.model.addConstrs(
-            (
-                w_in[l, m] + w_in[m, l] >= z_in[l, f] + z_in[m, f] - 1
-                for l in suppliers
-                for m in suppliers
-                if l < m
-                for f in inbound_docks
-            ),
-            name='sort_inbound_loads'
-        )
+        if 'sort_inbound_loads' not in self.lazy:
+            self.__add_constrs(
+                (
+                    w_in[l, m] + w_in[m, l] >= z_in[l, f] + z_in[m, f] - 1
+                    for l in suppliers
+                    for m in suppliers
+                    if l < m
+                    for f in inbound_docks
+                ),
+                name='sort_inbound_loads'
+            )
 
         # Constraint 3: The unloading time of a supplier is greater than or equal to its processing time
-        self.model.addConstrs(
+        self.__add_constrs(
             (
                 ut[l] >= PT[l]
                 for l in suppliers
@@ -138,9 +565,9 @@ class CrossDockingSolver:
 
         # Constraint 4: Unloading time of a supplier is greater than or equal to the unloading time of the previous
         # supplier plus processing time
-        self.model.addConstrs(
+        self.__add_constrs(
             (
-                ut[m] >= ut[l] + PT[m] - M * (1 - w_in[l, m])
+                ut[m] >= ut[l] + PT[m] - M4[l, m] * (1 - w_in[l, m])
                 for l in suppliers
                 for m in suppliers
                 if l != m
@@ -148,7 +575,7 @@ class CrossDockingSolver:
             name='unloading_time_order'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
                 gp.quicksum(z_out[i, h] for h in outbound_docks) == x['c_inbound_dock', i]
                 for i in customers[1:-1]
@@ -156,18 +583,19 @@ class CrossDockingSolver:
             name='5'
         )
 
-        self.model.addConstrs(
-            (
-                w_out[i, j] + w_out[j, i] >= z_out[i, h] + z_out[j, h] - 1
-                for i in customers[1:-1]
-                for j in customers[1:-1]
-                if i < j
-                for h in outbound_docks
-            ),
-            name='6'
-        )
-
-        self.model.addConstrs(
+        if '6' not in self.lazy:
+            self.__add_constrs(
+                (
+                    w_out[i, j] + w_out[j, i] >= z_out[i, h] + z_out[j, h] - 1
+                    for i in customers[1:-1]
+                    for j in customers[1:-1]
+                    if i < j
+                    for h in outbound_docks
+                ),
+                name='6'
+            )
+
+        self.__add_constrs(
             (
                 dt_max >= dt[i]
                 for i in customers[1:-1]
@@ -175,13 +603,15 @@ class CrossDockingSolver:
             name='7'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
                 dt[j]
                 >=
                 dt[i] + CT_ + LT * (
-                        Q[j] * x['c_inbound_dock', j] + gp.quicksum(Q[n] * v[n, j] for n in customers[1:-1] if i != j)
-                ) - M * (1 - w_out[i, j])
+                        Q[j] * x['c_inbound_dock', j] + gp.quicksum(
+                            Q[n] * v[n, j] for n in customers[1:-1] if i != j if (n, j) not in incompatible
+                        )
+                ) - M8[i, j] * (1 - w_out[i, j])
                 for i in customers[1:-1]
                 for j in customers[1:-1]
                 if i != j
@@ -189,134 +619,300 @@ class CrossDockingSolver:
             name='8'
         )
 
-        self.model.addConstrs(
-            (
-                gp.quicksum(rho[p, l, f, i, h] for i in customers[1:-1] for h in outbound_docks)
-                ==
-                R[p, l] * z_in[l, f]
-                for p in products
-                for l in suppliers
-                for f in inbound_docks
-            ),
-            name='9'
-        )
-
-        self.model.addConstrs(
+        if self.aggregate_flows:
+            # The transfer time of a product is its volume times a time of the pair of docks, and each inbound load
+            # and vehicle uses a single dock, so the product flows need no docks and the ready times only need the
+            # volume carried between each pair of docks
+            VOL = create_dict_from_array(self.__volume, products)
+            TV = create_dict_from_2d_matrix(self.__docks, inbound_docks, outbound_docks)
+            flow_pairs = {(l, i) for l, _, i, _ in rho_volume.keys()}
+
+            self.__add_constrs(
+                (
+                    rho_product.sum(p, l, '*') == R[p, l]
+                    for p in products
+                    for l in suppliers
+                    if R[p, l] > 0 or not self.sparse_rho
+                ),
+                name='9-1'
+            )
+
+            self.__add_constrs(
+                (
+                    rho_volume.sum(l, f, '*', '*')
+                    ==
+                    gp.quicksum(VOL[p] * R[p, l] for p in products) * z_in[l, f]
+                    for l in suppliers
+                    for f in inbound_docks
+                ),
+                name='9-2'
+            )
+
+            VOL_rho = {(p, l, i): VOL[p] for p, l, i in rho_product.keys()}
+            self.__add_constrs(
+                (
+                    rho_volume.sum(l, '*', i, '*') == rho_product.prod(VOL_rho, '*', l, i)
+                    for l in suppliers
+                    for i in customers[1:-1]
+                    if (l, i) in flow_pairs
+                ),
+                name='volume_of_flows'
+            )
+
+            self.__add_constrs(
+                (
+                    rho_volume.sum('*', '*', i, h)
+                    <=
+                    gp.quicksum(VOL[p] * R[p, l] for p in products for l in suppliers) * z_out[i, h]
+                    for i in customers[1:-1]
+                    for h in outbound_docks
+                ),
+                name='10'
+            )
+
+            self.__add_constrs(
+                (
+                    rho_product.sum('*', l, i)
+                    <=
+                    gp.quicksum(R[p, l] for p in products) * y[l, i]
+                    for l in suppliers
+                    for i in customers[1:-1]
+                ),
+                name='11'
+            )
+
+            TV_rho = {(l, f, i, h): TV[f, h] for l, f, i, h in rho_volume.keys()}
+            self.__add_constrs(
+                (
+                    rt[i]
+                    >=
+                    ut[l] + rho_volume.prod(TV_rho, l, '*', i, '*') - M12[l, i] * (1 - y[l, i])
+                    for l in suppliers
+                    for i in customers[1:-1]
+                ),
+                name='12'
+            )
+
+        elif self.sparse_rho:
+            # Only the flows in the admissible index exist, so the sums run over the keys of rho
+            self.__add_constrs(
+                (
+                    rho.sum(p, l, f, '*', '*')
+                    ==
+                    R[p, l] * z_in[l, f]
+                    for p in products
+                    for l in suppliers
+                    if R[p, l] > 0
+                    for f in inbound_docks
+                ),
+                name='9'
+            )
+
+            self.__add_constrs(
+                (
+                    rho.sum('*', '*', '*', i, h)
+                    <=
+                    gp.quicksum(R[p, l] for p in products for l in suppliers) * z_out[i, h]
+                    for i in customers[1:-1]
+                    for h in outbound_docks
+                ),
+                name='10'
+            )
+
+            self.__add_constrs(
+                (
+                    rho.sum('*', l, '*', i, '*')
+                    <=
+                    gp.quicksum(R[p, l] for p in products) * y[l, i]
+                    for l in suppliers
+                    for i in customers[1:-1]
+                ),
+                name='11'
+            )
+
+            TR_rho = {(p, l, f, i, h): TR[p, f, h] for p, l, f, i, h in rho.keys()}
+            self.__add_constrs(
+                (
+                    rt[i]
+                    >=
+                    ut[l] + rho.prod(TR_rho, '*', l, '*', i, '*') - M12[l, i] * (1 - y[l, i])
+                    for l in suppliers
+                    for i in customers[1:-1]
+                ),
+                name='12'
+            )
+
+        else:
+            self.__add_constrs(
+                (
+                    gp.quicksum(rho[p, l, f, i, h] for i in customers[1:-1] for h in outbound_docks)
+                    ==
+                    R[p, l] * z_in[l, f]
+                    for p in products
+                    for l in suppliers
+                    for f in inbound_docks
+                ),
+                name='9'
+            )
+
+            self.__add_constrs(
+                (
+                    gp.quicksum(rho[p, l, f, i, h] for p in products for l in suppliers for f in inbound_docks)
+                    <=
+                    gp.quicksum(R[p, l] for p in products for l in suppliers) * z_out[i, h]
+                    for i in customers[1:-1]
+                    for h in outbound_docks
+                ),
+                name='10'
+            )
+
+            self.__add_constrs(
+                (
+                    gp.quicksum(rho[p, l, f, i, h] for p in products for f in inbound_docks for h in outbound_docks)
+                    <=
+                    gp.quicksum(R[p, l] for p in products) * y[l, i]
+                    for l in suppliers
+                    for i in customers[1:-1]
+                ),
+                name='11'
+            )
+
+            self.__add_constrs(
+                (
+                    rt[i]
+                    >=
+                    ut[l] + gp.quicksum(
+                        TR[p, f, h] * rho[p, l, f, i, h]
+                        for p in products for f in inbound_docks for h in outbound_docks
+                    ) - M12[l, i] * (1 - y[l, i])
+                    for l in suppliers
+                    for i in customers[1:-1]
+                ),
+                name='12'
+            )
+
+        self.__add_constrs(
             (
-                gp.quicksum(rho[p, l, f, i, h] for p in products for l in suppliers for f in inbound_docks)
-                <=
-                gp.quicksum(R[p, l] for p in products for l in suppliers) * z_out[i, h]
-                for i in customers[1:-1]
-                for h in outbound_docks
-            ),
-            name='10'
-        )
-
-        self.model.addConstrs(
-            (
-                gp.quicksum(rho[p, l, f, i, h] for p in products for f in inbound_docks for h in outbound_docks)
-                <=
-                gp.quicksum(R[p, l] for p in products) * y[l, i]
-                for l in suppliers
-                for i in customers[1:-1]
-            ),
-            name='11'
-        )
-
-        self.model.addConstrs(
-            (
-                rt[i]
-                >=
-                ut[l] + gp.quicksum(
-                    TR[p, f, h] * rho[p, l, f, i, h] for p in products for f in inbound_docks for h in outbound_docks
-                ) - M * (1 - y[l, i])
-                for l in suppliers
-                for i in customers[1:-1]
-            ),
-            name='12'
-        )
-
-        self.model.addConstrs(
-            (
-                t[i] >= dt[i] + TT['c_inbound_dock', i] - M * (1 - x['c_inbound_dock', i])
+                t[i] >= dt[i] + TT['c_inbound_dock', i] - M13[i] * (1 - x['c_inbound_dock', i])
                 for i in customers[1:-1]
             ),
             name='13'
         )
 
-        self.model.addConstrs(
-            (
-                gp.quicksum(rho[p, l, f, i, h] for l in suppliers for f in inbound_docks for h in outbound_docks)
-                ==
-                D[p, i] * x['c_inbound_dock', i] + gp.quicksum(D[p, j] * v[j, i] for j in customers[1:-1] if j != i)
-                for p in products
-                for i in customers[1:-1]
-            ),
-            name='14'
-        )
-
-        self.model.addConstrs(
+        if self.aggregate_flows:
+            self.__add_constrs(
+                (
+                    rho_product.sum(p, '*', i)
+                    ==
+                    D[p, i] * x['c_inbound_dock', i] + gp.quicksum(
+                        D[p, j] * v[j, i] for j in customers[1:-1] if j != i if (j, i) not in incompatible
+                    )
+                    for p in products
+                    if not self.sparse_rho or any(D[p, j] > 0 for j in customers[1:-1])
+                    for i in customers[1:-1]
+                ),
+                name='14'
+            )
+
+        elif self.sparse_rho:
+            self.__add_constrs(
+                (
+                    rho.sum(p, '*', '*', i, '*')
+                    ==
+                    D[p, i] * x['c_inbound_dock', i] + gp.quicksum(
+                        D[p, j] * v[j, i] for j in customers[1:-1] if j != i if (j, i) not in incompatible
+                    )
+                    for p in products
+                    if any(D[p, j] > 0 for j in customers[1:-1])
+                    for i in customers[1:-1]
+                ),
+                name='14'
+            )
+
+        else:
+            self.__add_constrs(
+                (
+                    gp.quicksum(rho[p, l, f, i, h] for l in suppliers for f in inbound_docks for h in outbound_docks)
+                    ==
+                    D[p, i] * x['c_inbound_dock', i] + gp.quicksum(
+                        D[p, j] * v[j, i] for j in customers[1:-1] if j != i if (j, i) not in incompatible
+                    )
+                    for p in products
+                    for i in customers[1:-1]
+                ),
+                name='14'
+            )
+
+        self.__add_constrs(
             (
                 dt[i]
                 >=
                 rt[i] + LT * (
-                        Q[i] * x['c_inbound_dock', i] + gp.quicksum(Q[j] * v[j, i] for j in customers[1:-1] if j != i)
-                ) - M * (1 - x['c_inbound_dock', i])
+                        Q[i] * x['c_inbound_dock', i] + gp.quicksum(
+                            Q[j] * v[j, i] for j in customers[1:-1] if j != i if (j, i) not in incompatible
+                        )
+                ) - M15[i] * (1 - x['c_inbound_dock', i])
                 for i in customers[1:-1]
             ),
             name='15'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
-                gp.quicksum(x[i, j] for i in customers[:-1] if i != j) == 1
+                gp.quicksum(x[i, j] for i in customers[:-1] if i != j if (i, j) not in incompatible) == 1
                 for j in customers[1:-1]
             ),
             name='16'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
-                gp.quicksum(x[i, j] for j in customers[1:] if i != j) == 1
+                gp.quicksum(x[i, j] for j in customers[1:] if i != j if (i, j) not in incompatible) == 1
                 for i in customers[1:-1]
             ),
             name='17'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
                 v[i, j] >= x['c_inbound_dock', j] - (1 - x[j, i])
                 for i in customers[1:-1]
                 for j in customers[1:-1]
                 if i != j
+                if (j, i) not in incompatible
             ),
             name='18'
         )
 
-        self.model.addConstrs(
-            (
-                v[i, j] >= v[n, j] - (1 - x[i, n])
-                for i in customers[1:-1]
-                for j in customers[1:-1]
-                for n in customers[1:-1]
-                if i != j
-                if i != n
-                if j != n
-            ),
-            name='19'
-        )
-
-        self.model.addConstrs(
+        if '19' not in self.lazy:
+            self.__add_constrs(
+                (
+                    v[i, j] >= v[n, j] - (1 - x[i, n])
+                    for i in customers[1:-1]
+                    for j in customers[1:-1]
+                    for n in customers[1:-1]
+                    if i != j
+                    if i != n
+                    if j != n
+                    if (i, n) not in incompatible
+                    if (n, j) not in incompatible
+                ),
+                name='19'
+            )
+
+        self.__add_constrs(
             (
-                gp.quicksum(v[i, j] for j in customers[1:-1] if j != i) + x['c_inbound_dock', i] == 1
+                gp.quicksum(v[i, j] for j in customers[1:-1] if j != i if (i, j) not in incompatible)
+                + x['c_inbound_dock', i] == 1
                 for i in customers[1:-1]
             ),
             name='20'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
-                gp.quicksum(Q[i] * v[i, j] for i in customers[1:-1] if i != j) + Q[j] * x['c_inbound_dock', j]
+                gp.quicksum(Q[i] * v[i, j] for i in customers[1:-1] if i != j if (i, j) not in incompatible)
+                + Q[j] * x['c_inbound_dock', j]
                 <=
                 CAP * x['c_inbound_dock', j]
                 for j in customers[1:-1]
@@ -324,9 +920,9 @@ class CrossDockingSolver:
             name='21'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
-                t[j] >= t[i] + ST[i] + TT[i, j] - M * (1 - x[i, j])
+                t[j] >= t[i] + ST[i] + TT[i, j] - M22[i, j] * (1 - x[i, j])
                 for i in customers[1:-1]
                 for j in customers[1:]
                 if i != j
@@ -334,7 +930,7 @@ class CrossDockingSolver:
             name='22'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
                 A[i] - et[i] <= t[i]
                 for i in customers[1:-1]
@@ -342,7 +938,7 @@ class CrossDockingSolver:
             name='23-1'
         )
 
-        self.model.addConstrs(
+        self.__add_constrs(
             (
                 t[i] <= B[i] + lt[i]
                 for i in customers[1:-1]
@@ -351,6 +947,7 @@ class CrossDockingSolver:
         )
 
         self.model.addConstr(t_np1 <= T_max, name='24')
+        self.__record_family('24')
 
 
         # Set objective
@@ -359,6 +956,7 @@ class CrossDockingSolver:
                 for i in customers[:-1]
                 for j in customers[1:]
                 if i != j
+                if (i, j) not in incompatible
             ) + gp.quicksum(
                 CE * et[i]
                 for i in customers[1:-1]
@@ -367,8 +965,618 @@ class CrossDockingSolver:
                 for i in customers[1:-1]
             ) + CO * dt_max
         nv = gp.quicksum((CAP * x['c_inbound_dock', j] - gp.quicksum(
-            Q[i] * v[i, j] for i in customers[1:-1] if i != j) + Q[j] * x['c_inbound_dock', j]) / CAP for j in
-                            customers[1:-1])
+            Q[i] * v[i, j] for i in customers[1:-1] if i != j if (i, j) not in incompatible
+        ) + Q[j] * x['c_inbound_dock', j]) / CAP for j in customers[1:-1])
+
+        return oc, nv
+
+
+    def __build_matrix_model(self, data: Dict, time_unit: int) -> Tuple[gp.LinExpr, gp.LinExpr]:
+        form = self.__matrix_form(data, time_unit, np.arange(data['number_of_customers'] + 2))
+        layout, _, _, objectives = next(form)
+
+        variables = {
+            name: self.model.addMVar((count,), vtype=vtype, name=name)
+            for name, (_, count, vtype) in layout.blocks.items()
+        }
+        self.model.update()
+
+        self.__variables = {name: variable.tolist() for name, variable in variables.items()}
+        self.__fix_incompatible()
+        self.__record_family('variables')
+
+        # Each family is added as soon as its coefficients are ready, so only one of them is held at a time
+        for name, matrix, sense, rhs, _ in form:
+            self.model.addMConstr(matrix, None, sense, rhs, name=name)
+            self.__record_family(name)
+
+        oc, nv = (self.__expression(*objectives[name]) for name in ['oc', 'nv'])
+
+        return oc, nv
+
+
+    def __matrix_form(
+        self,
+        data: Dict,
+        time_unit: int,
+        ids: np.ndarray
+    ) -> Iterator[Tuple[Any, ...]]:
+        # The model in matrix form. The first item is the column layout, the key of each column, the columns fixed
+        # to zero and the columns and coefficients of each objective, and every following item is a constraint
+        # family, as its name, matrix, sense, right-hand sides and the key of each row. The customer axes of the
+        # keys hold the id of each customer instead of its position, so the keys of two instances whose customers
+        # were added or removed can be matched
+        # Create sizes
+        P = data['number_of_products']
+        S = data['number_of_suppliers']
+        F = data['inbound_docks']
+        H = data['outbound_docks']
+        N = data['number_of_customers']
+        C = N + 2
+
+        # Create parameters
+        PT = data['processing_time_for_inbound_load'].astype(np.float64)
+        R = data['number_of_each_product_into_inbound_loads'].astype(np.float64)
+        D = data['quantity_of_required_products_per_customer'].astype(np.float64)
+        Q = data['quantity_of_required_pallets_per_customer'].astype(np.float64)
+        ST = data['quantity_of_required_pallets_per_customer'].astype(np.float64) * 2
+        TR = data['transfer_time_for_each_product']
+        TT = data['travel_time']
+        CT = data['travel_time']
+        A = data['time_window_start'].astype(np.float64)
+        B = data['time_window_end'].astype(np.float64)
+
+        CAP = data['vehicle_capacity']
+        LT = data['time_to_load_one_pallet']
+        CT_ = data['changeover_time']
+
+        M4 = self.__big_m['unloading_time_order']
+        M8 = self.__big_m['8']
+        M12 = self.__big_m['12']
+        M13 = self.__big_m['13']
+        M15 = self.__big_m['15']
+        M22 = self.__big_m['22']
+        CO = time_unit
+        CE = time_unit
+        CL = time_unit
+        T_max = 400
+
+        # Create variables, keeping the column order of the quicksum builder
+        layout = ColumnLayout()
+        z_in = layout.add('z_in', (S, F), gp.GRB.BINARY)
+        z_out = layout.add('z_out', (C, H), gp.GRB.BINARY)
+        w_in = layout.add('w_in', (S, S), gp.GRB.BINARY)
+        w_out = layout.add('w_out', (C, C), gp.GRB.BINARY)
+        y = layout.add('y', (S, C), gp.GRB.BINARY)
+        x = layout.add('x', (C, C), gp.GRB.BINARY)
+        v = layout.add('v', (C, C), gp.GRB.BINARY)
+
+        ut = layout.add('ut', (S,), gp.GRB.CONTINUOUS)
+        rt = layout.add('rt', (C,), gp.GRB.CONTINUOUS)
+        dt = layout.add('dt', (C,), gp.GRB.CONTINUOUS)
+        dt_max = layout.add('dt_max', (), gp.GRB.CONTINUOUS)
+        if self.aggregate_flows:
+            self.__flow_index = self.__aggregate_flow_index(data, self.__pairs if self.sparse_rho else None)
+            p_flow, l_flow, i_flow = self.__flow_index['rho_product']
+            l_volume, f_volume, i_volume, h_volume = self.__flow_index['rho_volume']
+            rho_product = layout.add('rho_product', (p_flow.size,), gp.GRB.CONTINUOUS)
+            rho_volume = layout.add('rho_volume', (l_volume.size,), gp.GRB.CONTINUOUS)
+        else:
+            if self.sparse_rho:
+                self.__flow_index = {'rho': self.__sparse_rho_index(data, self.__pairs)}
+                p_rho, l_rho, f_rho, i_rho, h_rho = self.__flow_index['rho']
+            else:
+                p_rho, l_rho, f_rho, i_rho, h_rho = (index.ravel() for index in np.indices((P, S, F, C, H)))
+            rho = layout.add('rho', (p_rho.size,), gp.GRB.CONTINUOUS)
+        t = layout.add('t', (C,), gp.GRB.CONTINUOUS)
+        t_np1 = layout.add('t_n-plus-1', (), gp.GRB.CONTINUOUS)
+        et = layout.add('et', (C,), gp.GRB.CONTINUOUS)
+        lt = layout.add('lt', (C,), gp.GRB.CONTINUOUS)
+
+        # Key of each column: its dense position, or its position in the flow index
+        keys = {
+            name: self.__dense_keys(columns.shape)
+            for name, columns in [
+                ('z_in', z_in), ('z_out', z_out), ('w_in', w_in), ('w_out', w_out), ('y', y), ('x', x), ('v', v),
+                ('ut', ut), ('rt', rt), ('dt', dt), ('dt_max', dt_max), ('t', t), ('t_n-plus-1', t_np1), ('et', et),
+                ('lt', lt)
+            ]
+        }
+        if self.aggregate_flows:
+            keys['rho_product'] = (p_flow, l_flow, i_flow)
+            keys['rho_volume'] = (l_volume, f_volume, i_volume, h_volume)
+        else:
+            keys['rho'] = (p_rho, l_rho, f_rho, i_rho, h_rho)
+        for name, axes in self.__customer_axes.items():
+            if name in keys:
+                keys[name] = tuple(ids[key] if axis in axes else key for axis, key in enumerate(keys[name]))
+
+        positions = self.__incompatible_positions()
+        fixed = np.concatenate([x.ravel()[positions], v.ravel()[positions]])
+
+        # Index helpers: real customers and ordered pairs of distinct real customers and suppliers
+        c = np.arange(1, C - 1)
+        s = np.arange(S)
+        i_pair, j_pair = np.nonzero(~np.eye(N, dtype=bool))
+        i_pair, j_pair = i_pair + 1, j_pair + 1
+        # Arcs and vehicle assignments between customers that cannot share a vehicle are left out of every row
+        linked = np.ones((C, C), dtype=bool)
+        linked[1:-1, 1:-1] = self.__pairs | np.eye(N, dtype=bool)
+        i_share, j_share = np.nonzero(self.__pairs)
+        i_share, j_share = i_share + 1, j_share + 1
+        l_pair, m_pair = np.nonzero(~np.eye(S, dtype=bool))
+        origin = np.arange(C - 1)
+        destination = np.arange(1, C)
+        if not self.aggregate_flows:
+            # Rows of the flow constraints reached by each rho column; flows to the dock nodes appear in none of them
+            real_rho = (i_rho >= 1) & (i_rho <= N)
+            c_rho = np.where(real_rho, i_rho - 1, -1)
+
+        # Set objective
+        i_arc, j_arc = np.nonzero(
+            (origin[:, None] != destination[None, :]) & linked[origin[:, None], destination[None, :]]
+        )
+        i_arc, j_arc = origin[i_arc], destination[j_arc]
+        objectives = {
+            'oc': self.__objective_terms(
+                (x[i_arc, j_arc], CT[i_arc, j_arc]), (et[c], CE), (lt[c], CL), (dt_max, CO)
+            ),
+            'nv': self.__objective_terms(
+                (x[0, c], (CAP + Q) / CAP), (v[i_share, j_share], -Q[i_share - 1] / CAP)
+            )
+        }
+
+        yield layout, keys, fixed, objectives
+
+        # Add constraints
+        # Constraint 1: Each inbound load is assigned to one supplier
+        block = ConstraintBlock(S)
+        block.add(s[:, None], z_in)
+        yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 1.0, 'assign_inbound_load', (s,))
+
+        # Constraint 2: Ensure that inbound loads are sorted correctly
+        if 'sort_inbound_loads' not in self.lazy:
+            l_upper, m_upper = np.triu_indices(S, 1)
+            row = np.arange(l_upper.size * F).reshape(l_upper.size, F)
+            block = ConstraintBlock(row.size)
+            block.add(row, w_in[l_upper, m_upper][:, None])
+            block.add(row, w_in[m_upper, l_upper][:, None])
+            block.add(row, z_in[l_upper], -1.0)
+            block.add(row, z_in[m_upper], -1.0)
+            yield self.__matrix_family(
+                layout, block, gp.GRB.GREATER_EQUAL, -1.0, 'sort_inbound_loads',
+                np.broadcast_arrays(l_upper[:, None], m_upper[:, None], np.arange(F)[None, :])
+            )
+
+        # Constraint 3: The unloading time of a supplier is greater than or equal to its processing time
+        block = ConstraintBlock(S)
+        block.add(s, ut)
+        yield self.__matrix_family(layout, block, gp.GRB.GREATER_EQUAL, PT, 'unloading_time_gt_processing_time', (s,))
+
+        # Constraint 4: Unloading time of a supplier is greater than or equal to the unloading time of the previous
+        # supplier plus processing time
+        row = np.arange(l_pair.size)
+        block = ConstraintBlock(row.size)
+        block.add(row, ut[m_pair])
+        block.add(row, ut[l_pair], -1.0)
+        block.add(row, w_in[l_pair, m_pair], -M4[l_pair, m_pair])
+        yield self.__matrix_family(
+            layout, block, gp.GRB.GREATER_EQUAL, PT[m_pair] - M4[l_pair, m_pair], 'unloading_time_order',
+            (l_pair, m_pair)
+        )
+
+        row = np.arange(N)
+        block = ConstraintBlock(N)
+        block.add(row[:, None], z_out[c])
+        block.add(row, x[0, c], -1.0)
+        yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 0.0, '5', (ids[c],))
+
+        if '6' not in self.lazy:
+            i_upper, j_upper = np.triu_indices(N, 1)
+            i_upper, j_upper = i_upper + 1, j_upper + 1
+            row = np.arange(i_upper.size * H).reshape(i_upper.size, H)
+            block = ConstraintBlock(row.size)
+            block.add(row, w_out[i_upper, j_upper][:, None])
+            block.add(row, w_out[j_upper, i_upper][:, None])
+            block.add(row, z_out[i_upper], -1.0)
+            block.add(row, z_out[j_upper], -1.0)
+            yield self.__matrix_family(
+                layout, block, gp.GRB.GREATER_EQUAL, -1.0, '6',
+                np.broadcast_arrays(ids[i_upper][:, None], ids[j_upper][:, None], np.arange(H)[None, :])
+            )
+
+        row = np.arange(N)
+        block = ConstraintBlock(N)
+        block.add(row, dt_max)
+        block.add(row, dt[c], -1.0)
+        yield self.__matrix_family(layout, block, gp.GRB.GREATER_EQUAL, 0.0, '7', (ids[c],))
+
+        row = np.arange(i_pair.size)
+        block = ConstraintBlock(row.size)
+        block.add(row, dt[j_pair])
+        block.add(row, dt[i_pair], -1.0)
+        block.add(row, x[0, j_pair], -LT * Q[j_pair - 1])
+        block.add(
+            row[:, None],
+            np.where(linked[c[None, :], j_pair[:, None]], v[c[None, :], j_pair[:, None]], -1),
+            -LT * Q[None, :]
+        )
+        block.add(row, w_out[i_pair, j_pair], -M8[i_pair, j_pair])
+        yield self.__matrix_family(
+            layout, block, gp.GRB.GREATER_EQUAL, CT_ - M8[i_pair, j_pair], '8', (ids[i_pair], ids[j_pair])
+        )
+
+        if self.aggregate_flows:
+            # Product flows without docks and volume flows between docks, as in the quicksum builder
+            supplied = self.__family_rows((P, S), R > 0)
+            block = ConstraintBlock(supplied.max(initial=-1) + 1)
+            block.add(supplied[p_flow, l_flow], rho_product)
+            yield self.__matrix_family(
+                layout, block, gp.GRB.EQUAL, R[supplied >= 0], '9-1', np.nonzero(supplied >= 0)
+            )
+
+            row = np.arange(S * F).reshape(S, F)
+            block = ConstraintBlock(row.size)
+            block.add(row[l_volume, f_volume], rho_volume)
+            block.add(row, z_in, -(self.__volume @ R)[:, None])
+            yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 0.0, '9-2', np.indices((S, F)))
+
+            linked_flows = np.zeros((S, N), dtype=bool)
+            linked_flows[l_volume, i_volume - 1] = True
+            row = self.__family_rows((S, N), linked_flows)
+            l_row, i_row = np.nonzero(row >= 0)
+            block = ConstraintBlock(row.max(initial=-1) + 1)
+            block.add(row[l_volume, i_volume - 1], rho_volume)
+            block.add(row[l_flow, i_flow - 1], rho_product, -self.__volume[p_flow])
+            yield self.__matrix_family(
+                layout, block, gp.GRB.EQUAL, 0.0, 'volume_of_flows', (l_row, ids[i_row + 1])
+            )
+
+            row = np.arange(N * H).reshape(N, H)
+            block = ConstraintBlock(row.size)
+            block.add(row[i_volume - 1, h_volume], rho_volume)
+            block.add(row, z_out[c], -(self.__volume @ R).sum())
+            yield self.__matrix_family(
+                layout, block, gp.GRB.LESS_EQUAL, 0.0, '10', np.broadcast_arrays(ids[c][:, None], np.arange(H))
+            )
+
+            row = np.arange(S * N).reshape(S, N)
+            block = ConstraintBlock(row.size)
+            block.add(row[l_flow, i_flow - 1], rho_product)
+            block.add(row, y[:, c], -R.sum(axis=0)[:, None])
+            yield self.__matrix_family(
+                layout, block, gp.GRB.LESS_EQUAL, 0.0, '11', np.broadcast_arrays(s[:, None], ids[c])
+            )
+
+            block = ConstraintBlock(row.size)
+            block.add(row, rt[c][None, :])
+            block.add(row, ut[:, None], -1.0)
+            block.add(row[l_volume, i_volume - 1], rho_volume, -self.__docks[f_volume, h_volume])
+            block.add(row, y[:, c], -M12[:, c])
+            yield self.__matrix_family(
+                layout, block, gp.GRB.GREATER_EQUAL, -M12[:, c].ravel(), '12', np.broadcast_arrays(s[:, None], ids[c])
+            )
+
+        else:
+            row = self.__family_rows((P, S, F), np.broadcast_to(R[:, :, None] > 0, (P, S, F)))
+            block = ConstraintBlock(row.max(initial=-1) + 1)
+            block.add(np.where(real_rho, row[p_rho, l_rho, f_rho], -1), rho)
+            block.add(row, z_in[None, :, :], -R[:, :, None])
+            yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 0.0, '9', np.nonzero(row >= 0))
+
+            row = np.arange(N * H).reshape(N, H)
+            block = ConstraintBlock(row.size)
+            block.add(np.where(real_rho, row[c_rho, h_rho], -1), rho)
+            block.add(row, z_out[c], -R.sum())
+            yield self.__matrix_family(
+                layout, block, gp.GRB.LESS_EQUAL, 0.0, '10', np.broadcast_arrays(ids[c][:, None], np.arange(H))
+            )
+
+            row = np.arange(S * N).reshape(S, N)
+            block = ConstraintBlock(row.size)
+            block.add(np.where(real_rho, row[l_rho, c_rho], -1), rho)
+            block.add(row, y[:, c], -R.sum(axis=0)[:, None])
+            yield self.__matrix_family(
+                layout, block, gp.GRB.LESS_EQUAL, 0.0, '11', np.broadcast_arrays(s[:, None], ids[c])
+            )
+
+            block = ConstraintBlock(row.size)
+            block.add(row, rt[c][None, :])
+            block.add(row, ut[:, None], -1.0)
+            block.add(np.where(real_rho, row[l_rho, c_rho], -1), rho, -TR[p_rho, f_rho, h_rho])
+            block.add(row, y[:, c], -M12[:, c])
+            yield self.__matrix_family(
+                layout, block, gp.GRB.GREATER_EQUAL, -M12[:, c].ravel(), '12', np.broadcast_arrays(s[:, None], ids[c])
+            )
+
+        row = np.arange(N)
+        block = ConstraintBlock(N)
+        block.add(row, t[c])
+        block.add(row, dt[c], -1.0)
+        block.add(row, x[0, c], -M13[c])
+        yield self.__matrix_family(layout, block, gp.GRB.GREATER_EQUAL, TT[0, c] - M13[c], '13', (ids[c],))
+
+        row = self.__family_rows((P, N), np.broadcast_to(D.any(axis=1)[:, None], (P, N)))
+        p_row, i_row = np.nonzero(row >= 0)
+        block = ConstraintBlock(row.max(initial=-1) + 1)
+        if self.aggregate_flows:
+            block.add(row[p_flow, i_flow - 1], rho_product)
+        else:
+            block.add(np.where(real_rho, row[p_rho, c_rho], -1), rho)
+        block.add(row, x[0, c][None, :], -D)
+        block.add(row[:, i_share - 1], v[j_share, i_share][None, :], -D[:, j_share - 1])
+        yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 0.0, '14', (p_row, ids[i_row + 1]))
+
+        row = np.arange(N)
+        block = ConstraintBlock(N)
+        block.add(row, dt[c])
+        block.add(row, rt[c], -1.0)
+        block.add(row, x[0, c], -LT * Q)
+        block.add(i_share - 1, v[j_share, i_share], -LT * Q[j_share - 1])
+        block.add(row, x[0, c], -M15[c])
+        yield self.__matrix_family(layout, block, gp.GRB.GREATER_EQUAL, -M15[c], '15', (ids[c],))
+
+        block = ConstraintBlock(N)
+        block.add(
+            row[:, None],
+            x[origin[None, :], c[:, None]],
+            ((origin[None, :] != c[:, None]) & linked[origin[None, :], c[:, None]]).astype(np.float64)
+        )
+        yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 1.0, '16', (ids[c],))
+
+        block = ConstraintBlock(N)
+        block.add(
+            row[:, None],
+            x[c[:, None], destination[None, :]],
+            ((destination[None, :] != c[:, None]) & linked[c[:, None], destination[None, :]]).astype(np.float64)
+        )
+        yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 1.0, '17', (ids[c],))
+
+        row = np.arange(i_share.size)
+        block = ConstraintBlock(row.size)
+        block.add(row, v[i_share, j_share])
+        block.add(row, x[0, j_share], -1.0)
+        block.add(row, x[j_share, i_share], -1.0)
+        yield self.__matrix_family(layout, block, gp.GRB.GREATER_EQUAL, -1.0, '18', (ids[i_share], ids[j_share]))
+
+        if '19' not in self.lazy:
+            i_triple, j_triple, n_triple = self.__distinct_triples(N)
+            kept = linked[i_triple, n_triple] & linked[n_triple, j_triple]
+            i_triple, j_triple, n_triple = i_triple[kept], j_triple[kept], n_triple[kept]
+            row = np.arange(i_triple.size)
+            block = ConstraintBlock(row.size)
+            block.add(row, v[i_triple, j_triple])
+            block.add(row, v[n_triple, j_triple], -1.0)
+            block.add(row, x[i_triple, n_triple], -1.0)
+            yield self.__matrix_family(
+                layout, block, gp.GRB.GREATER_EQUAL, -1.0, '19', (ids[i_triple], ids[j_triple], ids[n_triple])
+            )
+
+        row = np.arange(N)
+        block = ConstraintBlock(N)
+        block.add(i_share - 1, v[i_share, j_share])
+        block.add(row, x[0, c])
+        yield self.__matrix_family(layout, block, gp.GRB.EQUAL, 1.0, '20', (ids[c],))
+
+        block = ConstraintBlock(N)
+        block.add(j_share - 1, v[i_share, j_share], Q[i_share - 1])
+        block.add(row, x[0, c], Q - CAP)
+        yield self.__matrix_family(layout, block, gp.GRB.LESS_EQUAL, 0.0, '21', (ids[c],))
+
+        # The big-M constants are capped, so a row of an incompatible pair still bounds the visiting times with its
+        # arc fixed to zero and is kept
+        i_arc, j_arc = np.nonzero(c[:, None] != destination[None, :])
+        i_arc, j_arc = c[i_arc], destination[j_arc]
+        row = np.arange(i_arc.size)
+        block = ConstraintBlock(row.size)
+        block.add(row, t[j_arc])
+        block.add(row, t[i_arc], -1.0)
+        block.add(row, x[i_arc, j_arc], -M22[i_arc, j_arc])
+        yield self.__matrix_family(
+            layout, block, gp.GRB.GREATER_EQUAL, ST[i_arc - 1] + TT[i_arc, j_arc] - M22[i_arc, j_arc], '22',
+            (ids[i_arc], ids[j_arc])
+        )
+
+        row = np.arange(N)
+        block = ConstraintBlock(N)
+        block.add(row, et[c], -1.0)
+        block.add(row, t[c], -1.0)
+        yield self.__matrix_family(layout, block, gp.GRB.LESS_EQUAL, -A[c], '23-1', (ids[c],))
+
+        block = ConstraintBlock(N)
+        block.add(row, t[c])
+        block.add(row, lt[c], -1.0)
+        yield self.__matrix_family(layout, block, gp.GRB.LESS_EQUAL, B[c], '23-2', (ids[c],))
+
+        block = ConstraintBlock(1)
+        block.add(0, t_np1)
+        yield self.__matrix_family(layout, block, gp.GRB.LESS_EQUAL, T_max, '24', (np.zeros(1, dtype=np.int64),))
+
+
+    @staticmethod
+    def __distinct_triples(N: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Ordered triples (i, j, n) of distinct real customers, in the row order of constraint 19
+        c = np.arange(1, N + 1)
+        distinct = (
+            (c[:, None, None] != c[None, :, None])
+            & (c[:, None, None] != c[None, None, :])
+            & (c[None, :, None] != c[None, None, :])
+        )
+        i_triple, j_triple, n_triple = np.nonzero(distinct)
+
+        return i_triple + 1, j_triple + 1, n_triple + 1
+
+
+    @staticmethod
+    def __sparse_rho_index(data: Dict, pairs: np.ndarray) -> Tuple[np.ndarray, ...]:
+        # Dense (product, supplier, inbound dock, customer, outbound dock) position of each flow variable of the
+        # sparse index, in model order
+        F = data['inbound_docks']
+        H = data['outbound_docks']
+
+        p_rho, l_rho, i_rho = np.nonzero(admissible_flows(data, pairs))
+
+        return tuple(
+            np.broadcast_to(index, (p_rho.size, F, H)).ravel()
+            for index in (
+                p_rho[:, None, None], l_rho[:, None, None], np.arange(F)[None, :, None],
+                i_rho[:, None, None] + 1, np.arange(H)[None, None, :]
+            )
+        )
+
+
+    @staticmethod
+    def __aggregate_flow_index(data: Dict, pairs: Optional[np.ndarray]) -> Dict[str, Tuple[np.ndarray, ...]]:
+        # Dense (product, supplier, customer) position of each product flow and (supplier, inbound dock,
+        # customer, outbound dock) position of each volume flow, in model order; only real customers are indexed,
+        # over every combination when pairs is None and over the admissible flows otherwise
+        P = data['number_of_products']
+        S = data['number_of_suppliers']
+        F = data['inbound_docks']
+        H = data['outbound_docks']
+        N = data['number_of_customers']
+
+        if pairs is None:
+            admissible = np.ones((P, S, N), dtype=bool)
+        else:
+            admissible = admissible_flows(data, pairs)
+
+        p_flow, l_flow, i_flow = np.nonzero(admissible)
+        l_pair, i_pair = np.nonzero(admissible.any(axis=0))
+
+        volume = tuple(
+            np.broadcast_to(index, (l_pair.size, F, H)).ravel()
+            for index in (
+                l_pair[:, None, None], np.arange(F)[None, :, None], i_pair[:, None, None] + 1,
+                np.arange(H)[None, None, :]
+            )
+        )
+
+        return {'rho_product': (p_flow, l_flow, i_flow + 1), 'rho_volume': volume}
+
+
+    @staticmethod
+    def __dense_keys(shape: Tuple[int, ...]) -> Tuple[np.ndarray, ...]:
+        # Dense position of each column of a variable block, with a single key for a scalar variable
+        if not shape:
+            return (np.zeros(1, dtype=np.int64),)
+
+        return tuple(index.ravel() for index in np.indices(shape))
+
+
+    def __incompatible_positions(self) -> np.ndarray:
+        # Dense (customers, customers) positions of the arcs and vehicle assignments between customers that cannot
+        # share a vehicle
+        C = self.__dimensions[2]
+        i_fixed, j_fixed = np.nonzero(~self.__pairs & ~np.eye(C - 2, dtype=bool))
+
+        return (i_fixed + 1) * C + j_fixed + 1
+
+
+    def __fix_incompatible(self):
+        # The arcs and vehicle assignments between customers that cannot share a vehicle are kept as columns, so
+        # the variables keep their dense layout, but fixed to zero
+        position = self.__incompatible_positions()
+
+        for name in ['x', 'v']:
+            fixed = [self.__variables[name][k] for k in position]
+            self.model.setAttr('UB', fixed, [0.0] * len(fixed))
+
+
+    def __family_rows(self, shape: Tuple[int, ...], kept: np.ndarray) -> np.ndarray:
+        # Numbers the rows of a constraint family over its index space; the sparse flow index drops the rows left
+        # without any flow variable, which are marked with -1
+        if not self.sparse_rho:
+            return np.arange(int(np.prod(shape))).reshape(shape)
+
+        row = np.full(shape, -1, dtype=np.int64)
+        row[kept] = np.arange(np.count_nonzero(kept))
+
+        return row
+
+
+    @staticmethod
+    def __matrix_family(
+        layout: ColumnLayout,
+        block: ConstraintBlock,
+        sense: str,
+        rhs,
+        name: str,
+        keys: Tuple[np.ndarray, ...]
+    ) -> Tuple[str, Any, str, np.ndarray, Tuple[np.ndarray, ...]]:
+        rhs = np.broadcast_to(np.asarray(rhs, dtype=np.float64), (block.rows,))
+        keys = tuple(np.asarray(key, dtype=np.int64).ravel() for key in keys)
+
+        return name, block.matrix(layout.size), sense, rhs, keys
+
+
+    def __add_constrs(self, constraints, name: str):
+        self.model.addConstrs(constraints, name=name)
+        self.__record_family(name)
+
+
+    def __start_profile(self):
+        if self.__instrument:
+            self.model.update()
+
+            self.__profile_rows = self.model.NumConstrs
+            self.__profile_nonzeros = self.model.NumNZs
+            self.__profile_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        self.__profile_start = time.perf_counter()
+
+
+    def __record_family(self, name: str):
+        # Each family is charged the time since the previous one was added, which covers the work done to prepare
+        # its coefficients; without instrumentation, rows still pending in Gurobi are only counted in the total
+        # build time
+        if self.__instrument:
+            self.model.update()
+
+        profile = {'time': time.perf_counter() - self.__profile_start}
+
+        if self.__instrument:
+            memory, peak = tracemalloc.get_traced_memory()
+
+            profile['rows'] = self.model.NumConstrs - self.__profile_rows
+            profile['nonzeros'] = self.model.NumNZs - self.__profile_nonzeros
+            profile['memory'] = memory - self.__profile_memory
+            profile['peak_memory'] = peak - self.__profile_memory
+
+        self.build_profile[name] = profile
+        self.__start_profile()
+
+
+    @staticmethod
+    def __objective_terms(*terms: Tuple[np.ndarray, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        # The columns and coefficients of an objective, from the columns and coefficients of each of its terms
+        columns = [np.asarray(column, dtype=np.int64).ravel() for column, _ in terms]
+        coefficients = [
+            np.broadcast_to(np.asarray(coefficient, dtype=np.float64), column.shape)
+            for column, (_, coefficient) in zip(columns, terms)
+        ]
+
+        return np.concatenate(columns), np.concatenate(coefficients)
+
+
+    def __expression(self, columns: np.ndarray, coefficients: np.ndarray) -> gp.LinExpr:
+        # The expression of columns of the matrix form, which are numbered like the variables of every family
+        variables = [variable for name in self.__variables for variable in self.__variables[name]]
+
+        if self.backend == 'highs':
+            from cross_docking_model.highs import HighsExpr
+
+            return HighsExpr([variables[column] for column in columns.tolist()], coefficients)
+
+        return gp.LinExpr(coefficients.tolist(), [variables[column] for column in columns.tolist()])
+
+
+    def __set_objective(self, oc: gp.LinExpr, nv: gp.LinExpr, alpha: float, epsilon: float):
+        self.__oc = oc
+        self.__nv = nv
+        self.__alpha = alpha
+        self.__epsilon = epsilon
 
         if self.mode == 'single':
             self.model.setObjective(oc, gp.GRB.MINIMIZE)
@@ -395,46 +1603,1371 @@ class CrossDockingSolver:
             # self.model.setObjective(wsm_obj, gp.GRB.MINIMIZE)
 
             # Method 2
+            self.__solve_reference()
+            self.set_alpha(alpha)
+
+        elif self.mode == 'r-e':
+            self.__solve_reference()
+
+            print(self.oc_val)
+
+            self.__epsilon_constr = self.model.addConstr(oc <= (1 + epsilon) * self.oc_val, name='25')
+            self.__point = {'epsilon': epsilon}
+            self.model.setObjective(nv, gp.GRB.MINIMIZE)
+
+        elif self.mode == 'pareto':
+            # Both objectives get a bound, which stays open until a point of the front is solved
+            self.__oc_bound = self.model.addConstr(oc <= gp.GRB.INFINITY, name='oc_bound')
+            self.__nv_bound = self.model.addConstr(nv <= gp.GRB.INFINITY, name='nv_bound')
             self.model.setObjective(oc, gp.GRB.MINIMIZE)
+
+
+    def __solve_reference(self):
+        self.model.setObjective(self.__oc, gp.GRB.MINIMIZE)
+
+        # An updated model is no longer the one of its instance file, so its reference solves are not cached
+        if self.cache is not None and self.__reference_key is not None:
+            entry = self.cache.get(self.__reference_key)
+
+            if entry is not None:
+                self.oc_val = entry['objective']
+
+                # The cached incumbent is feasible for every objective, so it seeds the following solve
+                self.model.update()
+                if entry['incumbent'].size == self.model.NumVars:
+                    self.model.setAttr('Start', self.model.getVars(), entry['incumbent'].tolist())
+
+                if self.telemetry is not None:
+                    self.telemetry.start('reference')
+                    self.telemetry.finish(self.model, cached=True)
+
+                return
+
+        self.__optimize('reference')
+
+        # Without a solution there is no reference value of oc, as when an update leaves the model infeasible
+        if self.results.SolCount == 0:
+            raise ValueError(
+                f'the reference solve of oc found no solution, optimization terminated with status '
+                f'{str(self.results.Status)}'
+            )
+
+        self.oc_val = self.results.ObjVal
+        self.reference_time = self.results.Runtime
+        bound, status = self.results.ObjBound, self.results.Status
+
+        if self.decomposition:
+            self.reference_time = self.decomposition_stats['time']
+            bound, status = self.decomposition_stats['lower'], self.decomposition_stats['status']
+
+        if self.cache is not None and self.__reference_key is not None:
+            self.cache.put(
+                self.__reference_key,
+                self.oc_val,
+                bound,
+                status,
+                np.array(self.results.getAttr('X', self.model.getVars()))
+            )
+
+
+    def set_alpha(self, alpha: float) -> None:
+        """
+        Replaces the weighted sum objective of the 'wsm' mode, reusing the model and the reference value of oc.
+
+        Args:
+            alpha (float): The weight of the number of vehicles objective, between 0.0 and 1.0.
+
+        Raises:
+            ValueError: If the solver is not in 'wsm' mode or alpha is out of range.
+        """
+        if self.mode != 'wsm':
+            raise ValueError(f'alpha can only be set in wsm mode: {self.mode}')
+
+        self.__check_alpha(alpha)
+
+        wsm_obj = ((1 - alpha) * self.__oc) + (alpha * 0.1 * self.oc_val * self.__nv)
+        self.model.setObjective(wsm_obj, gp.GRB.MINIMIZE)
+        self.__alpha = alpha
+        self.__point = {'alpha': alpha}
+
+
+    def set_epsilon(self, epsilon: float) -> None:
+        """
+        Updates the right-hand side of constraint 25 of the 'r-e' mode, reusing the model and the reference value
+        of oc.
+
+        Args:
+            epsilon (float): The allowed relative deterioration of oc, greater than or equal to 0.
+
+        Raises:
+            ValueError: If the solver is not in 'r-e' mode or epsilon is negative.
+        """
+        if self.mode != 'r-e':
+            raise ValueError(f'epsilon can only be set in r-e mode: {self.mode}')
+
+        self.__check_epsilon(epsilon)
+
+        self.__epsilon_constr.RHS = (1 + epsilon) * self.oc_val
+        self.__epsilon = epsilon
+        self.__point = {'epsilon': epsilon}
+
+
+    def sweep(self, values: List[float], warm_start: bool = True) -> Iterator[float]:
+        """
+        Re-optimizes the model once per alpha ('wsm' mode) or epsilon ('r-e' mode) value. The model and the
+        reference solve of oc are shared by every point of the sweep.
+
+        With warm_start, the values are solved in ascending order so neighbouring points are adjacent, and the
+        assignment, sequencing and routing decisions of each point are the MIP start of the next one. Ascending
+        epsilons also keep every previous solution feasible for the next, looser, constraint 25.
+
+        Args:
+            values (List[float]): The alpha or epsilon values to solve, in order unless warm_start is set.
+            warm_start (bool): Whether to chain the incumbent of each point into the next one.
+
+        Yields:
+            float: Each value, after the model has been solved for it.
+
+        Raises:
+            ValueError: If the solver is not in 'wsm' or 'r-e' mode.
+        """
+        if self.mode not in ['wsm', 'r-e']:
+            raise ValueError(f'sweeps are only available in wsm and r-e modes: {self.mode}')
+
+        if warm_start:
+            values = sorted(values)
+
+        for value in values:
+            if warm_start:
+                self.__warm_start()
+
+            if self.mode == 'wsm':
+                self.set_alpha(value)
+            else:
+                self.set_epsilon(value)
+
+            self.solve()
+
+            yield value
+
+
+    def solve_scenarios(self, values: List[float]) -> Iterator[float]:
+        """
+        Solves every alpha of the 'wsm' mode in a single optimization, as the objective scenarios of a Gurobi
+        multi-scenario model. The weightings only change objective coefficients, so presolve, cuts and the search
+        tree are shared by all of them.
+
+        Args:
+            values (List[float]): The alpha values to solve, one scenario each.
+
+        Yields:
+            float: Each alpha value, in order, while `print_solution` reports the solution of its scenario.
+
+        Raises:
+            ValueError: If the solver is not in 'wsm' mode, solves by decomposition or with HiGHS, or an alpha is out
+                of range.
+        """
+        if self.mode != 'wsm':
+            raise ValueError(f'scenarios are only available in wsm mode: {self.mode}')
+
+        if self.backend == 'highs':
+            raise ValueError('scenarios are not available with the highs backend')
+
+        if self.decomposition:
+            raise ValueError('scenarios cannot be solved by decomposition')
+
+        for alpha in values:
+            self.__check_alpha(alpha)
+
+        oc = self.__coefficients(self.__oc)
+        nv = self.__coefficients(self.__nv)
+        variables = self.model.getVars()
+        columns = sorted(set(oc) | set(nv))
+
+        self.set_alpha(values[0])
+        self.model.NumScenarios = len(values)
+
+        for scenario, alpha in enumerate(values):
+            self.model.Params.ScenarioNumber = scenario
+            self.model.setAttr(
+                'ScenNObj',
+                [variables[column] for column in columns],
+                [
+                    (1 - alpha) * oc.get(column, 0.0) + alpha * 0.1 * self.oc_val * nv.get(column, 0.0)
+                    for column in columns
+                ]
+            )
+
+        self.__point = {'alpha': values}
+        self.solve()
+
+        try:
+            for scenario, alpha in enumerate(values):
+                self.model.Params.ScenarioNumber = scenario
+                self.__scenario = scenario
+                self.__point = {'alpha': alpha}
+
+                yield alpha
+        finally:
+            self.__scenario = None
+            self.model.NumScenarios = 0
+
+
+    @staticmethod
+    def __coefficients(expression: gp.LinExpr) -> Dict[int, float]:
+        # Sums the coefficient of each column, since an expression can hold a variable more than once
+        coefficients = {}
+
+        for position in range(expression.size()):
+            column = expression.getVar(position).index
+            coefficients[column] = coefficients.get(column, 0.0) + expression.getCoeff(position)
+
+        return coefficients
+
+
+    def frontier(self, max_solves: int = 20, tolerance: float = 0.01) -> Iterator[Dict[str, float]]:
+        """
+        Computes the Pareto front of oc and nv in 'pareto' mode, adding every new non-dominated point to `front`.
+
+        The two extreme points are solved lexicographically, oc then nv and nv then oc, which gives the ideal and
+        nadir points. The gap between them is then filled by augmented epsilon-constraint solves, alternately from
+        both of its ends: one objective is minimized, plus a small multiple of the other one, while the other one is
+        bounded just below its value at that end. Each solve either finds the next point of the front, which
+        narrows the gap, or returns the opposite end, which proves the gap holds no other point. A complete front
+        thus takes one solve per point, plus the 4 lexicographic ones and the one that closes the gap.
+
+        Args:
+            max_solves (int): The max number of optimizations, the 4 lexicographic ones included.
+            tolerance (float): The smallest difference between two points of the front, relative to the range of
+                each objective.
+
+        Yields:
+            Dict[str, float]: Each new point of the front, with its 'oc' and 'nv' values and the 'oc_bound' or
+            'nv_bound' of its solve, while the model holds its solution.
+
+        Raises:
+            ValueError: If the solver is not in 'pareto' mode, max_solves is lower than 4 or tolerance is not
+                between 0.0 and 1.0.
+        """
+        if self.mode != 'pareto':
+            raise ValueError(f'the front is only available in pareto mode: {self.mode}')
+
+        if max_solves < 4:
+            raise ValueError(f'max_solves must be an integer greater than or equal to 4: {str(max_solves)}')
+
+        if tolerance <= 0 or tolerance >= 1:
+            raise ValueError(f'tolerance must be a float between 0.0 and 1.0: {str(tolerance)}')
+
+        self.__solves = 0
+
+        extremes = []
+        for first, bound, second in [
+            (self.__oc, self.__oc_bound, self.__nv),
+            (self.__nv, self.__nv_bound, self.__oc)
+        ]:
+            point = self.__solve_lexicographic(first, bound, second)
+            if point is None:
+                return
+
+            extremes.append(point)
+            if len(extremes) == 1 or not self.front.dominates(extremes[0], point):
+                self.front.add(**point)
+                yield point
+
+        start, end = extremes
+        ranges = {'oc': end['oc'] - start['oc'], 'nv': start['nv'] - end['nv']}
+
+        if any(ranges[name] <= tolerance * max(1.0, abs(start[name])) for name in ranges):
+            return
+
+        # From the start of the gap, the next point has the least oc among the points with a lower nv, and from its
+        # end, the previous point has the least nv among the points with a lower oc
+        from_start = True
+
+        while self.__solves < max_solves:
+            if from_start:
+                point = self.__solve_point('oc', 'nv', start['nv'] - tolerance * ranges['nv'], ranges)
+            else:
+                point = self.__solve_point('nv', 'oc', end['oc'] - tolerance * ranges['oc'], ranges)
+
+            # A point that is not new can only be the opposite end, or a worse one when the solve was cut short
+            if point is None or self.front.dominates(start, point) or self.front.dominates(end, point):
+                break
+
+            self.front.add(**point)
+
+            if from_start:
+                start = point
+            else:
+                end = point
+            from_start = not from_start
+
+            yield point
+
+        self.__oc_bound.RHS = gp.GRB.INFINITY
+        self.__nv_bound.RHS = gp.GRB.INFINITY
+
+
+    def __solve_lexicographic(
+        self,
+        first: gp.LinExpr,
+        bound: gp.Constr,
+        second: gp.LinExpr
+    ) -> Optional[Dict[str, float]]:
+        # Minimizes the first objective, then the second one without letting the first get worse
+        self.__oc_bound.RHS = gp.GRB.INFINITY
+        self.__nv_bound.RHS = gp.GRB.INFINITY
+
+        self.model.setObjective(first, gp.GRB.MINIMIZE)
+        self.__point = {'lexicographic': True}
+        self.__solve_counted()
+        if self.results.SolCount == 0:
+            return None
+
+        value = self.__value(first)
+        bound.RHS = value + 1e-6 * max(1.0, abs(value))
+
+        self.model.setObjective(second, gp.GRB.MINIMIZE)
+        self.__solve_counted()
+        bound.RHS = gp.GRB.INFINITY
+        if self.results.SolCount == 0:
+            return None
+
+        return {'oc': self.__value(self.__oc), 'nv': self.__value(self.__nv)}
+
+
+    def __solve_point(
+        self,
+        objective: str,
+        bounded: str,
+        value: float,
+        ranges: Dict[str, float]
+    ) -> Optional[Dict[str, float]]:
+        # Augmented epsilon-constraint solve: the weight of the bounded objective keeps the solve from returning a
+        # weakly dominated point, and is too small to trade the minimized objective for it
+        expressions = {'oc': self.__oc, 'nv': self.__nv}
+        bounds = {'oc': self.__oc_bound, 'nv': self.__nv_bound}
+
+        bounds[objective].RHS = gp.GRB.INFINITY
+        bounds[bounded].RHS = value
+        self.model.setObjective(
+            expressions[objective] + 1e-3 * ranges[objective] / ranges[bounded] * expressions[bounded],
+            gp.GRB.MINIMIZE
+        )
+
+        self.__point = {f'{bounded}_bound': value}
+        self.__solve_counted()
+
+        if self.results.SolCount == 0:
+            return None
+
+        return {'oc': self.__value(self.__oc), 'nv': self.__value(self.__nv), f'{bounded}_bound': value}
+
+
+    def __solve_counted(self):
+        # Every solve of the front starts from the previous solution, which Gurobi repairs when a tighter bound
+        # cuts it off
+        self.__warm_start()
+        self.solve()
+        self.__solves += 1
+
+
+    def __warm_start(self):
+        # The incumbent has to be read before the objective or constraint 25 change
+        if self.results.SolCount == 0:
+            return
+
+        variables = [variable for name in self.__start_variables for variable in self.__variables[name]]
+        values = self.results.getAttr('X', variables)
+
+        self.model.NumStart = 0
+        self.model.setAttr('Start', variables, values)
+
+
+    def set_start(self, solution: Dict[str, np.ndarray]) -> None:
+        """
+        Replaces the MIP start with a solution given as dense arrays, such as the one built by
+        `heuristic.construct_solution`.
+
+        Args:
+            solution (Dict[str, np.ndarray]): The value of each variable family, indexed like the model. Families
+                that are missing are left without a start value. With aggregated flows, a dense 'rho' is turned
+                into the product and volume flows it carries.
+
+        Raises:
+            ValueError: If a family does not exist or its values do not match the size of the model.
+        """
+        self.model.update()
+        self.model.NumStart = 0
+
+        if self.aggregate_flows and 'rho' in solution:
+            solution = dict(solution)
+            rho = np.asarray(solution.pop('rho'))
+            solution['rho_product'] = rho.sum(axis=(2, 4))
+            solution['rho_volume'] = np.einsum('p,plfih->lfih', self.__volume, rho)
+
+        for name, values in solution.items():
+            if name not in self.__variables:
+                raise ValueError(f'variable family does not exist: {name}')
+
+            if name in self.__flow_index:
+                values = np.asarray(values)[self.__flow_index[name]]
+            else:
+                values = np.ravel(values)
+
+            if values.size != len(self.__variables[name]):
+                raise ValueError(f'start values do not match the size of {name}: {str(values.size)}')
+
+            self.model.setAttr('Start', self.__variables[name], values.tolist())
+
+
+    def add_customer(
+        self,
+        pallets: int,
+        products: npt.ArrayLike,
+        time_window: Tuple[int, int],
+        travel_time_to: npt.ArrayLike,
+        travel_time_from: npt.ArrayLike
+    ) -> int:
+        """
+        Adds a customer to the built model, after the last one. The incumbent is kept as the MIP start of the next
+        solve, which routes the new customer.
+
+        Args:
+            pallets (int): The number of pallets required by the customer.
+            products (npt.ArrayLike): The (products,) quantity of each product required by the customer.
+            time_window (Tuple[int, int]): The start and the end of the time window of the customer.
+            travel_time_to (npt.ArrayLike): The (customers + 2,) travel times to the customer from each node of the
+                customer index, the inbound dock first and the outbound dock last.
+            travel_time_from (npt.ArrayLike): The (customers + 2,) travel times from the customer to each node.
+
+        Returns:
+            int: The position of the customer in the customer index, from 1.
+
+        Raises:
+            ValueError: If a value is negative or not an integer, the time window ends before it starts or an array
+                does not have one value per product or per node.
+        """
+        data = dict(self.__data)
+        N = data['number_of_customers']
+
+        pallets = self.__check_values(pallets, (), 'pallets')
+        products = self.__check_values(products, (data['number_of_products'],), 'products')
+        start, end = self.__check_time_window(time_window)
+        travel_time_to = self.__check_values(travel_time_to, (N + 2,), 'travel_time_to', integer=False)
+        travel_time_from = self.__check_values(travel_time_from, (N + 2,), 'travel_time_from', integer=False)
+
+        # The customer takes the place of the outbound dock, which stays the last node
+        travel_time = np.insert(data['travel_time'], N + 1, travel_time_to, axis=1)
+        data['travel_time'] = np.insert(travel_time, N + 1, np.insert(travel_time_from, N + 1, 0.0), axis=0)
+        data['number_of_customers'] = N + 1
+        data['quantity_of_required_pallets_per_customer'] = np.append(
+            data['quantity_of_required_pallets_per_customer'], pallets
+        )
+        data['quantity_of_required_products_per_customer'] = np.append(
+            data['quantity_of_required_products_per_customer'], products[:, None], axis=1
+        )
+        data['time_window_start'] = np.insert(data['time_window_start'], N + 1, start)
+        data['time_window_end'] = np.insert(data['time_window_end'], N + 1, end)
+
+        ids = np.insert(self.__customer_ids, N + 1, self.__customer_ids.max() + 1)
+        self.__update(data, ids)
+
+        return N + 1
+
+
+    def remove_customer(self, customer: int, loads: Optional[npt.ArrayLike] = None) -> None:
+        """
+        Removes a customer from the built model, with its variables and rows. The customers after it move one
+        position down. The incumbent is kept as the MIP start of the next solve, except for the vehicle that
+        served the customer and the decisions of the suppliers whose loads change, which are routed again.
+
+        Every inbound load is shipped in full (constraint 9), so the model stays feasible only if the loads still
+        hold exactly the products required by the remaining customers. The demand of the customer is therefore
+        taken off the loads in the same update, through the loads argument.
+
+        Args:
+            customer (int): The position of the customer in the customer index, from 1.
+            loads (Optional[npt.ArrayLike]): The (products, suppliers) quantity of each product in each inbound
+                load once the customer is removed, unchanged when omitted.
+
+        Raises:
+            ValueError: If the customer does not exist or is the only one, a load is negative or not an integer,
+                or the loads of a product no longer add up to the demand of the remaining customers.
+        """
+        self.__check_customer(customer)
+
+        data = dict(self.__data)
+        N = data['number_of_customers']
+
+        if N == 1:
+            raise ValueError('the only customer cannot be removed')
+
+        suppliers = ()
+        if loads is not None:
+            loads = self.__check_values(loads, data['number_of_each_product_into_inbound_loads'].shape, 'loads')
+            changed = np.any(loads != data['number_of_each_product_into_inbound_loads'], axis=0)
+            suppliers = tuple(np.flatnonzero(changed).tolist())
+            data['number_of_each_product_into_inbound_loads'] = loads
+
+        data['travel_time'] = np.delete(np.delete(data['travel_time'], customer, axis=0), customer, axis=1)
+        data['number_of_customers'] = N - 1
+        data['quantity_of_required_pallets_per_customer'] = np.delete(
+            data['quantity_of_required_pallets_per_customer'], customer - 1
+        )
+        data['quantity_of_required_products_per_customer'] = np.delete(
+            data['quantity_of_required_products_per_customer'], customer - 1, axis=1
+        )
+        data['time_window_start'] = np.delete(data['time_window_start'], customer)
+        data['time_window_end'] = np.delete(data['time_window_end'], customer)
+
+        supplied = data['number_of_each_product_into_inbound_loads'].sum(axis=1)
+        required = data['quantity_of_required_products_per_customer'].sum(axis=1)
+        unbalanced = np.flatnonzero(supplied != required)
+        if unbalanced.size > 0:
+            raise ValueError(
+                f'the loads of products {unbalanced.tolist()} would no longer match the demand of the customers: '
+                f'{supplied[unbalanced].tolist()} supplied, {required[unbalanced].tolist()} required; pass the loads '
+                f'without the demand of customer {str(customer)}'
+            )
+
+        self.__update(data, np.delete(self.__customer_ids, customer), customers=(customer,), suppliers=suppliers)
+
+
+    def set_demand(
+        self,
+        customer: int,
+        products: Optional[npt.ArrayLike] = None,
+        pallets: Optional[int] = None
+    ) -> None:
+        """
+        Changes the products or the pallets required by a customer of the built model. The incumbent is kept as
+        the MIP start of the next solve, except for the vehicle that serves the customer, which is routed again.
+
+        Args:
+            customer (int): The position of the customer in the customer index, from 1.
+            products (Optional[npt.ArrayLike]): The (products,) quantity of each product required by the customer,
+                unchanged when omitted.
+            pallets (Optional[int]): The number of pallets required by the customer, unchanged when omitted.
+
+        Raises:
+            ValueError: If the customer does not exist, or a value is negative or not an integer.
+        """
+        self.__check_customer(customer)
+
+        data = dict(self.__data)
+
+        if products is not None:
+            products = self.__check_values(products, (data['number_of_products'],), 'products')
+            demand = data['quantity_of_required_products_per_customer'].copy()
+            demand[:, customer - 1] = products
+            data['quantity_of_required_products_per_customer'] = demand
+
+        if pallets is not None:
+            pallets = self.__check_values(pallets, (), 'pallets')
+            required = data['quantity_of_required_pallets_per_customer'].copy()
+            required[customer - 1] = pallets
+            data['quantity_of_required_pallets_per_customer'] = required
+
+        self.__update(data, self.__customer_ids, customers=(customer,))
+
+
+    def set_time_window(self, customer: int, time_window: Tuple[int, int]) -> None:
+        """
+        Changes the time window of a customer of the built model. The windows are soft, so the whole incumbent is
+        kept as the MIP start of the next solve.
+
+        Args:
+            customer (int): The position of the customer in the customer index, from 1.
+            time_window (Tuple[int, int]): The start and the end of the time window.
+
+        Raises:
+            ValueError: If the customer does not exist, a value is negative or not an integer, or the time window
+                ends before it starts.
+        """
+        self.__check_customer(customer)
+
+        data = dict(self.__data)
+        data['time_window_start'], data['time_window_end'] = (
+            data['time_window_start'].copy(), data['time_window_end'].copy()
+        )
+        data['time_window_start'][customer], data['time_window_end'][customer] = self.__check_time_window(time_window)
+
+        self.__update(data, self.__customer_ids)
+
+
+    def set_supplier_load(
+        self,
+        supplier: int,
+        products: Optional[npt.ArrayLike] = None,
+        processing_time: Optional[int] = None
+    ) -> None:
+        """
+        Changes the inbound load of a supplier of the built model. The incumbent is kept as the MIP start of the
+        next solve, except for the dock, the unloading order and the customers of the supplier.
+
+        Args:
+            supplier (int): The position of the supplier in the supplier index, from 0.
+            products (Optional[npt.ArrayLike]): The (products,) quantity of each product in the load, unchanged when
+                omitted.
+            processing_time (Optional[int]): The processing time of the load, unchanged when omitted.
+
+        Raises:
+            ValueError: If the supplier does not exist, or a value is negative or not an integer.
+        """
+        data = dict(self.__data)
+
+        if supplier < 0 or supplier >= data['number_of_suppliers']:
+            raise ValueError(f'supplier does not exist: {str(supplier)}')
+
+        if products is not None:
+            products = self.__check_values(products, (data['number_of_products'],), 'products')
+            loads = data['number_of_each_product_into_inbound_loads'].copy()
+            loads[:, supplier] = products
+            data['number_of_each_product_into_inbound_loads'] = loads
+
+        if processing_time is not None:
+            processing_time = self.__check_values(processing_time, (), 'processing_time')
+            processing = data['processing_time_for_inbound_load'].copy()
+            processing[supplier] = processing_time
+            data['processing_time_for_inbound_load'] = processing
+
+        self.__update(data, self.__customer_ids, suppliers=(supplier,))
+
+
+    def __check_customer(self, customer: int):
+        if customer < 1 or customer > self.__data['number_of_customers']:
+            raise ValueError(f'customer does not exist: {str(customer)}')
+
+
+    @staticmethod
+    def __check_values(values: npt.ArrayLike, shape: Tuple[int, ...], name: str, integer: bool = True) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+
+        if values.shape != shape:
+            raise ValueError(f'{name} must have shape {str(shape)}: {str(values.shape)}')
+
+        if np.any(values < 0):
+            raise ValueError(f'{name} must not be negative: {str(values)}')
+
+        if integer and np.any(values != np.trunc(values)):
+            raise ValueError(f'{name} must be integers: {str(values)}')
+
+        return values.astype(np.int64) if integer else values
+
+
+    def __check_time_window(self, time_window: Tuple[int, int]) -> Tuple[int, int]:
+        start, end = self.__check_values(time_window, (2,), 'time_window').tolist()
+
+        if start > end:
+            raise ValueError(f'time_window must not end before it starts: {str(time_window)}')
+
+        return start, end
+
+
+    def __update(
+        self,
+        data: Dict,
+        ids: np.ndarray,
+        customers: Tuple[int, ...] = (),
+        suppliers: Tuple[int, ...] = ()
+    ):
+        # Turns the model into the one of the changed instance. Both instances are put in matrix form, whose rows
+        # and columns are matched by their keys, so only the rows and columns that appear or disappear are removed
+        # or added, and only the coefficients, right-hand sides and bounds that differ are changed. The incumbent
+        # becomes the MIP start, without the decisions of the vehicles of the given customers and of the given
+        # suppliers
+        start = time.perf_counter()
+
+        released = np.zeros(0, dtype=np.int64)
+        incumbent = {}
+        if self.results.SolCount > 0:
+            incumbent = {
+                name: np.array(self.results.getAttr('X', self.__variables[name])) for name in self.__start_variables
+            }
+            released = self.__vehicle_ids(incumbent, customers)
+
+        self.__release_bounds()
+        self.model.update()
+
+        if self.__form is None:
+            self.__form = self.__collect_form(self.__data, self.__customer_ids)
+            self.__constraints = self.__family_constraints(self.__form)
+
+        old = self.__form
+        old_variables = self.__variables
+
+        # The constants of the formulation follow the instance
+        self.__data = data
+        self.__customer_ids = ids
+        self.__dimensions = (
+            data['number_of_suppliers'],
+            data['inbound_docks'],
+            data['number_of_customers'] + 2,
+            data['outbound_docks']
+        )
+        self.__loading = (
+            data['quantity_of_required_pallets_per_customer'],
+            data['time_to_load_one_pallet'],
+            data['changeover_time']
+        )
+        if self.eliminate_pairs:
+            self.__pairs = compatible_pairs(data)
+            self.eliminated = eliminated(data, self.sparse_rho, self.lazy, self.aggregate_flows)
+        else:
+            self.__pairs = ~np.eye(data['number_of_customers'], dtype=bool)
+        self.__big_m = big_m_values(data, tight=self.tight_big_m)
+        if self.aggregate_flows:
+            self.__volume, self.__docks = transfer_factors(data)
+        self.estimate = build_estimate(
+            data, self.builder, self.sparse_rho, self.lazy, self.eliminate_pairs, self.aggregate_flows,
+            self.tight_big_m
+        )
+
+        new = self.__collect_form(data, ids)
+
+        # Columns
+        old_columns, new_columns = self.__match_blocks(
+            old['column_starts'], old['keys'], new['column_starts'], new['keys']
+        )
+        old_vars = [variable for name in old_variables for variable in old_variables[name]]
+        variables = [None] * new['layout'].size
+        for old_column, new_column in zip(old_columns.tolist(), new_columns.tolist()):
+            variables[new_column] = old_vars[old_column]
+
+        # Rows
+        old_rows, new_rows = self.__match_blocks(old['row_starts'], old['rows'], new['row_starts'], new['rows'])
+        old_constrs = [constr for name in old['families'] for constr in self.__constraints[name]]
+        constrs = [None] * new['matrix'].shape[0]
+        for old_row, new_row in zip(old_rows.tolist(), new_rows.tolist()):
+            constrs[new_row] = old_constrs[old_row]
+
+        kept_columns = np.zeros(len(old_vars), dtype=bool)
+        kept_columns[old_columns] = True
+        kept_rows = np.zeros(len(old_constrs), dtype=bool)
+        kept_rows[old_rows] = True
+        self.model.remove(
+            [old_vars[column] for column in np.flatnonzero(~kept_columns).tolist()]
+            + [old_constrs[row] for row in np.flatnonzero(~kept_rows).tolist()]
+        )
+
+        matched_columns = np.zeros(new['layout'].size, dtype=bool)
+        matched_columns[new_columns] = True
+        for name, (first, count, vtype) in new['layout'].blocks.items():
+            added = first + np.flatnonzero(~matched_columns[first:first + count])
+
+            if added.size > 0:
+                block = self.model.addMVar((added.size,), vtype=vtype, name=name).tolist()
+                for column, variable in zip(added.tolist(), block):
+                    variables[column] = variable
+
+        matched_rows = np.zeros(new['matrix'].shape[0], dtype=bool)
+        matched_rows[new_rows] = True
+        for name, first, last, sense in zip(new['families'], new['offsets'][:-1], new['offsets'][1:], new['senses']):
+            added = first + np.flatnonzero(~matched_rows[first:last])
+
+            if added.size > 0:
+                matrix = new['matrix'][added]
+                used = np.unique(matrix.indices)
+                matrix = sp.csr_matrix((matrix.data, np.searchsorted(used, matrix.indices), matrix.indptr),
+                                       shape=(added.size, used.size))
+
+                rows = self.model.addMConstr(
+                    matrix, [variables[column] for column in used.tolist()], sense, new['rhs'][added], name=name
+                )
+                for row, constr in zip(added.tolist(), rows.tolist()):
+                    constrs[row] = constr
+
+        self.model.update()
+
+        # Coefficients of the matched rows, including those of the added columns
+        column_map = np.full(old['layout'].size, -1, dtype=np.int64)
+        column_map[old_columns] = new_columns
+        kept = old['matrix'][old_rows].tocoo()
+        mapped = column_map[kept.col] >= 0
+        previous = sp.csr_matrix(
+            (kept.data[mapped], (new_rows[kept.row[mapped]], column_map[kept.col[mapped]])),
+            shape=new['matrix'].shape
+        )
+        current = sp.diags(matched_rows.astype(np.float64)) @ new['matrix']
+
+        changed = (current - previous).tocoo()
+        changed.eliminate_zeros()
+        values = np.asarray(current[changed.row, changed.col]).ravel()
+        for row, column, value in zip(changed.row.tolist(), changed.col.tolist(), values.tolist()):
+            self.model.chgCoeff(constrs[row], variables[column], value)
+
+        changed = np.flatnonzero(new['rhs'][new_rows] != old['rhs'][old_rows])
+        if changed.size > 0:
+            self.model.setAttr(
+                'RHS', [constrs[row] for row in new_rows[changed].tolist()], new['rhs'][new_rows[changed]].tolist()
+            )
+
+        # The fixed arcs and vehicle assignments are binaries, whose bounds are otherwise [0, 1]
+        fixed = np.zeros(new['layout'].size, dtype=bool)
+        fixed[new['fixed']] = True
+        was_fixed = np.zeros(new['layout'].size, dtype=bool)
+        was_fixed[column_map[old['fixed']][column_map[old['fixed']] >= 0]] = True
+        changed = np.flatnonzero(fixed != was_fixed)
+        if changed.size > 0:
+            self.model.setAttr(
+                'UB', [variables[column] for column in changed.tolist()], (~fixed[changed]).astype(np.float64).tolist()
+            )
+
+        self.__variables = {
+            name: variables[first:first + count] for name, (first, count, _) in new['layout'].blocks.items()
+        }
+        self.__constraints = {
+            name: constrs[first:last]
+            for name, first, last in zip(new['families'], new['offsets'][:-1], new['offsets'][1:])
+        }
+        self.__form = new
+        self.__reference_key = None
+
+        if self.mode == 'r-e':
+            self.model.remove(self.__epsilon_constr)
+        elif self.mode == 'pareto':
+            self.model.remove([self.__oc_bound, self.__nv_bound])
+
+        self.model.NumStart = 0
+        for name, values in incumbent.items():
+            old_keys = old['keys'][name]
+            first = old['layout'].blocks[name][0]
+            columns = column_map[first:first + values.size]
+            free = np.zeros(values.size, dtype=bool)
+            for axis in self.__customer_axes.get(name, ()):
+                free |= np.isin(old_keys[axis], released)
+            for axis in self.__supplier_axes.get(name, ()):
+                free |= np.isin(old_keys[axis], suppliers)
+            kept = (columns >= 0) & ~free
+
+            self.model.setAttr('Start', [variables[column] for column in columns[kept].tolist()], values[kept].tolist())
+
+        # The reference solve of the 'wsm' and 'r-e' modes is solved again for the new instance
+        self.front = ParetoArchive()
+        oc, nv = (self.__expression(*new['objectives'][name]) for name in ['oc', 'nv'])
+        self.update_time = time.perf_counter() - start
+        self.__set_objective(oc, nv, self.__alpha, self.__epsilon)
+        self.model.update()
+
+
+    def __vehicle_ids(self, incumbent: Dict[str, np.ndarray], customers: Tuple[int, ...]) -> np.ndarray:
+        # The ids of the customers that share a vehicle with the given ones in the incumbent
+        C = self.__dimensions[2]
+        X = incumbent['x'].reshape(C, C) > 0.5
+        V = incumbent['v'].reshape(C, C) > 0.5
+
+        customers = np.asarray(customers, dtype=np.int64)
+        leaders = np.where(X[0, customers] | ~V[customers].any(axis=1), customers, V[customers].argmax(axis=1))
+        members = np.isin(np.arange(C), leaders) | V[:, leaders].any(axis=1)
+        members[customers] = True
+
+        return self.__customer_ids[members]
+
+
+    def __collect_form(self, data: Dict, ids: np.ndarray) -> Dict[str, Any]:
+        # The whole matrix form of an instance, with the rows of every family stacked in model order
+        form = self.__matrix_form(data, self.__time_unit, ids)
+        layout, keys, fixed, objectives = next(form)
+        families, matrices, senses, rhs, rows = zip(*form)
+
+        return {
+            'layout': layout,
+            'keys': keys,
+            'fixed': fixed,
+            'objectives': objectives,
+            'families': list(families),
+            'offsets': np.cumsum([0] + [matrix.shape[0] for matrix in matrices]),
+            'matrix': sp.vstack(matrices, format='csr'),
+            'senses': list(senses),
+            'rhs': np.concatenate(rhs),
+            'rows': dict(zip(families, rows)),
+            'column_starts': {name: first for name, (first, _, _) in layout.blocks.items()},
+            'row_starts': dict(zip(families, np.cumsum([0] + [matrix.shape[0] for matrix in matrices[:-1]])))
+        }
+
+
+    def __family_constraints(self, form: Dict[str, Any]) -> Dict[str, List[gp.Constr]]:
+        # The rows of each constraint family of the model, in the order of the matrix form
+        constraints = {name: [] for name in form['families']}
+
+        for constr in self.model.getConstrs():
+            name = constr.ConstrName.split('[')[0]
+
+            if name in constraints:
+                constraints[name].append(constr)
+
+        for name, first, last in zip(form['families'], form['offsets'][:-1], form['offsets'][1:]):
+            if len(constraints[name]) != last - first:
+                raise ValueError(f'the rows of family {name} do not match its matrix form: {len(constraints[name])}')
+
+        return constraints
+
+
+    @staticmethod
+    def __match_blocks(
+        old_starts: Dict[str, int],
+        old_keys: Dict[str, Tuple[np.ndarray, ...]],
+        new_starts: Dict[str, int],
+        new_keys: Dict[str, Tuple[np.ndarray, ...]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # The global positions in both forms of the columns or rows whose block and key are found in both
+        old_positions, new_positions = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+
+        for name in new_starts:
+            if name in old_starts:
+                old_matched, new_matched = match_keys(old_keys[name], new_keys[name])
+                old_positions.append(old_starts[name] + old_matched)
+                new_positions.append(new_starts[name] + new_matched)
+
+        return np.concatenate(old_positions), np.concatenate(new_positions)
+
+
+    def solve(self) -> None:
+        # Reopen the log file, since it may have been moved away after the previous solve; HiGHS opens it anew in
+        # every solve
+        if self.backend == 'gurobi':
+            log_file = self.model.Params.LogFile
+            self.model.Params.LogFile = ''
+            self.model.Params.LogFile = log_file
+
+        self.__optimize('final')
+
+
+    def __optimize(self, phase: str):
+        if self.backend == 'highs':
+            if self.telemetry is not None:
+                self.telemetry.start(phase, **self.__point)
+
+            self.results = self.__highs.optimize(self.model)
+
+            if self.telemetry is not None:
+                self.telemetry.finish(self.results)
+
+        elif self.decomposition:
+            self.__decompose(phase)
+
+        # The callback is only installed when it has something to do, so plain solves pay no overhead
+        elif self.telemetry is None and not self.lazy:
             self.model.optimize()
-            oc_val = self.model.objVal
 
-            wsm_obj = ((1 - alpha) * oc) + (alpha * 0.1 * oc_val * nv)
-            self.model.setObjective(wsm_obj, gp.GRB.MINIMIZE)
+        else:
+            if self.telemetry is not None:
+                self.telemetry.start(phase, **self.__point)
+
+            self.model.optimize(self.__callback)
+
+            if self.telemetry is not None:
+                self.telemetry.finish(self.model)
+
+        if self.pool_solutions > 0:
+            self.__harvest(phase)
+
+
+    def __harvest(self, phase: str):
+        # Every solution of the pool is feasible, so its objectives are a point of the front or dominated by one
+        oc = self.__coefficients(self.__oc)
+        nv = self.__coefficients(self.__nv)
+        variables = self.model.getVars()
+        columns = sorted(set(oc) | set(nv))
+        selected = [variables[column] for column in columns]
+
+        solutions = []
+        if self.model.NumScenarios > 0:
+            for scenario in range(self.model.NumScenarios):
+                self.model.Params.ScenarioNumber = scenario
+                solutions.append(({'scenario': scenario}, self.model.getAttr('ScenNX', selected)))
+        else:
+            for number in range(self.model.SolCount):
+                self.model.Params.SolutionNumber = number
+                solutions.append(({}, self.model.getAttr('Xn', selected)))
+
+        for tags, values in solutions:
+            self.front.add(
+                self.__oc.getConstant() + sum(oc.get(column, 0.0) * value for column, value in zip(columns, values)),
+                self.__nv.getConstant() + sum(nv.get(column, 0.0) * value for column, value in zip(columns, values)),
+                source='pool',
+                phase=phase,
+                **tags
+            )
+
+
+    def __value(self, expression: gp.LinExpr) -> float:
+        if self.backend == 'highs':
+            return self.results.getValue(expression)
+
+        return expression.getValue()
+
+
+    def __callback(self, model: gp.Model, where: int):
+        # Lazy constraints go first, so the telemetry never reports a solution they cut off as an incumbent
+        if where == gp.GRB.Callback.MIPSOL and self.lazy:
+            if self.__separate(model, self.__variables, self.lazy):
+                return
+
+        if self.telemetry is not None:
+            self.telemetry.callback(model, where)
+
+
+    def __decompose(self, phase: str):
+        # Logic-based Benders decomposition, solved as a single branch-and-check tree. The master problem keeps
+        # the routing and the departure times, with the dock scheduling replaced by valid bounds on them, and
+        # minimizes eta. Each routing it finds is priced by the full model with x and v fixed, the scheduling
+        # subproblem, and is cut off while eta is below the price. The best priced routing is the upper bound
+        # and the bound of the master the lower bound.
+        self.__release_bounds()
+
+        variables = self.model.getVars()
+        lower = self.model.getAttr('LB', variables)
+        upper = self.model.getAttr('UB', variables)
+        output_flag = self.model.Params.OutputFlag
+        time_limit = self.model.Params.TimeLimit
+
+        master = self.__master_problem()
+
+        self.__routings = {}
+        self.__incumbent = None
+        self.__time_limit = time_limit
+        self.model.Params.OutputFlag = 0
+
+        if self.telemetry is not None:
+            self.telemetry.start(phase, **self.__point)
+
+        try:
+            master.optimize(self.__decomposition_callback)
+        finally:
+            self.model.setAttr('LB', variables, lower)
+            self.model.setAttr('UB', variables, upper)
+            self.model.Params.OutputFlag = output_flag
+            self.model.Params.TimeLimit = time_limit
+
+        if self.telemetry is not None:
+            self.telemetry.finish(master)
+
+        self.decomposition_stats = {
+            'lower': master.ObjBound,
+            'upper': self.__incumbent[0] if self.__incumbent is not None else None,
+            'status': master.Status,
+            'routings': len(self.__routings),
+            'time': master.Runtime
+        }
+        master.dispose()
+
+        # The best priced solution is loaded back by fixing every variable to it, until the next solve
+        if self.__incumbent is not None:
+            values = self.__incumbent[1]
+            self.model.setAttr('LB', variables, values)
+            self.model.setAttr('UB', variables, values)
+            self.__fixed_bounds = (lower, upper)
+            self.model.optimize()
 
-        elif self.mode == 'r-e':
-            self.model.setObjective(oc, gp.GRB.MINIMIZE)
+
+    def __release_bounds(self):
+        if self.__fixed_bounds is None:
+            return
+
+        variables = self.model.getVars()
+        self.model.setAttr('LB', variables, self.__fixed_bounds[0])
+        self.model.setAttr('UB', variables, self.__fixed_bounds[1])
+        self.model.update()
+        self.__fixed_bounds = None
+
+
+    def __master_problem(self) -> gp.Model:
+        self.model.update()
+        master = self.model.copy()
+        master_variables = master.getVars()
+
+        master.setAttr('Start', master_variables, self.model.getAttr('Start', self.model.getVars()))
+
+        self.__master_variables = {
+            name: [master_variables[variable.index] for variable in variables]
+            for name, variables in self.__variables.items()
+            if name in self.__routing_variables
+        }
+
+        master.remove([
+            constr for constr in master.getConstrs() if constr.ConstrName.split('[')[0] in self.__scheduling_families
+        ])
+        master.remove([
+            master_variables[variable.index]
+            for name, variables in self.__variables.items()
+            if name not in self.__routing_variables
+            for variable in variables
+        ])
+
+        self.__eta = master.addVar(lb=-gp.GRB.INFINITY, name='eta', vtype=gp.GRB.CONTINUOUS)
+        master.addConstr(self.__eta >= master.getObjective(), name='eta')
+        master.setObjective(self.__eta, gp.GRB.MINIMIZE)
+
+        self.__add_departure_bounds(master)
+
+        master.Params.LazyConstraints = 1
+
+        return master
+
+
+    def __add_departure_bounds(self, master: gp.Model):
+        # Without the scheduling, a leader still departs after its pallets are loaded, and the vehicles sharing an
+        # outbound dock are loaded one after the other with a changeover in between, so the last departure is at
+        # least the average work of the docks
+        S, F, C, H = self.__dimensions
+        Q, LT, CT_ = self.__loading
+        x, v = self.__master_variables['x'], self.__master_variables['v']
+        dt, dt_max = self.__master_variables['dt'], self.__master_variables['dt_max'][0]
+
+        loads = {
+            i: Q[i - 1] * x[i] + gp.quicksum(
+                Q[j - 1] * v[j * C + i] for j in range(1, C - 1) if j != i if self.__pairs[j - 1, i - 1]
+            )
+            for i in range(1, C - 1)
+        }
+
+        master.addConstrs((dt[i] >= LT * loads[i] for i in loads), name='departure_bound')
+        master.addConstr(
+            H * dt_max >= LT * float(np.sum(Q)) + CT_ * (gp.quicksum(x[i] for i in loads) - H),
+            name='makespan_bound'
+        )
+
+
+    def __decomposition_callback(self, model: gp.Model, where: int):
+        if where == gp.GRB.Callback.MIPSOL:
+            if '19' in self.lazy and self.__separate(model, self.__master_variables, ['19']):
+                return
+
+            if self.__check_routing(model):
+                return
+
+        if self.telemetry is not None:
+            self.telemetry.callback(model, where)
+
+
+    def __check_routing(self, model: gp.Model) -> bool:
+        # Prices the routing of a new master solution, returning whether a cut was added because eta is below it
+        S, F, C, H = self.__dimensions
+        x = self.__master_variables['x']
+        X = self.__solution(model, self.__master_variables, 'x', (C, C)).ravel()
+        V = self.__solution(model, self.__master_variables, 'v', (C, C)).ravel()
+        key = tuple(np.flatnonzero(X))
+
+        if key not in self.__routings:
+            self.__routings[key] = self.__price_routing(X, V, model.cbGet(gp.GRB.Callback.RUNTIME))
+            self.__report_bounds(model)
+
+        price = self.__routings[key]
+        eta = model.cbGet(gp.GRB.Callback.MIPSOL_OBJ)
+
+        if eta >= price - 1e-6 * max(1.0, abs(price)):
+            return False
+
+        # Every customer has one successor, so a routing that keeps all the arcs of this one is this one. The
+        # objective is never negative, so the cut is void for any other routing
+        arcs = gp.quicksum(x[k] for k in key)
+        if np.isinf(price):
+            model.cbLazy(arcs <= len(key) - 1)
+        else:
+            model.cbLazy(self.__eta >= price * (arcs - len(key) + 1))
+
+        return True
+
+
+    def __price_routing(self, X: np.ndarray, V: np.ndarray, elapsed: float) -> float:
+        # Solves the scheduling subproblem of a routing, returning a lower bound on its objective, or infinity when
+        # no schedule fits it
+        routing = self.__variables['x'] + self.__variables['v']
+        values = np.concatenate([X, V]).astype(np.float64).tolist()
+
+        self.model.setAttr('LB', routing, values)
+        self.model.setAttr('UB', routing, values)
+        self.model.Params.TimeLimit = max(0.0, self.__time_limit - elapsed)
+
+        if self.lazy:
+            self.model.optimize(self.__separation_callback)
+        else:
             self.model.optimize()
-            oc_val = self.model.objVal
 
-            print(oc_val)
+        if self.model.Status in [gp.GRB.INFEASIBLE, gp.GRB.INF_OR_UNBD]:
+            return float('inf')
 
-            self.model.addConstr(oc <= (1 + epsilon) * oc_val, name='25')
-            self.model.setObjective(nv, gp.GRB.MINIMIZE)
+        if self.model.SolCount > 0 and (self.__incumbent is None or self.model.ObjVal < self.__incumbent[0]):
+            self.__incumbent = (self.model.ObjVal, self.model.getAttr('X', self.model.getVars()))
 
+        return self.model.ObjBound
+
+
+    def __separation_callback(self, model: gp.Model, where: int):
+        if where == gp.GRB.Callback.MIPSOL:
+            self.__separate(model, self.__variables, self.lazy)
 
-    def solve(self) -> None:
-        self.model.optimize()
+
+    def __report_bounds(self, model: gp.Model):
+        elapsed = model.cbGet(gp.GRB.Callback.RUNTIME)
+        bound = model.cbGet(gp.GRB.Callback.MIPSOL_OBJBND)
+        incumbent = self.__incumbent[0] if self.__incumbent is not None else None
+
+        if self.telemetry is not None:
+            self.telemetry.bounds(elapsed, incumbent, bound, len(self.__routings))
+
+        # The master has no bound until its root relaxation is solved
+        report = f'Decomposition {elapsed:.2f}s: {len(self.__routings)} routings'
+        if abs(bound) < gp.GRB.INFINITY:
+            report += f', lower bound {bound:.4f}'
+        if incumbent is not None:
+            report += f', upper bound {incumbent:.4f}'
+        if incumbent is not None and abs(bound) < gp.GRB.INFINITY and incumbent != 0:
+            report += f', gap {abs(incumbent - bound) / abs(incumbent):.2%}'
+
+        print(report)
+
+
+    def __solution(
+        self,
+        model: gp.Model,
+        variables: Dict[str, List[gp.Var]],
+        name: str,
+        shape: Tuple[int, ...]
+    ) -> np.ndarray:
+        return np.array(model.cbGetSolution(variables[name])).reshape(shape) > 0.5
+
+
+    def __separate(self, model: gp.Model, variables: Dict[str, List[gp.Var]], families: List[str]) -> bool:
+        # Adds the rows of the lazy families violated by a new solution, returning whether any was added
+        S, F, C, H = self.__dimensions
+        x, v = variables['x'], variables['v']
+        added = False
+
+        if '19' in families:
+            X = self.__solution(model, variables, 'x', (C, C))[1:-1, 1:-1]
+            V = self.__solution(model, variables, 'v', (C, C))[1:-1, 1:-1]
+
+            # v[i, j] >= v[n, j] - (1 - x[i, n]), indexed [i, n, j]
+            violated = X[:, :, None] & V[None, :, :] & ~V[:, None, :]
+            for i, n, j in zip(*np.nonzero(violated)):
+                if i == n or j == i or j == n:
+                    continue
+
+                i, n, j = i + 1, n + 1, j + 1
+                model.cbLazy(v[i * C + j] >= v[n * C + j] - (1 - x[i * C + n]))
+                added = True
+
+        # Only the real customers are sequenced on the outbound docks
+        for family, assign, order, size, docks, first, last in [
+            ('6', 'z_out', 'w_out', C, H, 1, C - 1),
+            ('sort_inbound_loads', 'z_in', 'w_in', S, F, 0, S)
+        ]:
+            if family not in families:
+                continue
+
+            Z = self.__solution(model, variables, assign, (size, docks))[first:last]
+            W = self.__solution(model, variables, order, (size, size))[first:last, first:last]
+            z, w = variables[assign], variables[order]
+
+            # w[a, b] + w[b, a] >= z[a, k] + z[b, k] - 1 for a < b sharing dock k
+            shared = (Z.astype(np.int64) @ Z.T.astype(np.int64) > 0) & ~(W | W.T)
+            for a, b in zip(*np.nonzero(np.triu(shared, 1))):
+                k = int(np.argmax(Z[a] & Z[b]))
+                a, b = a + first, b + first
+                model.cbLazy(w[a * size + b] + w[b * size + a] >= z[a * docks + k] + z[b * docks + k] - 1)
+                added = True
+
+        return added
+
+
+    def print_build_profile(self) -> None:
+        """
+        Prints the build profile of the variables and of each constraint family as a table, in the order they were
+        added. The rows, nonzeros and Python memory columns are only filled when the solver was created with
+        `instrument`, which also slows the build down while Python allocations are traced.
+        """
+        width = max([len('family')] + [len(name) for name in self.build_profile])
+
+        print(f"{'family':<{width}}  {'time (s)':>9}  {'rows':>9}  {'nonzeros':>10}  {'mem (MB)':>9}  {'peak (MB)':>9}")
+
+        for name, profile in self.build_profile.items():
+            if 'rows' in profile:
+                print(
+                    f"{name:<{width}}  {profile['time']:>9.4f}  {profile['rows']:>9}  {profile['nonzeros']:>10}  "
+                    f"{profile['memory'] / 2 ** 20:>9.2f}  {profile['peak_memory'] / 2 ** 20:>9.2f}"
+                )
+            else:
+                print(f"{name:<{width}}  {profile['time']:>9.4f}  {'-':>9}  {'-':>10}  {'-':>9}  {'-':>9}")
+
+        total = sum(profile['time'] for profile in self.build_profile.values())
+        print(f"{'total':<{width}}  {total:>9.4f}  {self.model.NumConstrs:>9}  {self.model.NumNZs:>10}")
+        print(f'Model built in {self.build_time:.4f}s with {self.model.NumVars} variables')
+
+
+    def print_elimination(self) -> None:
+        """
+        Prints how many variables were fixed or not created and how many rows were dropped by eliminating the
+        pairs of customers that cannot share a vehicle.
+        """
+        if not self.eliminate_pairs:
+            print('No pairs of customers were eliminated')
+            return
+
+        print(
+            f"Eliminated {self.eliminated['x']} arcs and {self.eliminated['v']} vehicle assignments, "
+            f"{self.eliminated['rho']} flow variables and "
+            f"{sum(self.eliminated[family] for family in ['18', '19', 'volume_of_flows'])} rows "
+            f"(18: {self.eliminated['18']}, 19: {self.eliminated['19']}, "
+            f"volume_of_flows: {self.eliminated['volume_of_flows']})"
+        )
+
+
+    def print_estimate(self) -> None:
+        """
+        Prints the estimated size and peak build memory of the formulation, and the options switched on to fit it
+        in the memory budget.
+        """
+        print(
+            f"Estimated {self.estimate['variables']} variables, {self.estimate['constraints']} rows, "
+            f"{self.estimate['nonzeros']} nonzeros and {self.estimate['memory'] / 2 ** 20:.1f} MB of build memory"
+        )
+
+        if self.downgrades:
+            print(f"Formulation downgraded to fit the memory budget: {', '.join(self.downgrades)}")
 
 
     def print_solution(self) -> None:
-        if self.model.status != gp.GRB.OPTIMAL:
-            print(f'Optimization terminated with status {str(self.model.status)}')
+        # A decomposition solve ends with every variable fixed to its best solution, so its status is the master's
+        status = self.results.Status
+        if self.decomposition and self.decomposition_stats is not None:
+            status = self.decomposition_stats['status']
+
+        if status != gp.GRB.OPTIMAL and self.results.SolCount == 0:
+            print(f'Optimization terminated with status {str(status)}')
             return
 
-        print('Optimal objective value(s):')
+        if status == gp.GRB.OPTIMAL:
+            print('Optimal objective value(s):')
+        else:
+            print(f'Best objective value(s) found, optimization terminated with status {str(status)}:')
         if self.mode == 'single':
-            print(f'Objective: {self.model.objVal:.4f}')
+            print(f'Objective: {self.results.ObjVal:.4f}')
 
         elif self.mode == 'multi':
             print(f'Objective 1: {self.model.getObjective(0).getValue():.4f}')
             print(f'Objective 2: {self.model.getObjective(1).getValue():.4f}')
 
+        elif self.mode == 'wsm' and self.__scenario is not None:
+            print(f'Objective: {self.model.ScenNObjVal:.4f}')
+
         elif self.mode == 'wsm':
-            print(f'Objective: {self.model.objVal:.4f}')
+            print(f'Objective: {self.results.ObjVal:.4f}')
 
         elif self.mode == 'r-e':
-            print(f'Objective: {self.model.objVal:.4f}')
+            print(f'Objective: {self.results.ObjVal:.4f}')
+
+        elif self.mode == 'pareto':
+            print(f'Objective 1: {self.__value(self.__oc):.4f}')
+            print(f'Objective 2: {self.__value(self.__nv):.4f}')
+
+        if self.decomposition and self.decomposition_stats is not None:
+            print(
+                f"Decomposition bounds: lower {self.decomposition_stats['lower']:.4f}, "
+                f"upper {self.model.objVal:.4f}, {self.decomposition_stats['routings']} routings priced"
+            )
 
 
     def clear(self) -> None:
@@ -0,0 +1,133 @@
+from typing import (
+    Dict,
+    List,
+    Tuple
+)
+
+import numpy as np
+import numpy.typing as npt
+import scipy.sparse as sp
+
+
+class ColumnLayout:
+    """
+    Assigns consecutive column ranges of a matrix model to named variable blocks, in the same order as the
+    variables would be created one by one.
+    """
+    size: int
+    blocks: Dict[str, Tuple[int, int, str]]
+
+    def __init__(self):
+        self.size = 0
+        self.blocks = {}
+
+    def add(self, name: str, shape: Tuple[int, ...], vtype: str) -> npt.NDArray[np.int64]:
+        """
+        Reserves the columns of a new variable block.
+
+        Args:
+            name (str): The name of the variable block.
+            shape (Tuple[int, ...]): The dense shape of the variable block.
+            vtype (str): The Gurobi type of the variables in the block.
+
+        Returns:
+            npt.NDArray[np.int64]: An array with the given shape holding the global column of each variable.
+
+        Raises:
+            ValueError: If a block with the same name already exists.
+        """
+        if name in self.blocks:
+            raise ValueError(f"Variable block already exists: {name}")
+
+        count = int(np.prod(shape, dtype=np.int64))
+        columns = np.arange(self.size, self.size + count, dtype=np.int64).reshape(shape)
+
+        self.blocks[name] = (self.size, count, vtype)
+        self.size += count
+
+        return columns
+
+
+class ConstraintBlock:
+    """
+    Accumulates the coefficients of a family of linear constraints as sparse (row, column, value) triplets.
+    """
+    rows: int
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.__row: List[npt.NDArray[np.int64]] = []
+        self.__col: List[npt.NDArray[np.int64]] = []
+        self.__val: List[npt.NDArray[np.float64]] = []
+
+    def add(self, row: npt.ArrayLike, col: npt.ArrayLike, value: npt.ArrayLike = 1.0) -> None:
+        """
+        Adds coefficients to the block. The arguments are broadcast against each other, so a single call can
+        place one term in every row of the family. Coefficients with a negative row or column are skipped.
+
+        Args:
+            row (npt.ArrayLike): The row of each coefficient.
+            col (npt.ArrayLike): The global column of each coefficient.
+            value (npt.ArrayLike): The value of each coefficient.
+        """
+        row, col, value = np.broadcast_arrays(
+            np.asarray(row, dtype=np.int64),
+            np.asarray(col, dtype=np.int64),
+            np.asarray(value, dtype=np.float64)
+        )
+        keep = (row >= 0) & (col >= 0)
+
+        self.__row.append(row[keep])
+        self.__col.append(col[keep])
+        self.__val.append(value[keep])
+
+    def matrix(self, columns: int) -> sp.csr_matrix:
+        """
+        Returns the coefficient matrix of the block. Duplicated entries are summed and zeros are dropped.
+
+        Args:
+            columns (int): The number of columns of the model.
+
+        Returns:
+            sp.csr_matrix: The coefficient matrix with one row per constraint of the family.
+        """
+        if self.__row:
+            row = np.concatenate(self.__row)
+            col = np.concatenate(self.__col)
+            val = np.concatenate(self.__val)
+        else:
+            row = col = np.empty(0, dtype=np.int64)
+            val = np.empty(0, dtype=np.float64)
+
+        matrix = sp.coo_matrix((val, (row, col)), shape=(self.rows, columns)).tocsr()
+        matrix.eliminate_zeros()
+
+        return matrix
+
+
+def match_keys(
+        old: Tuple[npt.NDArray[np.int64], ...],
+        new: Tuple[npt.NDArray[np.int64], ...]
+    ) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Matches two sets of unique non-negative keys, such as the keys of the columns of a variable block in two
+    versions of a model.
+
+    Args:
+        old (Tuple[npt.NDArray[np.int64], ...]): The first set of keys, as one array per axis.
+        new (Tuple[npt.NDArray[np.int64], ...]): The second set of keys, with the same axes.
+
+    Returns:
+        Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]: The positions in the first and in the second set of
+        every key found in both.
+    """
+    radix = tuple(int(max(a.max(initial=0), b.max(initial=0))) + 1 for a, b in zip(old, new))
+
+    _, old_positions, new_positions = np.intersect1d(
+        np.ravel_multi_index(old, radix),
+        np.ravel_multi_index(new, radix),
+        assume_unique=True,
+        return_indices=True
+    )
+
+    return old_positions.astype(np.int64), new_positions.astype(np.int64)
@@ -0,0 +1,680 @@
+import math
+import time
+
+import numpy as np
+import numpy.typing as npt
+
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    TextIO,
+    Tuple
+)
+
+from cross_docking_model.heuristic import construct_solution
+
+
+class AdaptiveLargeNeighbourhoodSearch:
+    """
+    Adaptive large neighbourhood search over the decisions of the cross-docking model, for the instances whose
+    exact model is too large to solve. It works on the data returned by `instance.read_data` and minimizes oc,
+    like the 'single' mode, with nv breaking ties.
+
+    A solution is a set of routes, one per vehicle and led by its first customer, the sequence of vehicles on every
+    outbound dock and the sequence of inbound loads on every inbound dock. Every other variable of the model
+    follows from them: loads are unloaded one after the other, vehicles are loaded in turns on the dock that
+    becomes free first and take their products from the loads unloaded first, and customers are visited as soon
+    as their time window opens.
+
+    Every iteration destroys part of the current solution and repairs it. The route operators remove customers
+    at random, by cost, by relatedness or a whole vehicle, and insert them back greedily or by regret, with the
+    cost of an insertion evaluated on its route alone. The dock operators move vehicles or inbound loads to their
+    best position, or exchange the contents of two docks. Operators are drawn with adaptive weights, and the new
+    solution is accepted by simulated annealing.
+    """
+    __destroy_operators: List[str] = ['random', 'worst', 'related', 'route', 'outbound', 'inbound']
+    __repair_operators: List[str] = ['greedy', 'regret']
+    # Scores of an operator whose solution is a new best, improves the current one or is accepted
+    __scores: Tuple[float, float, float] = (33.0, 9.0, 13.0)
+
+    time_unit: int
+    seed: int
+    segment: int
+    reaction: float
+    iterations: int = 0
+    elapsed: float = 0.0
+    best: Dict[str, float]
+    weights: Dict[str, float]
+
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        time_unit: int = 1,
+        seed: int = 0,
+        start: Optional[Dict[str, npt.NDArray[np.float64]]] = None,
+        log_file: Optional[str] = None,
+        segment: int = 100,
+        reaction: float = 0.1
+    ):
+        if time_unit <= 0:
+            raise ValueError(f'time_unit must be an integer greater than 0: {str(time_unit)}')
+
+        if segment <= 0:
+            raise ValueError(f'segment must be an integer greater than 0: {str(segment)}')
+
+        if reaction < 0 or reaction > 1:
+            raise ValueError(f'reaction must be a float between 0.0 and 1.0: {str(reaction)}')
+
+        self.time_unit = time_unit
+        self.seed = seed
+        self.segment = segment
+        self.reaction = reaction
+        self.weights = {operator: 1.0 for operator in self.__destroy_operators + self.__repair_operators}
+        self.__random = np.random.default_rng(seed)
+
+        self.__sizes = (
+            data['number_of_products'],
+            data['number_of_suppliers'],
+            data['inbound_docks'],
+            data['outbound_docks'],
+            data['number_of_customers']
+        )
+        P, S, F, H, N = self.__sizes
+        C = N + 2
+
+        self.__PT = data['processing_time_for_inbound_load'].astype(np.float64)
+        self.__R = data['number_of_each_product_into_inbound_loads'].astype(np.float64)
+        self.__D = data['quantity_of_required_products_per_customer'].astype(np.float64)
+        self.__Q = data['quantity_of_required_pallets_per_customer'].astype(np.float64)
+        self.__TR = data['transfer_time_for_each_product'].astype(np.float64)
+        self.__CAP = float(data['vehicle_capacity'])
+        self.__LT = float(data['time_to_load_one_pallet'])
+        self.__CT_ = float(data['changeover_time'])
+
+        # Routes are evaluated in plain Python, which is faster on lists than on the elements of arrays
+        self.__TT = data['travel_time'].astype(np.float64).tolist()
+        self.__A = data['time_window_start'].astype(np.float64).tolist()
+        self.__B = data['time_window_end'].astype(np.float64).tolist()
+        self.__ST = [0.0, *(self.__Q * 2).tolist(), 0.0]
+        self.__load = [0.0, *self.__Q.tolist(), 0.0]
+        self.__route_costs: Dict[Tuple[Tuple[int, ...], float], float] = {}
+
+        self.__removals_by_name = {
+            'random': self.__remove_random,
+            'worst': self.__remove_worst,
+            'related': self.__remove_related,
+            'route': self.__remove_route
+        }
+
+        # Relatedness of two customers, by travel time, opening of their time windows and pallets
+        TT = data['travel_time'].astype(np.float64)[1:-1, 1:-1]
+        A = data['time_window_start'].astype(np.float64)[1:-1]
+        self.__relatedness = (
+            TT / max(TT.max(initial=0), 1.0)
+            + np.abs(A[:, None] - A[None, :]) / max(np.ptp(A) if A.size else 0, 1.0)
+            + np.abs(self.__Q[:, None] - self.__Q[None, :]) / self.__CAP
+        )
+
+        self.__log: Optional[TextIO] = open(log_file, 'a') if log_file is not None else None
+
+        self.__current = self.__decode(start if start is not None else construct_solution(data), C)
+        self.__current_value = self.__evaluate(self.__current)
+        self.__best = self.__copy(self.__current)
+        self.__best_value = self.__current_value
+        self.best = self.__objectives(self.__best_value)
+
+        self.__write(f'Adaptive large neighbourhood search, seed {seed}')
+        self.__write(
+            f'Instance with {N} customers, {S} inbound loads, {P} products, {F} inbound and {H} outbound docks'
+        )
+        self.__write(
+            f"Initial solution: oc {self.best['oc']:.4f}, nv {self.best['nv']:.4f}, "
+            f"{len(self.__current['routes'])} vehicles"
+        )
+
+
+    def run(self, iterations: int = 1000, time_limit: float = float('inf')) -> None:
+        """
+        Runs the search from where the previous run stopped, updating `best`.
+
+        The temperature of the simulated annealing starts where a solution 5% worse than the current one is
+        accepted with probability 0.5, and cools down to 1/500 of that by the last iteration.
+
+        Args:
+            iterations (int): The max number of iterations.
+            time_limit (float): The max amount of time the search can run in seconds.
+
+        Raises:
+            ValueError: If iterations is lower than 1 or time_limit is not greater than 0.
+        """
+        if iterations < 1:
+            raise ValueError(f'iterations must be an integer greater than 0: {str(iterations)}')
+
+        if time_limit <= 0:
+            raise ValueError(f'time_limit must be a float greater than 0: {str(time_limit)}')
+
+        temperature = 0.05 * self.__current_value['oc'] / math.log(2)
+        cooling = 0.002 ** (1 / iterations)
+        scores = {operator: 0.0 for operator in self.weights}
+        uses = {operator: 0 for operator in self.weights}
+
+        self.__write(
+            f"{'Iteration':>10} {'Time':>8} {'Current oc':>12} {'Best oc':>12} {'Best nv':>10} {'Vehicles':>9}"
+        )
+        start = time.perf_counter()
+
+        for iteration in range(1, iterations + 1):
+            if time.perf_counter() - start >= time_limit:
+                break
+
+            destroy = self.__choose(self.__destroy_operators)
+            repair = None
+            candidate = self.__copy(self.__current)
+
+            if destroy == 'outbound':
+                self.__move_vehicles(candidate)
+            elif destroy == 'inbound':
+                self.__move_loads(candidate)
+            else:
+                repair = self.__choose(self.__repair_operators)
+                removed = self.__removals_by_name[destroy](candidate)
+                self.__insert(candidate, removed, regret=repair == 'regret')
+
+            # An operator that gives back the current solution, such as a dock move to the same position, is
+            # not rewarded
+            score = 0.0
+            if candidate != self.__current:
+                value = self.__evaluate(candidate)
+
+                if self.__better(value, self.__best_value):
+                    self.__best = self.__copy(candidate)
+                    self.__best_value = value
+                    self.best = self.__objectives(value)
+                    score = self.__scores[0]
+                elif value['oc'] < self.__current_value['oc']:
+                    score = self.__scores[1]
+
+                difference = value['oc'] - self.__current_value['oc']
+                if difference <= 0 or self.__random.random() < math.exp(-difference / max(temperature, 1e-12)):
+                    self.__current = candidate
+                    self.__current_value = value
+                    score = score or self.__scores[2]
+
+            for operator in [destroy, repair]:
+                if operator is not None:
+                    scores[operator] += score
+                    uses[operator] += 1
+
+            temperature *= cooling
+            self.iterations += 1
+
+            if iteration % self.segment == 0:
+                self.__update_weights(scores, uses)
+                self.__write_progress(time.perf_counter() - start)
+
+        self.elapsed += time.perf_counter() - start
+
+        self.__write(f'Stopped after {self.iterations} iterations in {self.elapsed:.2f} seconds')
+        self.__write(f"Best objective: oc {self.best['oc']:.4f}, nv {self.best['nv']:.4f}")
+        self.__write(
+            'Operator weights: ' + ', '.join(f'{operator} {weight:.3f}' for operator, weight in self.weights.items())
+        )
+        self.__write_solution()
+        if self.__log is not None:
+            self.__log.flush()
+
+
+    def solution(self) -> Dict[str, npt.NDArray[np.float64]]:
+        """
+        Returns the assignment, sequencing and routing decisions of the best solution, to be used as a MIP start
+        with `CrossDockingSolver.set_start`, which leaves the times and flows to the solver.
+
+        Returns:
+            Dict[str, npt.NDArray[np.float64]]: The 'z_in', 'z_out', 'w_in', 'w_out', 'y', 'x' and 'v' variable
+            families, as dense arrays indexed like the model.
+        """
+        _, S, F, H, N = self.__sizes
+        C = N + 2
+
+        solution = {
+            'z_in': np.zeros((S, F)),
+            'z_out': np.zeros((C, H)),
+            'w_in': np.zeros((S, S)),
+            'w_out': np.zeros((C, C)),
+            'y': np.zeros((S, C)),
+            'x': np.zeros((C, C)),
+            'v': np.zeros((C, C))
+        }
+
+        routes = self.__best['routes']
+        for route in routes:
+            solution['x'][0, route[0]] = 1
+            solution['x'][route[:-1], route[1:]] = 1
+            solution['x'][route[-1], C - 1] = 1
+            solution['v'][route[1:], route[0]] = 1
+
+        for f, sequence in enumerate(self.__best['inbound']):
+            solution['z_in'][sequence, f] = 1
+            for position, l in enumerate(sequence):
+                solution['w_in'][sequence[:position], l] = 1
+
+        for h, sequence in enumerate(self.__best['outbound']):
+            leaders = [routes[vehicle][0] for vehicle in sequence]
+            solution['z_out'][leaders, h] = 1
+            for position, i in enumerate(leaders):
+                solution['w_out'][leaders[:position], i] = 1
+
+        leaders = [route[0] for route in routes]
+        solution['y'][:, leaders] = self.__best_value['flow'].sum(axis=0) > 0
+
+        return solution
+
+
+    def print_solution(self) -> None:
+        print('Best objective value(s) found by the adaptive large neighbourhood search:')
+        print(f"Objective 1: {self.best['oc']:.4f}")
+        print(f"Objective 2: {self.best['nv']:.4f}")
+
+
+    def close(self) -> None:
+        """
+        Closes the log file.
+        """
+        if self.__log is not None:
+            self.__log.close()
+            self.__log = None
+
+
+    @staticmethod
+    def __decode(solution: Dict[str, npt.NDArray[np.float64]], C: int) -> Dict[str, List[List[int]]]:
+        # Reads the routes and dock sequences out of the dense arrays of a solution of the model
+        x = np.asarray(solution['x']) > 0.5
+        rows, columns = np.nonzero(x[1:-1])
+        successor = {int(i) + 1: int(j) for i, j in zip(rows, columns)}
+
+        routes = []
+        for leader in np.flatnonzero(x[0, 1:-1]) + 1:
+            route = [int(leader)]
+            while successor.get(route[-1], C - 1) != C - 1:
+                route.append(successor[route[-1]])
+            routes.append(route)
+
+        vehicle = {route[0]: index for index, route in enumerate(routes)}
+        z_out, w_out = np.asarray(solution['z_out']) > 0.5, np.asarray(solution['w_out'])
+        outbound = []
+        for h in range(z_out.shape[1]):
+            # The position of a vehicle is its number of predecessors on the dock
+            leaders = [int(i) for i in np.flatnonzero(z_out[:, h]) if int(i) in vehicle]
+            leaders = sorted(leaders, key=lambda i, docked=leaders: w_out[docked, i].sum())
+            outbound.append([vehicle[i] for i in leaders])
+
+        z_in, w_in = np.asarray(solution['z_in']) > 0.5, np.asarray(solution['w_in'])
+        inbound = []
+        for f in range(z_in.shape[1]):
+            loads = [int(l) for l in np.flatnonzero(z_in[:, f])]
+            inbound.append(sorted(loads, key=lambda l, docked=loads: w_in[docked, l].sum()))
+
+        return {'routes': routes, 'outbound': outbound, 'inbound': inbound}
+
+
+    @staticmethod
+    def __copy(state: Dict[str, List[List[int]]]) -> Dict[str, List[List[int]]]:
+        return {name: [list(sequence) for sequence in sequences] for name, sequences in state.items()}
+
+
+    def __evaluate(self, state: Dict[str, List[List[int]]]) -> Dict[str, Any]:
+        # Derives the times and flows of a solution and its objectives
+        P, S, F, H, N = self.__sizes
+        routes = state['routes']
+        V = len(routes)
+
+        ut = np.zeros(S)
+        dock_in = np.zeros(S, dtype=np.int64)
+        for f, sequence in enumerate(state['inbound']):
+            ut[sequence] = np.cumsum(self.__PT[sequence])
+            dock_in[sequence] = f
+
+        dock_out = np.zeros(V, dtype=np.int64)
+        position = np.zeros(V, dtype=np.int64)
+        for h, sequence in enumerate(state['outbound']):
+            dock_out[sequence] = h
+            position[sequence] = np.arange(len(sequence))
+
+        # The customers of every vehicle are contiguous in the concatenated routes
+        customers = np.fromiter((customer - 1 for route in routes for customer in route), dtype=np.int64, count=N)
+        first = np.cumsum([0] + [len(route) for route in routes[:-1]])
+        demand = np.add.reduceat(self.__D[:, customers], first, axis=1)
+        loads = np.add.reduceat(self.__Q[customers], first)
+
+        # Vehicles are loaded in turns, each one on the outbound dock that becomes free first, and every vehicle
+        # takes its products from the inbound loads unloaded first that still have them
+        loads_order = np.argsort(ut, kind='stable')
+        unloaded = ut[loads_order]
+        transfers = self.__TR[:, dock_in[loads_order], :]
+        remaining = self.__R[:, loads_order].copy()
+        flow = np.zeros((P, S, V))
+        ready = np.zeros(V)
+        departure = np.zeros(V)
+
+        free = [-math.inf] * H
+        turns = [list(reversed(sequence)) for sequence in state['outbound']]
+        while any(turns):
+            h = min((dock for dock in range(H) if turns[dock]), key=lambda dock: free[dock])
+            vehicle = turns[h].pop()
+
+            before = np.cumsum(remaining, axis=1) - remaining
+            taken = np.clip(demand[:, vehicle, None] - before, 0, remaining)
+            remaining -= taken
+            flow[:, loads_order, vehicle] = taken
+
+            used = taken.sum(axis=0) > 0
+            transfer = np.einsum('pl,pl->l', taken, transfers[:, :, h])
+            ready[vehicle] = max(0.0, float((unloaded[used] + transfer[used]).max(initial=0)))
+            departure[vehicle] = max(ready[vehicle], free[h] + self.__CT_) + self.__LT * loads[vehicle]
+            free[h] = departure[vehicle]
+        dt_max = float(departure.max(initial=0))
+
+        routing = sum(self.__route_cost(route, departure[vehicle]) for vehicle, route in enumerate(routes))
+        leading = sum(self.__load[route[0]] for route in routes)
+
+        return {
+            'oc': float(routing + self.time_unit * dt_max),
+            'nv': float(self.__CAP * V - loads.sum() + 2 * leading) / self.__CAP,
+            'dt': departure.tolist(),
+            'rt': ready.tolist(),
+            'dt_max': dt_max,
+            'flow': flow
+        }
+
+
+    def __route_cost(self, route: List[int], departure: float) -> float:
+        # Travel time plus the penalty of the visits after the time windows close; a vehicle waits for a window
+        # to open, so no visit is early. Most routes keep their departure from one evaluation to the next, so
+        # their costs are kept
+        key = (tuple(route), departure)
+        cost = self.__route_costs.get(key)
+        if cost is not None:
+            return cost
+
+        if len(self.__route_costs) >= 1_000_000:
+            self.__route_costs.clear()
+
+        TT, A, B, ST = self.__TT, self.__A, self.__B, self.__ST
+
+        previous, now, travel, late = 0, departure, 0.0, 0.0
+        for customer in route:
+            travel += TT[previous][customer]
+            now = max(now + ST[previous] + TT[previous][customer], A[customer])
+            late += max(0.0, now - B[customer])
+            previous = customer
+
+        cost = travel + TT[previous][len(TT) - 1] + self.time_unit * late
+        self.__route_costs[key] = cost
+
+        return cost
+
+
+    @staticmethod
+    def __objectives(value: Dict[str, Any]) -> Dict[str, float]:
+        return {'oc': value['oc'], 'nv': value['nv']}
+
+
+    @staticmethod
+    def __better(value: Dict[str, Any], other: Dict[str, Any]) -> bool:
+        # Lexicographic comparison, oc first, with a tolerance on both objectives
+        if abs(value['oc'] - other['oc']) > 1e-9 * max(1.0, abs(other['oc'])):
+            return value['oc'] < other['oc']
+
+        return value['nv'] < other['nv'] - 1e-9
+
+
+    def __choose(self, operators: List[str]) -> str:
+        weights = np.array([self.weights[operator] for operator in operators])
+
+        return operators[int(self.__random.choice(len(operators), p=weights / weights.sum()))]
+
+
+    def __update_weights(self, scores: Dict[str, float], uses: Dict[str, int]):
+        for operator in self.weights:
+            if uses[operator] > 0:
+                self.weights[operator] = (
+                    (1 - self.reaction) * self.weights[operator] + self.reaction * scores[operator] / uses[operator]
+                )
+                # An operator never fades away entirely
+                self.weights[operator] = max(self.weights[operator], 0.05)
+
+            scores[operator] = 0.0
+            uses[operator] = 0
+
+
+    def __removals(self) -> int:
+        # Between 10% and 40% of the customers, at least one
+        N = self.__sizes[4]
+
+        return int(self.__random.integers(max(1, N // 10), max(1, 2 * N // 5) + 1))
+
+
+    def __remove(self, state: Dict[str, List[List[int]]], customers: List[int]) -> List[int]:
+        removed = set(customers)
+        state['routes'] = [[customer for customer in route if customer not in removed] for route in state['routes']]
+
+        return list(customers)
+
+
+    def __remove_random(self, state: Dict[str, List[List[int]]]) -> List[int]:
+        N = self.__sizes[4]
+
+        return self.__remove(state, [int(i) + 1 for i in self.__random.choice(N, self.__removals(), replace=False)])
+
+
+    def __remove_worst(self, state: Dict[str, List[List[int]]]) -> List[int]:
+        # Customers whose removal saves the most on their route, picked with a bias towards the costliest
+        departure = self.__current_value['dt']
+        savings = []
+        for vehicle, route in enumerate(state['routes']):
+            cost = self.__route_cost(route, departure[vehicle])
+            for position, customer in enumerate(route):
+                rest = route[:position] + route[position + 1:]
+                shifted = departure[vehicle] - self.__LT * self.__load[customer]
+                savings.append((cost - (self.__route_cost(rest, shifted) if rest else 0.0), customer))
+
+        savings.sort(reverse=True)
+        customers = []
+        for _ in range(self.__removals()):
+            index = int(self.__random.random() ** 3 * len(savings))
+            customers.append(savings.pop(index)[1])
+
+        return self.__remove(state, customers)
+
+
+    def __remove_related(self, state: Dict[str, List[List[int]]]) -> List[int]:
+        # Customers close in space, time windows and size to the ones already removed
+        N = self.__sizes[4]
+        count = self.__removals()
+
+        customers = [int(self.__random.integers(N)) + 1]
+        remaining = [customer for customer in range(1, N + 1) if customer != customers[0]]
+        while len(customers) < count:
+            seed = customers[int(self.__random.integers(len(customers)))]
+            remaining.sort(key=lambda customer: self.__relatedness[seed - 1, customer - 1])
+            customers.append(remaining.pop(int(self.__random.random() ** 6 * len(remaining))))
+
+        return self.__remove(state, customers)
+
+
+    def __remove_route(self, state: Dict[str, List[List[int]]]) -> List[int]:
+        # A whole vehicle, favouring the emptier ones, so its customers can fill the others
+        routes = state['routes']
+        loads = np.array([sum(self.__load[customer] for customer in route) for route in routes])
+        vehicle = int(self.__random.choice(len(routes), p=(1 / loads) / (1 / loads).sum()))
+
+        return self.__remove(state, list(routes[vehicle]))
+
+
+    def __insert(self, state: Dict[str, List[List[int]]], removed: List[int], regret: bool):
+        # Inserts the removed customers one at a time. Greedy insertion takes the cheapest insertion first, and
+        # regret insertion the customer that loses the most when it does not get its best route. The cost of an
+        # insertion is evaluated on its route alone, with the departure of its vehicle delayed by the loading of
+        # the customer, so only the route that received a customer is evaluated again
+        routes = state['routes']
+        departure = list(self.__current_value['dt'])
+        dt_max = self.__current_value['dt_max']
+        ready = float(np.mean(self.__current_value['rt'])) if self.__current_value['rt'] else 0.0
+
+        costs = {customer: {} for customer in removed}
+        for customer in removed:
+            for vehicle in range(len(routes)):
+                costs[customer][vehicle] = self.__insertion(routes[vehicle], departure[vehicle], dt_max, customer)
+
+        while removed:
+            # A new vehicle goes on the outbound dock that becomes free first
+            finish = [
+                departure[sequence[-1]] + self.__CT_ if sequence else ready for sequence in state['outbound']
+            ]
+            dock = int(np.argmin(finish))
+            opened = max(finish[dock], ready)
+
+            choices = []
+            for customer in removed:
+                options = [(cost, position, vehicle) for vehicle, (cost, position) in costs[customer].items()]
+                new = opened + self.__LT * self.__load[customer]
+                options.append((
+                    self.__route_cost([customer], new) + self.time_unit * max(0.0, new - dt_max), 0, None
+                ))
+                options.sort(key=lambda option: option[0])
+
+                if regret:
+                    second = options[1][0] if len(options) > 1 else math.inf
+                    choices.append((-(second - options[0][0]), options[0][0], customer, options[0]))
+                else:
+                    choices.append((options[0][0], 0.0, customer, options[0]))
+
+            _, _, customer, (_, position, vehicle) = min(choices, key=lambda choice: choice[:2])
+            removed.remove(customer)
+            del costs[customer]
+
+            if vehicle is None:
+                vehicle = len(routes)
+                routes.append([customer])
+                state['outbound'][dock].append(vehicle)
+                departure.append(opened + self.__LT * self.__load[customer])
+            else:
+                routes[vehicle].insert(position, customer)
+                departure[vehicle] += self.__LT * self.__load[customer]
+            dt_max = max(dt_max, departure[vehicle])
+
+            for other in removed:
+                costs[other][vehicle] = self.__insertion(routes[vehicle], departure[vehicle], dt_max, other)
+
+        self.__drop_empty(state)
+
+
+    def __insertion(self, route: List[int], departure: float, dt_max: float, customer: int) -> Tuple[float, int]:
+        # Cheapest position of a customer in a route, as (cost, position); an infinite cost when it does not fit
+        if not route or sum(self.__load[other] for other in route) + self.__load[customer] > self.__CAP:
+            return math.inf, 0
+
+        delayed = departure + self.__LT * self.__load[customer]
+        base = self.__route_cost(route, departure) - self.time_unit * max(0.0, delayed - dt_max)
+
+        best = (math.inf, 0)
+        for position in range(len(route) + 1):
+            cost = self.__route_cost(route[:position] + [customer] + route[position:], delayed) - base
+            best = min(best, (cost, position))
+
+        return best
+
+
+    def __drop_empty(self, state: Dict[str, List[List[int]]]):
+        # Removes the vehicles left without customers and renumbers the others on the outbound docks
+        kept = [vehicle for vehicle, route in enumerate(state['routes']) if route]
+        number = {vehicle: index for index, vehicle in enumerate(kept)}
+
+        state['routes'] = [state['routes'][vehicle] for vehicle in kept]
+        state['outbound'] = [
+            [number[vehicle] for vehicle in sequence if vehicle in number] for sequence in state['outbound']
+        ]
+
+
+    def __move_vehicles(self, state: Dict[str, List[List[int]]]):
+        # Exchanges the vehicles of two outbound docks, or takes one or two vehicles off their docks and puts each
+        # one back at its best position
+        if self.__exchange(state['outbound']):
+            return
+
+        count = min(int(self.__random.integers(1, 3)), len(state['routes']))
+        vehicles = self.__random.choice(len(state['routes']), count, replace=False)
+        self.__reposition(state, 'outbound', [int(vehicle) for vehicle in vehicles])
+
+
+    def __move_loads(self, state: Dict[str, List[List[int]]]):
+        # Exchanges the loads of two inbound docks, or takes one or two loads off their docks and puts each one
+        # back at its best position
+        if self.__exchange(state['inbound']):
+            return
+
+        S = self.__sizes[1]
+        loads = self.__random.choice(S, min(int(self.__random.integers(1, 3)), S), replace=False)
+        self.__reposition(state, 'inbound', [int(load) for load in loads])
+
+
+    def __exchange(self, sequences: List[List[int]]) -> bool:
+        # Half of the dock moves exchange two docks, since the transfer time between two docks depends on both
+        if len(sequences) < 2 or self.__random.random() < 0.5:
+            return False
+
+        first, second = self.__random.choice(len(sequences), 2, replace=False)
+        sequences[first], sequences[second] = sequences[second], sequences[first]
+
+        return True
+
+
+    def __reposition(self, state: Dict[str, List[List[int]]], docks: str, items: List[int]):
+        # Every item is moved on its own, so the others keep their docks while its positions are evaluated
+        for item in items:
+            for sequence in state[docks]:
+                if item in sequence:
+                    sequence.remove(item)
+
+            best = None
+            for sequence in state[docks]:
+                for position in range(len(sequence) + 1):
+                    sequence.insert(position, item)
+                    value = self.__evaluate(state)
+                    sequence.pop(position)
+
+                    if best is None or self.__better(value, best[0]):
+                        best = (value, sequence, position)
+
+            best[1].insert(best[2], item)
+
+
+    def __write(self, line: str):
+        if self.__log is not None:
+            self.__log.write(line + '\n')
+
+
+    def __write_solution(self):
+        # Customers and loads are numbered like the rows of the instance, from 1
+        routes = self.__best['routes']
+        departure = self.__best_value['dt']
+
+        for h, sequence in enumerate(self.__best['outbound']):
+            for vehicle in sequence:
+                self.__write(
+                    f'Outbound dock {h + 1}: departure {departure[vehicle]:.4f}, customers '
+                    + ' '.join(str(customer) for customer in routes[vehicle])
+                )
+
+        for f, sequence in enumerate(self.__best['inbound']):
+            self.__write(f'Inbound dock {f + 1}: loads ' + ' '.join(str(load + 1) for load in sequence))
+
+
+    def __write_progress(self, elapsed: float):
+        self.__write(
+            f"{self.iterations:>10} {elapsed:>7.1f}s {self.__current_value['oc']:>12.4f} {self.best['oc']:>12.4f} "
+            f"{self.best['nv']:>10.4f} {len(self.__best['routes']):>9}"
+        )
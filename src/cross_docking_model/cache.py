@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import gurobipy as gp
+import numpy as np
+import numpy.typing as npt
+
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+from cross_docking_model.instance import hash_data
+
+
+class DiskCache:
+    """
+    Directory of cache entries keyed by the instance content and by every option that changes what is cached. An
+    entry is made of one or more files named after its key, and the least recently used entries are evicted once
+    the directory holds more than `max_bytes`.
+    """
+    directory: str
+    max_bytes: int
+
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        if max_bytes <= 0:
+            raise ValueError(f'max_bytes must be an integer greater than 0: {str(max_bytes)}')
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.directory, exist_ok=True)
+
+
+    @staticmethod
+    def key(data: Dict[str, Any], options: Dict[str, Any]) -> str:
+        """
+        Computes the cache key of an entry.
+
+        Args:
+            data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+            options (Dict[str, Any]): The options that change what is cached. The values must be JSON
+                serializable.
+
+        Returns:
+            str: The hexadecimal key of the entry.
+        """
+        digest = hashlib.sha256(hash_data(data).encode())
+        digest.update(json.dumps(options, sort_keys=True).encode())
+
+        return digest.hexdigest()
+
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Removes one entry, or every entry when no key is given.
+
+        Args:
+            key (Optional[str]): The key of the entry to remove.
+        """
+        for name in os.listdir(self.directory):
+            if key is not None and name.split('.')[0] != key:
+                continue
+
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+    def _temporary(self, suffix: str) -> Tuple[int, str]:
+        # Entries are written to a temporary file first and then renamed, so concurrent runs never read a partial
+        # entry; the suffix keeps the file format recognizable
+        return tempfile.mkstemp(dir=self.directory, prefix='partial-', suffix=suffix)
+
+
+    def _evict(self) -> None:
+        entries: Dict[str, List[float]] = {}
+
+        for name in os.listdir(self.directory):
+            if name.startswith('partial-') or name.endswith('.tmp'):
+                continue
+
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+
+            # Every file of an entry counts towards its size, and the most recent one dates it
+            key = name.split('.')[0]
+            time, size = entries.get(key, [float('-inf'), 0])
+            entries[key] = [max(time, stat.st_mtime), size + stat.st_size]
+
+        size = sum(entry[1] for entry in entries.values())
+
+        for key, (_, entry_size) in sorted(entries.items(), key=lambda entry: entry[1][0]):
+            if size <= self.max_bytes:
+                break
+
+            self.invalidate(key)
+            size -= entry_size
+
+
+class ReferenceCache(DiskCache):
+    """
+    On-disk cache of the single-objective reference solves of oc, keyed by the instance content and by every
+    option that changes the reference model. Each entry is a compressed NumPy archive holding the objective
+    value, the best bound, the solver status and the incumbent.
+    """
+
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npz')
+
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads an entry and marks it as recently used.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[Dict[str, Any]]: The 'objective', 'bound', 'status' and 'incumbent' of the reference solve,
+            or None if the entry does not exist or cannot be read.
+        """
+        path = self.__path(key)
+
+        try:
+            with np.load(path) as entry:
+                result = {
+                    'objective': float(entry['objective']),
+                    'bound': float(entry['bound']),
+                    'status': int(entry['status']),
+                    'incumbent': entry['incumbent']
+                }
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            return None
+
+        return result
+
+
+    def put(
+        self,
+        key: str,
+        objective: float,
+        bound: float,
+        status: int,
+        incumbent: npt.NDArray[np.float64]
+    ) -> None:
+        """
+        Writes an entry and evicts the least recently used entries until the cache fits in `max_bytes`. The entry
+        is written to a temporary file first, so concurrent runs never read a partial entry.
+
+        Args:
+            key (str): The key of the entry.
+            objective (float): The objective value of the incumbent.
+            bound (float): The best bound of the reference solve.
+            status (int): The Gurobi status of the reference solve.
+            incumbent (npt.NDArray[np.float64]): The value of every variable of the model, in model order.
+        """
+        fd, temporary = self._temporary('.npz')
+
+        with os.fdopen(fd, 'wb') as file:
+            np.savez_compressed(
+                file,
+                objective=objective,
+                bound=bound,
+                status=status,
+                incumbent=np.asarray(incumbent, dtype=np.float64)
+            )
+
+        os.replace(temporary, self.__path(key))
+        self._evict()
+
+
+class ModelCache(DiskCache):
+    """
+    On-disk cache of built models, keyed by the instance content and by every build option. Each entry is a
+    gzipped MPS file holding the model and a NumPy archive with the index that reattaches the handles the solver
+    keeps, such as the columns of each variable family and the coefficients of the objectives.
+    """
+
+
+    def __path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f'{key}{suffix}')
+
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, npt.NDArray[Any]]]]:
+        """
+        Finds an entry and marks it as recently used.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[Tuple[str, Dict[str, npt.NDArray[Any]]]]: The path of the model file, to be read with
+            `gp.read`, and the index, or None if the entry does not exist or cannot be read.
+        """
+        model = self.__path(key, '.mps.gz')
+        path = self.__path(key, '.npz')
+
+        try:
+            with np.load(path) as entry:
+                index = {name: entry[name] for name in entry.files}
+            os.utime(model)
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            return None
+
+        return model, index
+
+
+    def put(self, key: str, model: gp.Model, index: Dict[str, npt.NDArray[Any]]) -> None:
+        """
+        Writes an entry and evicts the least recently used entries until the cache fits in `max_bytes`. The index
+        is written last, so an entry is only found once its model file is complete.
+
+        Args:
+            key (str): The key of the entry.
+            model (gp.Model): The built model.
+            index (Dict[str, npt.NDArray[Any]]): The arrays needed to reattach the handles of the model.
+        """
+        fd, temporary = self._temporary('.mps.gz')
+        os.close(fd)
+
+        model.write(temporary)
+        os.replace(temporary, self.__path(key, '.mps.gz'))
+
+        fd, temporary = self._temporary('.npz')
+
+        with os.fdopen(fd, 'wb') as file:
+            np.savez_compressed(file, **index)
+
+        os.replace(temporary, self.__path(key, '.npz'))
+        self._evict()
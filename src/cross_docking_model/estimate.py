@@ -0,0 +1,397 @@
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from cross_docking_model.preprocessing import (
+    admissible_flows,
+    big_m_values,
+    compatible_pairs,
+    transfer_factors
+)
+
+
+# Peak resident memory of a build, in bytes: a fixed part and a part per variable, per row and per nonzero, fitted
+# on builds of instances with 5 to 50 customers for each builder, within 10% of the measured memory from 25 customers
+MEMORY_FACTORS: Dict[str, Tuple[float, float, float, float]] = {
+    'quicksum': (3.2e6, 0.0, 84.0, 142.0),
+    'matrix': (3.8e6, 145.0, 161.0, 77.0)
+}
+
+# Formulation options switched on, in order, when a build does not fit its memory budget; each one solves the same
+# problem with fewer variables, rows or Python objects
+DOWNGRADES: List[Tuple[str, Dict[str, Any]]] = [
+    ('sparse_rho', {'sparse_rho': True}),
+    ('aggregate_flows', {'aggregate_flows': True}),
+    ('eliminate_pairs', {'eliminate_pairs': True}),
+    ('matrix', {'builder': 'matrix'}),
+    ('lazy', {'lazy': ['19', '6', 'sort_inbound_loads']})
+]
+
+
+def model_size(
+        data: Dict[str, Any],
+        sparse_rho: bool = False,
+        lazy: Optional[List[str]] = None,
+        eliminate_pairs: bool = False,
+        aggregate_flows: bool = False,
+        tight_big_m: bool = True
+    ) -> Dict[str, int]:
+    """
+    Counts the variables, linear constraints and nonzeros of the model built by `CrossDockingSolver`, without
+    building it.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        sparse_rho (bool): Whether the flow variables are only created over the admissible flow index.
+        lazy (Optional[List[str]]): The constraint families left out of the model and separated lazily.
+        eliminate_pairs (bool): Whether the pairs of customers that cannot share a vehicle are eliminated.
+        aggregate_flows (bool): Whether the flows are split into product flows and volume flows between docks.
+        tight_big_m (bool): Whether the big-M constants are derived from the instance, since a constant of zero
+            leaves its coefficient out of the matrix.
+
+    Returns:
+        Dict[str, int]: The number of 'variables', 'constraints' and 'nonzeros' of the model, before the bounds
+        added by the 'r-e' and 'pareto' modes.
+    """
+    S = data['number_of_suppliers']
+    F = data['inbound_docks']
+    H = data['outbound_docks']
+    C = data['number_of_customers'] + 2
+
+    pairs = compatible_pairs(data) if eliminate_pairs else None
+    flows, _ = _flow_size(data, sparse_rho, aggregate_flows, pairs)
+
+    variables = (
+        S * F + C * H + S * S + C * C + S * C + C * C + C * C  # z_in, z_out, w_in, w_out, y, x, v
+        + S + 2 * C + 1                                        # ut, rt, dt, dt_max
+        + flows
+        + 3 * C + 1                                            # t, t_n-plus-1, et, lt
+    )
+
+    families = family_sizes(data, sparse_rho, lazy, eliminate_pairs, aggregate_flows, tight_big_m)
+
+    return {
+        'variables': variables,
+        'constraints': sum(rows for rows, _ in families.values()),
+        'nonzeros': sum(nonzeros for _, nonzeros in families.values())
+    }
+
+
+def family_sizes(
+        data: Dict[str, Any],
+        sparse_rho: bool = False,
+        lazy: Optional[List[str]] = None,
+        eliminate_pairs: bool = False,
+        aggregate_flows: bool = False,
+        tight_big_m: bool = True
+    ) -> Dict[str, Tuple[int, int]]:
+    """
+    Counts the rows and nonzeros of every constraint family of the model built by `CrossDockingSolver`, without
+    building it. Gurobi leaves zero coefficients out of the matrix, like the big-M constant of a row that needs
+    none, so they are not counted.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        sparse_rho (bool): Whether the flow variables are only created over the admissible flow index.
+        lazy (Optional[List[str]]): The constraint families left out of the model and separated lazily.
+        eliminate_pairs (bool): Whether the pairs of customers that cannot share a vehicle are eliminated.
+        aggregate_flows (bool): Whether the flows are split into product flows and volume flows between docks.
+        tight_big_m (bool): Whether the big-M constants are derived from the instance.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: The number of rows and of nonzeros of each family, in the order the families
+        are added to the model.
+    """
+    P = data['number_of_products']
+    S = data['number_of_suppliers']
+    F = data['inbound_docks']
+    H = data['outbound_docks']
+    N = data['number_of_customers']
+
+    R = data['number_of_each_product_into_inbound_loads']
+    D = data['quantity_of_required_products_per_customer']
+    Q = data['quantity_of_required_pallets_per_customer']
+    TR = data['transfer_time_for_each_product']
+    LT = data['time_to_load_one_pallet']
+    CAP = data['vehicle_capacity']
+    lazy = lazy or []
+
+    # Entry [j, i] tells whether v[j, i] is a column of the rows of vehicle i, without the diagonal
+    pairs = compatible_pairs(data) if eliminate_pairs else ~np.eye(N, dtype=bool)
+    links = pairs.astype(np.int64)
+    linked = int(links.sum())
+    loaded = (LT * Q != 0).astype(np.int64)
+    demanded = (D != 0).astype(np.int64)
+
+    big_m = big_m_values(data, tight=tight_big_m)
+    big_m_rows = {
+        'unloading_time_order': big_m['unloading_time_order'][~np.eye(S, dtype=bool)],
+        '8': big_m['8'][1:-1, 1:-1][~np.eye(N, dtype=bool)],
+        '12': big_m['12'][:, 1:-1],
+        '13': big_m['13'][1:-1],
+        '22': big_m['22'][1:-1, 1:][np.hstack((~np.eye(N, dtype=bool), np.ones((N, 1), dtype=bool)))]
+    }
+    M = {family: int(np.count_nonzero(values)) for family, values in big_m_rows.items()}
+
+    # Flows of each (product, supplier, customer) and the number of flow variables of each one
+    flows = admissible_flows(data, pairs) if sparse_rho else np.ones((P, S, N), dtype=bool)
+    width = 1 if aggregate_flows else F * H
+
+    supplied = int(np.count_nonzero(R))
+    suppliers = int(np.count_nonzero(R.sum(axis=0)))
+    carried = int(R.sum() != 0)
+
+    families: Dict[str, Tuple[int, int]] = {'assign_inbound_load': (S, S * F)}
+
+    if 'sort_inbound_loads' not in lazy:
+        families['sort_inbound_loads'] = (S * (S - 1) // 2 * F, 4 * (S * (S - 1) // 2 * F))
+
+    families['unloading_time_gt_processing_time'] = (S, S)
+    families['unloading_time_order'] = (S * (S - 1), 2 * S * (S - 1) + M['unloading_time_order'])
+    families['5'] = (N, N * (H + 1))
+
+    if '6' not in lazy:
+        families['6'] = (N * (N - 1) // 2 * H, 4 * (N * (N - 1) // 2 * H))
+
+    families['7'] = (N, 2 * N)
+
+    # The pallets of vehicle j are those of x[0, j], v[j, j] and the v[n, j] of the customers that can travel in it
+    families['8'] = (N * (N - 1), (N - 1) * int((2 + 2 * loaded + loaded @ links).sum()) + M['8'])
+
+    if aggregate_flows:
+        volume, docks = transfer_factors(data)
+        routes = flows.any(axis=0)
+        volumes = volume[:, np.newaxis] * R
+        rows_9 = R > 0 if sparse_rho else np.ones((P, S), dtype=bool)
+
+        families['9-1'] = (int(rows_9.sum()), int(flows.sum(axis=2)[rows_9].sum()))
+        families['9-2'] = (S * F, F * H * int(routes.sum()) + F * int(np.count_nonzero(volumes.sum(axis=0))))
+        families['volume_of_flows'] = (int(routes.sum()), F * H * int(routes.sum()) + int(flows[volume != 0].sum()))
+        families['10'] = (N * H, F * H * int(routes.sum()) + N * H * int(volumes.sum() != 0))
+        families['11'] = (S * N, int(flows.sum()) + N * suppliers)
+        families['12'] = (S * N, 2 * S * N + int(routes.sum()) * int(np.count_nonzero(docks)) + M['12'])
+    else:
+        transfers = np.count_nonzero(TR.reshape(P, -1), axis=1)
+
+        families['9'] = (supplied * F if sparse_rho else P * S * F, width * int(flows.sum()) + supplied * F)
+        families['10'] = (N * H, width * int(flows.sum()) + N * H * carried)
+        families['11'] = (S * N, width * int(flows.sum()) + N * suppliers)
+        families['12'] = (S * N, 2 * S * N + int(flows.sum(axis=(1, 2)) @ transfers) + M['12'])
+
+    families['13'] = (N, 2 * N + M['13'])
+
+    # The demand of product p in vehicle i is that of x[0, i] and of the v[j, i] of the customers that can
+    # travel in it
+    rows_14 = D.any(axis=1) if sparse_rho else np.ones(P, dtype=bool)
+    families['14'] = (
+        int(rows_14.sum()) * N,
+        width * int(flows[rows_14].sum()) + int((demanded + demanded @ links)[rows_14].sum())
+    )
+
+    # x[0, i] takes both the loading of its own pallets and the big-M constant
+    families['15'] = (
+        N,
+        2 * N + int(np.count_nonzero(LT * Q + big_m['15'][1:-1])) + int((loaded @ links).sum())
+    )
+    families['16'] = (N, N + linked)
+    families['17'] = (N, N + linked)
+    families['18'] = (linked, 3 * linked)
+
+    # A row (i, j, n) of 19 needs both x[i, n] and v[n, j], so the rows through n are its in-degree times its
+    # out-degree, less the pairs that come back to i
+    if '19' not in lazy:
+        triples = int(links.sum(axis=0) @ links.sum(axis=1) - (links * links.T).sum())
+        families['19'] = (triples, 3 * triples)
+
+    families['20'] = (N, N + linked)
+    families['21'] = (N, int(((Q != 0).astype(np.int64) @ links).sum()) + int(np.count_nonzero(Q != CAP)))
+    families['22'] = (N * N, 2 * N * N + M['22'])
+    families['23-1'] = (N, 2 * N)
+    families['23-2'] = (N, 2 * N)
+    families['24'] = (1, 1)
+
+    return families
+
+
+def build_estimate(
+        data: Dict[str, Any],
+        builder: str = 'quicksum',
+        sparse_rho: bool = False,
+        lazy: Optional[List[str]] = None,
+        eliminate_pairs: bool = False,
+        aggregate_flows: bool = False,
+        tight_big_m: bool = True
+    ) -> Dict[str, int]:
+    """
+    Estimates the size of the model built by `CrossDockingSolver` and the peak memory of its build, without
+    building it. The counts are exact, and the memory is the growth of the resident memory of the process during
+    the build, which is mostly Gurobi's copy of the matrix and, with the 'quicksum' builder, the Python objects of
+    the variables and rows.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        builder (str): The builder of the model, 'quicksum' or 'matrix'.
+        sparse_rho (bool): Whether the flow variables are only created over the admissible flow index.
+        lazy (Optional[List[str]]): The constraint families left out of the model and separated lazily.
+        eliminate_pairs (bool): Whether the pairs of customers that cannot share a vehicle are eliminated.
+        aggregate_flows (bool): Whether the flows are split into product flows and volume flows between docks.
+        tight_big_m (bool): Whether the big-M constants are derived from the instance.
+
+    Returns:
+        Dict[str, int]: The number of 'variables', 'constraints' and 'nonzeros' of the model, and the 'memory' of
+        its build in bytes.
+
+    Raises:
+        ValueError: If the builder does not exist.
+    """
+    if builder not in MEMORY_FACTORS:
+        raise ValueError(f'builder does not exist: {builder}')
+
+    size = model_size(data, sparse_rho, lazy, eliminate_pairs, aggregate_flows, tight_big_m)
+
+    fixed, per_variable, per_row, per_nonzero = MEMORY_FACTORS[builder]
+    size['memory'] = int(
+        fixed + per_variable * size['variables'] + per_row * size['constraints'] + per_nonzero * size['nonzeros']
+    )
+
+    return size
+
+
+def lighter_formulation(
+        data: Dict[str, Any],
+        memory_budget: float,
+        options: Dict[str, Any],
+        allow_lazy: bool = True
+    ) -> Tuple[Dict[str, Any], List[str], Dict[str, int]]:
+    """
+    Switches the formulation to lighter options, in the order of `DOWNGRADES`, until the estimated peak memory of
+    its build fits a budget. A step is only kept when it lowers the estimate, and the flows are only aggregated
+    when the transfer times are separable.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        memory_budget (float): The largest peak memory of the build, in bytes.
+        options (Dict[str, Any]): The formulation options, as keyword arguments of `build_estimate`.
+        allow_lazy (bool): Whether constraint families can be made lazy, which the 'highs' backend does not allow.
+
+    Returns:
+        Tuple[Dict[str, Any], List[str], Dict[str, int]]: The options, the names of the steps taken and the estimate
+        of the formulation, which is still over the budget when every step was taken.
+    """
+    options = dict(options)
+    estimate = build_estimate(data, **options)
+    downgrades = []
+
+    for name, change in DOWNGRADES:
+        if estimate['memory'] <= memory_budget:
+            break
+
+        if name == 'lazy':
+            if not allow_lazy:
+                continue
+
+            # The families already separated lazily stay lazy
+            change = {'lazy': list(dict.fromkeys((options.get('lazy') or []) + change['lazy']))}
+
+        if all(options.get(option) == value for option, value in change.items()):
+            continue
+
+        if name == 'aggregate_flows':
+            try:
+                transfer_factors(data)
+            except ValueError:
+                continue
+
+        candidate = {**options, **change}
+        lighter = build_estimate(data, **candidate)
+
+        if lighter['memory'] < estimate['memory']:
+            options, estimate = candidate, lighter
+            downgrades.append(name)
+
+    return options, downgrades, estimate
+
+
+def eliminated(
+        data: Dict[str, Any],
+        sparse_rho: bool = False,
+        lazy: Optional[List[str]] = None,
+        aggregate_flows: bool = False
+    ) -> Dict[str, int]:
+    """
+    Counts what is removed from the model when the pairs of customers that cannot share a vehicle are
+    eliminated. Their arcs and vehicle assignments are fixed to zero, and the rows that only restrict those
+    variables are dropped.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        sparse_rho (bool): Whether the flow variables are only created over the admissible flow index.
+        lazy (Optional[List[str]]): The constraint families left out of the model and separated lazily.
+        aggregate_flows (bool): Whether the flows are split into product flows and volume flows between docks.
+
+    Returns:
+        Dict[str, int]: The number of 'x' and 'v' variables fixed to zero, of 'rho' flow variables not created and
+        of rows dropped from the families '18', '19' and 'volume_of_flows'.
+    """
+    N = data['number_of_customers']
+
+    pairs = compatible_pairs(data)
+    incompatible = N * (N - 1) - int(np.count_nonzero(pairs))
+
+    flows, supplied = _flow_size(data, sparse_rho, aggregate_flows, None)
+    kept_flows, kept_supplied = _flow_size(data, sparse_rho, aggregate_flows, pairs)
+
+    # A row (i, j, n) of constraint 19 is kept when both x[i, n] and v[n, j] are, and pairs has no diagonal
+    links = pairs.astype(np.int64)
+    paths = links @ links
+    triples = 0
+    if '19' not in (lazy or []):
+        triples = N * (N - 1) * (N - 2) - int(paths.sum() - np.trace(paths))
+
+    return {
+        'x': incompatible,
+        'v': incompatible,
+        'rho': flows - kept_flows,
+        '18': incompatible,
+        '19': triples,
+        'volume_of_flows': supplied - kept_supplied
+    }
+
+
+def _flow_size(
+        data: Dict[str, Any],
+        sparse_rho: bool,
+        aggregate_flows: bool,
+        pairs: Optional[npt.NDArray[np.bool_]]
+    ) -> Tuple[int, int]:
+    # Number of flow variables and of rows of the supply families, 9 or 9-1, 9-2 and volume_of_flows; the
+    # dense index ignores the pairs of customers
+    P = data['number_of_products']
+    S = data['number_of_suppliers']
+    F = data['inbound_docks']
+    H = data['outbound_docks']
+    N = data['number_of_customers']
+    C = N + 2
+
+    supplied = int(np.count_nonzero(data['number_of_each_product_into_inbound_loads']))
+    admissible = admissible_flows(data, pairs)
+
+    if aggregate_flows:
+        if not sparse_rho:
+            return P * S * N + S * F * N * H, P * S + S * F + S * N
+
+        linked = int(np.count_nonzero(admissible.any(axis=0)))
+        return int(np.count_nonzero(admissible)) + linked * F * H, supplied + S * F + linked
+
+    if not sparse_rho:
+        return P * S * F * C * H, P * S * F
+
+    return int(np.count_nonzero(admissible)) * F * H, supplied * F
+
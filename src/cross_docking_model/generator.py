@@ -0,0 +1,524 @@
+import itertools
+import math
+import os
+import re
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    Optional,
+    Sequence,
+    Set,
+    Tuple
+)
+
+
+# Constants of the C++ generator
+PALLET_VOLUME = 1.2
+MIN_PRODUCT_VOLUME = 0.01 * PALLET_VOLUME
+MAX_PRODUCT_VOLUME = 0.1 * PALLET_VOLUME
+PALLET_PROCESSING_TIME = 5
+VEHICLE_CAPACITY = 16
+PALLET_LOADING_TIME = 2
+PALLET_SERVICE_TIME = 2
+CHANGEOVER_TIME = 2
+
+# Parameter grids of the C++ generators in `generation`, by number of customers
+PRESETS: Dict[str, Dict[str, Any]] = {
+    'C15': {
+        'customers': [15],
+        'demands': [(2, 8, 10), (4, 16, 10)],
+        'products': [10],
+        'suppliers': [5],
+        'inbound_docks': [3],
+        'outbound_docks': [3, 4],
+        'product_types': [20, 40, 100],
+        'adjustments': [0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+    },
+    'C25': {
+        'customers': [25],
+        'demands': [(2, 8, 10), (4, 16, 10)],
+        'products': [15],
+        'suppliers': [10],
+        'inbound_docks': [3],
+        'outbound_docks': [3, 4],
+        'product_types': [20, 40, 100]
+    },
+    'C25_4_4': {
+        'customers': [25],
+        'demands': [(2, 8, 10), (4, 16, 10)],
+        'products': [15],
+        'suppliers': [10],
+        'inbound_docks': [4],
+        'outbound_docks': [4],
+        'product_types': [20, 40, 100]
+    },
+    'C50': {
+        'customers': [50],
+        'demands': [(2, 8, 10), (4, 16, 10)],
+        'products': [30],
+        'suppliers': [20],
+        'inbound_docks': [8],
+        'outbound_docks': [8],
+        'product_types': [20, 40, 100]
+    }
+}
+
+
+class CRandom:
+    """
+    The `rand` function of the GNU C library, an additive feedback generator with the recurrence
+    r[i] = r[i - 3] + r[i - 31] modulo 2^32, seeded like `srand`. Each of the three interleaved subsequences of a
+    block of 31 values is the cumulative sum of values 31 positions back, so blocks are computed with NumPy.
+    """
+    RAND_MAX = 2147483647
+
+    __block = 31
+    __blocks = 32
+    __mask = np.uint64(0xFFFFFFFF)
+
+
+    def __init__(self, seed: int):
+        word = seed & 0xFFFFFFFF
+        word = word - (1 << 32) if word >= 1 << 31 else word
+        word = word if word != 0 else 1
+
+        # Schrage's method, with the truncating division of C
+        state = [word]
+        for _ in range(30):
+            hi = int(word / 127773)
+            word = 16807 * (word - hi * 127773) - 2836 * hi
+            if word < 0:
+                word += 2147483647
+            state.append(word)
+
+        self.__history = np.array([value & 0xFFFFFFFF for value in state + state[:3]], dtype=np.uint64)
+        self.__buffer = np.empty(0, dtype=np.int64)
+        self.__position = 0
+
+        self.integers(310)
+
+
+    def __refill(self) -> None:
+        history = self.__history
+        values = np.empty(self.__block * self.__blocks, dtype=np.uint64)
+
+        for block in range(self.__blocks):
+            back = history[3:]
+            current = values[block * self.__block:(block + 1) * self.__block]
+
+            for lane in range(3):
+                current[lane::3] = (history[31 + lane] + np.cumsum(back[lane::3])) & self.__mask
+
+            history = np.concatenate((history[self.__block:], current))
+
+        self.__history = history
+        self.__buffer = (values >> np.uint64(1)).astype(np.int64)
+        self.__position = 0
+
+
+    def integers(self, count: int) -> npt.NDArray[np.int64]:
+        """
+        Draws the next values of the generator.
+
+        Args:
+            count (int): The number of values.
+
+        Returns:
+            npt.NDArray[np.int64]: The values, in the order of successive calls to `rand`.
+        """
+        draws = []
+
+        while count > 0:
+            if self.__position == self.__buffer.size:
+                self.__refill()
+
+            taken = self.__buffer[self.__position:self.__position + count]
+            self.__position += taken.size
+            count -= taken.size
+            draws.append(taken)
+
+        return np.concatenate(draws) if draws else np.empty(0, dtype=np.int64)
+
+
+    def rand(self) -> int:
+        """
+        Draws the next value of the generator.
+
+        Returns:
+            int: A value between 0 and RAND_MAX.
+        """
+        if self.__position == self.__buffer.size:
+            self.__refill()
+
+        self.__position += 1
+
+        return int(self.__buffer[self.__position - 1])
+
+
+def read_customers(filename: str) -> Dict[str, Any]:
+    """
+    Reads the customers of a Solomon instance, as found in `generation/In` and `generation/solomon_50`, or of an
+    input file of the C++ generator, which starts with its seed.
+
+    Args:
+        filename (str): The name of the file.
+
+    Returns:
+        Dict[str, Any]: The name of the instance, its seed, or None for Solomon instances, and the coordinates,
+        demand, ready time, due date and service time of the depot and of every customer, with the depot repeated
+        as the last row.
+
+    Raises:
+        ValueError: If the file is in neither format.
+    """
+    with open(filename, 'r') as file:
+        tokens = file.read().split()
+
+    if not tokens:
+        raise ValueError(f"Empty customer file: {filename}")
+
+    if tokens[0].isdecimal():
+        seed, customers = int(tokens[0]), int(tokens[1])
+        values = tokens[4:4 + 6 * (customers + 2)]
+        name = tokens[4 + 6 * (customers + 2)] if len(tokens) > 4 + 6 * (customers + 2) else ""
+    else:
+        match = re.search(r'SERVICE\s+TIME', ' '.join(tokens))
+        if match is None:
+            raise ValueError(f"Expected a Solomon instance or a generator input: {filename}")
+
+        seed, name = None, tokens[0]
+        values = ' '.join(tokens)[match.end():].split()
+        if len(values) % 7 != 0:
+            raise ValueError(f"Expected 7 values per customer: {filename}")
+
+        # Drops the customer numbers and repeats the depot
+        values = np.array(values, dtype=np.float64).reshape(-1, 7)[:, 1:]
+        values = np.vstack((values, values[:1])).ravel()
+
+    try:
+        rows = np.array(values, dtype=np.float64).reshape(-1, 6)
+    except ValueError as e:
+        raise ValueError(f"Customer data is not numeric: {e}")
+
+    if rows.shape[0] < 3 or name == "":
+        raise ValueError(f"Expected a depot, at least one customer and a name: {filename}")
+
+    return {'instance': name, 'seed': seed, 'customers': rows}
+
+
+def instance_seeds(seed: int, demands: int, products: int, suppliers: int) -> npt.NDArray[np.int64]:
+    """
+    Draws the seed of every instance from the seed of the customer file, like the C++ generator.
+
+    Args:
+        seed (int): The seed of the customer file.
+        demands (int): The number of demand intervals of the grid.
+        products (int): The number of product counts of the grid.
+        suppliers (int): The number of supplier counts of the grid.
+
+    Returns:
+        npt.NDArray[np.int64]: The seed of the instances of each demand interval, product count and supplier count.
+    """
+    draws = CRandom(seed).integers(demands * products * suppliers).reshape(demands, products, suppliers)
+    t, p, _ = np.indices(draws.shape)
+
+    # The C++ generator adds 3 * 3 where the supplier index was meant, kept so the seeds match
+    return 100000 + draws % 1000000 + t * t + p * p + 3 * 3
+
+
+def generate_instance(
+        customers: npt.NDArray[np.float64],
+        name: str,
+        seed: int,
+        demand: Tuple[int, int, int],
+        products: int,
+        suppliers: int,
+        inbound_docks: int,
+        outbound_docks: int,
+        product_types: int,
+        adjustment: float = 1.0,
+        max_products: int = 3
+    ) -> str:
+    """
+    Generates the content of an instance file, byte for byte as the C++ generator writes it for the same seed.
+
+    Args:
+        customers (npt.NDArray[np.float64]): The depot, the customers and the depot again, as returned by
+            `read_customers`.
+        name (str): The name of the instance.
+        seed (int): The seed of the instance, drawn by `instance_seeds`.
+        demand (Tuple[int, int, int]): The minimum and maximum number of pallets of a customer, and the number of
+            vehicles.
+        products (int): The number of products.
+        suppliers (int): The number of inbound loads.
+        inbound_docks (int): The number of inbound docks.
+        outbound_docks (int): The number of outbound docks.
+        product_types (int): The maximum share of the products required by a customer, as a percentage.
+        adjustment (float): The share of the average processing time of an inbound dock added to the time windows.
+        max_products (int): The maximum number of products of an inbound load, besides its first one.
+
+    Returns:
+        str: The content of the instance file, in the format read by `instance.read_data`.
+
+    Raises:
+        ValueError: If customers cannot require any product, or the inbound loads cannot carry every product.
+    """
+    N = customers.shape[0] - 2
+    P = products
+    S = suppliers
+    types = product_types * P // 100
+
+    if types < 1:
+        raise ValueError(f"product_types leaves no product for the customers: {product_types}% of {P}")
+
+    if max_products < 1:
+        raise ValueError(f"max_products must be an integer greater than 0: {max_products}")
+
+    random = CRandom(seed)
+    first, last, vehicles = demand
+
+    npal = (first + random.integers(N) % (last - first + 1)).astype(np.float64)
+    vtotal = PALLET_VOLUME * npal
+    vprod = MIN_PRODUCT_VOLUME + (random.integers(P) / (CRandom.RAND_MAX + 1.0)) * (
+        MAX_PRODUCT_VOLUME - MIN_PRODUCT_VOLUME
+    )
+    ntype = (1 + random.integers(N) % types).tolist()
+
+    # Every product goes to a customer that can still require products, while any can
+    iprod = np.zeros((N, P), dtype=bool)
+    remaining = sum(ntype)
+    for j in range(P):
+        while True:
+            customer = random.rand() % N
+            if ntype[customer] > 0:
+                iprod[customer, j] = True
+                ntype[customer] -= 1
+                remaining -= 1
+                break
+
+            if remaining == 0:
+                break
+
+    for i in range(N):
+        while ntype[i] > 0:
+            product = random.rand() % P
+            if not iprod[i, product]:
+                iprod[i, product] = True
+                ntype[i] -= 1
+
+    count = iprod.sum(axis=1, keepdims=True)
+    volpp = np.where(iprod, vtotal[:, np.newaxis] / np.maximum(count, 1), 0.0)
+    dprod = np.where(iprod, np.floor(volpp / vprod), 0.0)
+    ptotal = dprod.sum(axis=0)
+    npalprod = np.ceil(ptotal * vprod / PALLET_VOLUME)
+
+    # The first products go to distinct loads, the others to any load with room left
+    nprodcarga = (1 + random.integers(S) % max_products).tolist()
+    pcarga = np.empty(P, dtype=np.int64)
+    distr = np.zeros(S, dtype=bool)
+    for j in range(P):
+        while True:
+            if j >= S and all(room < 0 for room in nprodcarga):
+                raise ValueError(f"The inbound loads cannot carry every product: {P} products, {S} loads")
+
+            load = random.rand() % S
+            if (j < S and not distr[load]) or (j >= S and nprodcarga[load] >= 0):
+                nprodcarga[load] -= 1
+                pcarga[j] = load
+                distr[load] = True
+                break
+
+    rpcarga = np.where(pcarga[:, np.newaxis] == np.arange(S), ptotal[:, np.newaxis], 0.0)
+    npalcarga = np.where(rpcarga != 0, npalprod[:, np.newaxis], 0.0).sum(axis=0)
+    tcarga = npalcarga * PALLET_PROCESSING_TIME
+
+    update = math.ceil(adjustment * (tcarga.sum() / inbound_docks))
+    timew = customers[:, 3:5] + update
+    timew[-1] = (customers[-1, 3], timew[0, 1])
+    timew[0, 0] = customers[0, 3]
+
+    coordinates = customers[:, :2]
+    difference = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+    dist = np.sqrt(difference[:, :, 0] * difference[:, :, 0] + difference[:, :, 1] * difference[:, :, 1])
+
+    # The C++ generator writes doubles like printf's %g, and with two decimals once the volumes set a fixed format
+    sections = [
+        ("Seed for function srand().", f"{seed}"),
+        ("Inbound loads (suppliers).", f"{S}"),
+        ("Inbound docks.", f"{inbound_docks}"),
+        ("Outbound docks.", f"{outbound_docks}"),
+        ("Vehicle.", f"{vehicles}"),
+        ("Vehicle capacity.", f"{VEHICLE_CAPACITY}"),
+        ("Customers.", f"{N}"),
+        ("Number of products.", f"{P}"),
+        ("Time to load one pallet .", f"{PALLET_LOADING_TIME}"),
+        ("Service time per pallet.", f"{PALLET_SERVICE_TIME}"),
+        ("Changeover time.", f"{CHANGEOVER_TIME}"),
+        ("Processing time for inbound load.", _row(tcarga, '%g')),
+        ("Time window.", '\n'.join('%g  %g' % (start, end) for start, end in timew)),
+        ("Quantity of required pallets per customer.", _row(npal, '%g')),
+        ("Quantity of required products per customer.", '\n'.join(_row(row, '%g') for row in dprod.T)),
+        ("Number of each product into inbound loads.", '\n'.join(_row(row, '%g') for row in rpcarga)),
+        ("Volume of each product.", _row(vprod, '%.2f')),
+        ("Distance (travel time).", '\n'.join(_row(row, '%.2f') for row in dist)),
+        ("Number to update the time windows.", '%.2f' % update)
+    ]
+
+    return ''.join(f"{title}#\n{body}\n\n" for title, body in sections) + f"Instance.#\n{name}\n"
+
+
+def _row(values: npt.NDArray[np.float64], style: str) -> str:
+    return ''.join(style % value + '  ' for value in values.tolist())
+
+
+def instance_grid(
+        customer_files: Sequence[str],
+        customers: Sequence[int],
+        demands: Sequence[Tuple[int, int, int]],
+        products: Sequence[int],
+        suppliers: Sequence[int],
+        inbound_docks: Sequence[int],
+        outbound_docks: Sequence[int],
+        product_types: Sequence[int],
+        adjustments: Optional[Sequence[float]] = None,
+        max_products: int = 3,
+        seed: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+    """
+    Lists the instances of a parameter grid lazily, in the order of the loops of the C++ generator for each
+    customer file. Instances are named like the C++ generator names them. The adjustment of the time windows is
+    part of the name only when the grid has adjustments, and the number of inbound docks only when it has more
+    than one.
+
+    Args:
+        customer_files (Sequence[str]): The Solomon instances or generator inputs the customers are read from.
+        customers (Sequence[int]): The numbers of customers, taken from the start of each file.
+        demands (Sequence[Tuple[int, int, int]]): The minimum and maximum number of pallets of a customer, and
+            the number of vehicles, of each demand interval.
+        products (Sequence[int]): The numbers of products.
+        suppliers (Sequence[int]): The numbers of inbound loads.
+        inbound_docks (Sequence[int]): The numbers of inbound docks.
+        outbound_docks (Sequence[int]): The numbers of outbound docks.
+        product_types (Sequence[int]): The maximum shares of the products required by a customer, as percentages.
+        adjustments (Optional[Sequence[float]]): The shares of the average processing time of an inbound dock
+            added to the time windows. The whole average is added when omitted.
+        max_products (int): The maximum number of products of an inbound load, besides its first one.
+        seed (Optional[int]): The seed of every customer file, overriding the seed of the generator inputs.
+
+    Returns:
+        Iterator[Dict[str, Any]]: The keyword arguments of `generate_instance` for each instance.
+
+    Raises:
+        ValueError: If a file has fewer customers than required, or no seed is given for a Solomon instance.
+    """
+    for filename in customer_files:
+        data = read_customers(filename)
+        file_seed = seed if seed is not None else data['seed']
+
+        if file_seed is None:
+            raise ValueError(f"A seed is required for the Solomon instance: {filename}")
+
+        available = data['customers'].shape[0] - 2
+        if max(customers) > available:
+            raise ValueError(f"Expected at least {max(customers)} customers, found {available}: {filename}")
+
+        seeds = instance_seeds(file_seed, len(demands), len(products), len(suppliers))
+
+        for N, tw, pt, t, od, p, f, ind in itertools.product(
+            customers,
+            range(len(adjustments or [1.0])),
+            range(len(product_types)),
+            range(len(demands)),
+            range(len(outbound_docks)),
+            range(len(products)),
+            range(len(suppliers)),
+            range(len(inbound_docks))
+        ):
+            name = "" if adjustments is None else f"{round(adjustments[tw] * 10):02d}_"
+            name += f"C{N}_I{t + 1}_"
+            name += "" if len(inbound_docks) == 1 else f"ID{inbound_docks[ind]}_"
+            name += f"OD{outbound_docks[od]}_P{products[p]}_S{suppliers[f]}_{product_types[pt]}_{data['instance']}"
+
+            yield {
+                'customers': np.vstack((data['customers'][:N + 1], data['customers'][-1:])),
+                'name': name,
+                'seed': int(seeds[t, p, f]),
+                'demand': tuple(demands[t]),
+                'products': products[p],
+                'suppliers': suppliers[f],
+                'inbound_docks': inbound_docks[ind],
+                'outbound_docks': outbound_docks[od],
+                'product_types': product_types[pt],
+                'adjustment': 1.0 if adjustments is None else adjustments[tw],
+                'max_products': max_products
+            }
+
+
+def write_instance(output_dir: str, arguments: Dict[str, Any]) -> str:
+    """
+    Generates an instance and writes it to `<output_dir>/<name>.txt`.
+
+    Args:
+        output_dir (str): The directory of the instance files.
+        arguments (Dict[str, Any]): The keyword arguments of `generate_instance`.
+
+    Returns:
+        str: The name of the file written.
+    """
+    filename = os.path.join(output_dir, f"{arguments['name']}.txt")
+
+    with open(filename, 'w') as file:
+        file.write(generate_instance(**arguments))
+
+    return filename
+
+
+def generate_instances(grid: Iterator[Dict[str, Any]], output_dir: str, jobs: int = 1) -> Iterator[str]:
+    """
+    Writes every instance of a grid, streaming it so only a few instances per process are held at a time.
+
+    Args:
+        grid (Iterator[Dict[str, Any]]): The instances, as listed by `instance_grid`.
+        output_dir (str): The directory of the instance files, created when missing.
+        jobs (int): The number of processes generating instances.
+
+    Returns:
+        Iterator[str]: The name of each file written, in the order the instances are finished.
+
+    Raises:
+        ValueError: If jobs is less than 1.
+    """
+    if jobs < 1:
+        raise ValueError(f"jobs must be an integer greater than 0: {jobs}")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    if jobs == 1:
+        for arguments in grid:
+            yield write_instance(output_dir, arguments)
+
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: Set[Future] = set()
+
+        for arguments in grid:
+            pending.add(executor.submit(write_instance, output_dir, arguments))
+
+            if len(pending) >= 2 * jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+
+        for future in pending:
+            yield future.result()
@@ -0,0 +1,210 @@
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from cross_docking_model.preprocessing import big_m_values
+
+
+def construct_solution(
+        data: Dict[str, Any],
+        big_m: Optional[Dict[str, npt.NDArray[np.float64]]] = None
+    ) -> Dict[str, npt.NDArray[np.float64]]:
+    """
+    Builds a feasible solution of the cross-docking model with greedy rules, to be used as a MIP start.
+
+    Inbound loads are assigned to inbound docks by the longest processing time rule. Vehicles are formed by
+    nearest-neighbour routing on the travel times, opening a new vehicle when the capacity or the time window of
+    every remaining customer would be violated. Each vehicle receives its products from the suppliers in order,
+    and vehicles are assigned to the outbound dock that becomes free first, in the order their products are
+    ready.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        big_m (Optional[Dict[str, npt.NDArray[np.float64]]]): The big-M constants of the model returned by
+            `preprocessing.big_m_values`, used to satisfy the relaxed side of the disjunctive constraints. The
+            tight constants of the instance are used when omitted.
+
+    Returns:
+        Dict[str, npt.NDArray[np.float64]]: The value of every variable family of `CrossDockingSolver`, as dense
+        arrays indexed like the model, with the dock nodes of the customer index at positions 0 and N + 1.
+
+    Raises:
+        ValueError: If a customer requires more pallets than the vehicle capacity.
+        ValueError: If the supply of a product does not match its demand.
+    """
+    P = data['number_of_products']
+    S = data['number_of_suppliers']
+    F = data['inbound_docks']
+    H = data['outbound_docks']
+    N = data['number_of_customers']
+    C = N + 2
+
+    PT = data['processing_time_for_inbound_load'].astype(np.float64)
+    R = data['number_of_each_product_into_inbound_loads'].astype(np.float64)
+    D = data['quantity_of_required_products_per_customer'].astype(np.float64)
+    Q = data['quantity_of_required_pallets_per_customer'].astype(np.float64)
+    ST = Q * 2
+    TR = data['transfer_time_for_each_product']
+    TT = data['travel_time']
+    A = data['time_window_start'].astype(np.float64)
+    B = data['time_window_end'].astype(np.float64)
+
+    CAP = data['vehicle_capacity']
+    LT = data['time_to_load_one_pallet']
+    CT_ = data['changeover_time']
+
+    if np.any(Q > CAP):
+        raise ValueError(f'customer requires more pallets than the vehicle capacity: {str(int(np.argmax(Q)) + 1)}')
+
+    if not np.array_equal(R.sum(axis=1), D.sum(axis=1)):
+        raise ValueError('the supply of every product must match its demand')
+
+    if big_m is None:
+        big_m = big_m_values(data)
+
+    solution = {
+        'z_in': np.zeros((S, F)),
+        'z_out': np.zeros((C, H)),
+        'w_in': np.zeros((S, S)),
+        'w_out': np.zeros((C, C)),
+        'y': np.zeros((S, C)),
+        'x': np.zeros((C, C)),
+        'v': np.zeros((C, C)),
+        'ut': np.zeros(S),
+        'rt': np.zeros(C),
+        'dt': np.zeros(C),
+        'dt_max': np.zeros(()),
+        'rho': np.zeros((P, S, F, C, H)),
+        't': np.zeros(C),
+        't_n-plus-1': np.zeros(()),
+        'et': np.zeros(C),
+        'lt': np.zeros(C)
+    }
+
+    # Inbound docks: longest processing time first, each load on the dock that becomes free first
+    inbound_dock = np.zeros(S, dtype=np.int64)
+    inbound_free = np.zeros(F)
+    inbound_sequence: List[List[int]] = [[] for _ in range(F)]
+    for l in np.argsort(-PT, kind='stable'):
+        f = int(np.argmin(inbound_free))
+        inbound_free[f] += PT[l]
+
+        inbound_dock[l] = f
+        solution['ut'][l] = inbound_free[f]
+        solution['w_in'][inbound_sequence[f], l] = 1
+        inbound_sequence[f].append(l)
+    solution['z_in'][np.arange(S), inbound_dock] = 1
+
+    # Vehicles: each route starts at the unrouted customer whose window closes first and visits the nearest
+    # customer that still fits in the vehicle and can be reached before its window closes
+    routes: List[List[int]] = []
+    unrouted = np.ones(C, dtype=bool)
+    unrouted[[0, C - 1]] = False
+    while unrouted.any():
+        candidates = np.flatnonzero(unrouted)
+        current = int(candidates[np.argmin(B[candidates])])
+        route = [current]
+        load = Q[current - 1]
+        time = A[current]
+        unrouted[current] = False
+
+        while True:
+            candidates = np.flatnonzero(unrouted)
+            arrival = time + ST[current - 1] + TT[current, candidates]
+            feasible = (load + Q[candidates - 1] <= CAP) & (arrival <= B[candidates])
+            if not feasible.any():
+                break
+
+            candidates, arrival = candidates[feasible], arrival[feasible]
+            best = int(np.lexsort((TT[current, candidates], np.maximum(arrival, A[candidates])))[0])
+
+            current = int(candidates[best])
+            route.append(current)
+            load += Q[current - 1]
+            time = max(arrival[best], A[current])
+            unrouted[current] = False
+
+        routes.append(route)
+
+    leaders = np.array([route[0] for route in routes])
+    for route in routes:
+        solution['x'][0, route[0]] = 1
+        solution['x'][route[:-1], route[1:]] = 1
+        solution['x'][route[-1], C - 1] = 1
+        solution['v'][route[1:], route[0]] = 1
+
+    # Flows: every vehicle takes the products of its customers from the suppliers in order
+    demand = np.zeros((P, C))
+    for route in routes:
+        demand[:, route[0]] = D[:, np.array(route) - 1].sum(axis=1)
+
+    supply = R.copy()
+    flow = np.zeros((P, S, C))
+    for p in range(P):
+        for i in leaders:
+            for l in np.flatnonzero(supply[p] > 0):
+                if demand[p, i] == 0:
+                    break
+
+                amount = min(supply[p, l], demand[p, i])
+                flow[p, l, i] = amount
+                supply[p, l] -= amount
+                demand[p, i] -= amount
+
+    solution['y'] = (flow.sum(axis=0) > 0).astype(np.float64)
+
+    # Outbound docks: vehicles in the order their inbound loads are unloaded, each on the dock that becomes free
+    # first; the ready time accounts for the transfer time on the chosen dock
+    loads = np.zeros(C)
+    loads[leaders] = [Q[np.array(route) - 1].sum() for route in routes]
+    unloaded = np.array([solution['ut'][solution['y'][:, i] > 0].max(initial=0) for i in leaders])
+    outbound_free = np.full(H, -np.inf)
+    outbound_sequence: List[List[int]] = [[] for _ in range(H)]
+    for i in leaders[np.lexsort((A[leaders], unloaded))]:
+        h = int(np.argmin(outbound_free))
+        suppliers = np.flatnonzero(solution['y'][:, i])
+        transfer = np.einsum('pl,pl->l', flow[:, suppliers, i], TR[:, inbound_dock[suppliers], h])
+
+        solution['rho'][:, suppliers, inbound_dock[suppliers], i, h] = flow[:, suppliers, i]
+        solution['rt'][i] = max(
+            (solution['ut'][suppliers] + transfer).max(initial=0),
+            (solution['ut'] - big_m['12'][:, i]).max(initial=0)
+        )
+        solution['dt'][i] = max(solution['rt'][i], outbound_free[h] + CT_) + LT * loads[i]
+        outbound_free[h] = solution['dt'][i]
+
+        solution['z_out'][i, h] = 1
+        solution['w_out'][outbound_sequence[h], i] = 1
+        outbound_sequence[h].append(i)
+
+    # Customers that do not lead a vehicle only appear in the relaxed side of the disjunctive constraints
+    followers = np.setdiff1d(np.arange(1, C - 1), leaders)
+    solution['rt'][followers] = np.maximum(0, solution['ut'][:, None] - big_m['12'][:, followers]).max(axis=0)
+    solution['dt'][followers] = np.maximum(
+        solution['rt'][followers] - big_m['15'][followers],
+        (solution['dt'][leaders, None] + CT_ - big_m['8'][leaders][:, followers]).max(axis=0, initial=0)
+    )
+    solution['dt_max'][()] = solution['dt'][1:-1].max(initial=0)
+
+    # Visiting times along each route
+    for route in routes:
+        time = max(solution['dt'][route[0]] + TT[0, route[0]], A[route[0]])
+        solution['t'][route[0]] = time
+
+        for previous, current in zip(route[:-1], route[1:]):
+            time = max(time + ST[previous - 1] + TT[previous, current], A[current])
+            solution['t'][current] = time
+
+    c = np.arange(1, C - 1)
+    arrival = solution['t'][c] + ST + TT[c, C - 1] - big_m['22'][c, C - 1] * (1 - solution['x'][c, C - 1])
+    solution['t'][C - 1] = max(0, arrival.max(initial=0))
+    solution['et'][c] = np.maximum(0, A[c] - solution['t'][c])
+    solution['lt'][c] = np.maximum(0, solution['t'][c] - B[c])
+
+    return solution
@@ -0,0 +1,685 @@
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union
+)
+
+import gurobipy as gp
+import highspy
+import numpy as np
+import scipy.sparse as sp
+
+
+class HighsResult:
+    """
+    Outcome of a HiGHS solve, with the attributes of a solved `gp.Model` that are read after a solve: Status, as a
+    Gurobi status code, SolCount, ObjVal, ObjBound, NodeCount and Runtime. The values of the variables are read
+    with `getAttr('X', variables)` and the value of an expression with `getValue`. A result built without
+    arguments is the one of a model that was not solved yet.
+    """
+    Status: int
+    SolCount: int
+    ObjVal: float
+    ObjBound: float
+    NodeCount: float
+    Runtime: float
+
+
+    def __init__(
+        self,
+        status: int = gp.GRB.LOADED,
+        values: Optional[np.ndarray] = None,
+        objective: float = gp.GRB.INFINITY,
+        bound: float = -gp.GRB.INFINITY,
+        nodes: float = 0.0,
+        runtime: float = 0.0
+    ):
+        self.Status = status
+        self.SolCount = 0 if values is None else 1
+        self.ObjVal = objective
+        self.ObjBound = bound
+        self.NodeCount = nodes
+        self.Runtime = runtime
+        self.__values = values
+
+
+    def getAttr(self, name: str, variables: Optional[List['HighsVar']] = None) -> Any:
+        """
+        Reads an attribute of the solve, or the 'X' value of some variables of the solved model.
+
+        Args:
+            name (str): The name of the attribute.
+            variables (Optional[List[HighsVar]]): The variables whose values are read.
+
+        Returns:
+            Any: The value of the attribute, or the list of values of the variables.
+
+        Raises:
+            AttributeError: If the attribute does not exist or the solve found no solution.
+        """
+        if variables is None:
+            return getattr(self, name)
+
+        if name != 'X' or self.__values is None:
+            raise AttributeError(f'attribute is not available: {name}')
+
+        return self.__values[[variable.index for variable in variables]].tolist()
+
+
+    def getValue(self, expression: 'HighsExpr') -> float:
+        """
+        Evaluates a linear expression of the variables of the solved model.
+
+        Args:
+            expression (HighsExpr): The expression.
+
+        Returns:
+            float: Its value in the solution.
+        """
+        values = self.getAttr('X', expression.variables)
+
+        return expression.getConstant() + float(np.dot(expression.coefficients, values))
+
+
+class HighsVar:
+    """
+    Column of a `HighsModel`. Like a `gp.Var`, its index is its position in the model, which changes when columns
+    before it are removed, and is -1 once it is removed itself.
+    """
+    __slots__ = ['index', 'key']
+
+    index: int
+    key: int
+
+
+    def __init__(self, index: int, key: int):
+        self.index = index
+        self.key = key
+
+
+class HighsConstr:
+    """
+    Row of a `HighsModel`, with the ConstrName and the settable RHS of a `gp.Constr`.
+    """
+    __slots__ = ['index', 'key', 'ConstrName', '__model']
+
+    index: int
+    key: int
+    ConstrName: str
+
+
+    def __init__(self, model: 'HighsModel', index: int, key: int, name: str):
+        self.index = index
+        self.key = key
+        self.ConstrName = name
+        self.__model = model
+
+
+    @property
+    def RHS(self) -> float:
+        return self.__model.getAttr('RHS', [self])[0]
+
+
+    @RHS.setter
+    def RHS(self, value: float):
+        self.__model.setAttr('RHS', [self], [value])
+
+
+class HighsTempConstr:
+    """
+    Bound on a linear expression, as `expression <= rhs` returns it, to be added with `HighsModel.addConstr`.
+    """
+    expression: 'HighsExpr'
+    sense: str
+    rhs: float
+
+
+    def __init__(self, expression: 'HighsExpr', sense: str, rhs: float):
+        self.expression = expression
+        self.sense = sense
+        self.rhs = rhs
+
+
+class HighsExpr:
+    """
+    Linear expression of the columns of a `HighsModel`, with the arithmetic the solver applies to its objectives:
+    sums of expressions and constants, products by constants and bounds built with <=, >= and ==.
+    """
+    variables: List[HighsVar]
+    coefficients: np.ndarray
+    constant: float
+
+
+    def __init__(self, variables: List[HighsVar], coefficients: Iterable[float], constant: float = 0.0):
+        self.variables = list(variables)
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.constant = float(constant)
+
+
+    def getConstant(self) -> float:
+        return self.constant
+
+
+    def size(self) -> int:
+        return len(self.variables)
+
+
+    def getVar(self, position: int) -> HighsVar:
+        return self.variables[position]
+
+
+    def getCoeff(self, position: int) -> float:
+        return float(self.coefficients[position])
+
+
+    def __add__(self, other: Union['HighsExpr', float]) -> 'HighsExpr':
+        if isinstance(other, HighsExpr):
+            return HighsExpr(
+                self.variables + other.variables,
+                np.concatenate([self.coefficients, other.coefficients]),
+                self.constant + other.constant
+            )
+
+        return HighsExpr(self.variables, self.coefficients, self.constant + float(other))
+
+
+    __radd__ = __add__
+
+
+    def __mul__(self, factor: float) -> 'HighsExpr':
+        return HighsExpr(self.variables, self.coefficients * float(factor), self.constant * float(factor))
+
+
+    __rmul__ = __mul__
+
+
+    def __le__(self, rhs: float) -> HighsTempConstr:
+        return HighsTempConstr(self, gp.GRB.LESS_EQUAL, float(rhs))
+
+
+    def __ge__(self, rhs: float) -> HighsTempConstr:
+        return HighsTempConstr(self, gp.GRB.GREATER_EQUAL, float(rhs))
+
+
+    def __eq__(self, rhs: float) -> HighsTempConstr:
+        return HighsTempConstr(self, gp.GRB.EQUAL, float(rhs))
+
+
+    __hash__ = None
+
+
+class HighsModel:
+    """
+    Model solved by HiGHS and built without a Gurobi model, so the highs backend needs no Gurobi environment or license.
+    It has the part of the `gp.Model` interface that the matrix builder and the solver use: matrix variables and
+    constraints, single rows, removals, coefficient changes, bounds, right-hand sides, MIP starts and a single
+    objective. Coefficients are kept as triplets of the stable keys of their rows and columns, and only turned into
+    a column-wise matrix when the model is handed to HiGHS.
+    """
+    __vtypes: Dict[str, int] = {gp.GRB.CONTINUOUS: 0, gp.GRB.BINARY: 1, gp.GRB.INTEGER: 2}
+
+    ModelName: str
+
+
+    def __init__(self, name: str = ''):
+        self.ModelName = name
+        self.__variables: List[HighsVar] = []
+        self.__constraints: List[HighsConstr] = []
+        self.__lower = np.zeros(0, dtype=np.float64)
+        self.__upper = np.zeros(0, dtype=np.float64)
+        self.__start = np.zeros(0, dtype=np.float64)
+        self.__vtype = np.zeros(0, dtype=np.int8)
+        self.__sense = np.zeros(0, dtype='<U1')
+        self.__rhs = np.zeros(0, dtype=np.float64)
+        self.__triplets: List[np.ndarray] = []
+        self.__duplicates = False
+        self.__column_keys = 0
+        self.__row_keys = 0
+        self.__objective = HighsExpr([], [])
+        self.ModelSense = gp.GRB.MINIMIZE
+
+
+    @property
+    def NumVars(self) -> int:
+        return len(self.__variables)
+
+
+    @property
+    def NumConstrs(self) -> int:
+        return len(self.__constraints)
+
+
+    @property
+    def NumNZs(self) -> int:
+        return int(self.__coefficients()[0].size)
+
+
+    @property
+    def IsMIP(self) -> bool:
+        return bool(np.any(self.__vtype > 0))
+
+
+    @property
+    def NumStart(self) -> int:
+        return int(np.any(~np.isnan(self.__start)))
+
+
+    @NumStart.setter
+    def NumStart(self, value: int):
+        # Only clearing the start is supported, as HiGHS takes a single one
+        if value != 0:
+            raise ValueError(f'HiGHS only takes a single MIP start: {str(value)}')
+
+        self.__start[:] = np.nan
+
+
+    def update(self) -> None:
+        # Changes apply at once, so there is nothing pending
+        pass
+
+
+    def dispose(self) -> None:
+        self.__init__(self.ModelName)
+
+
+    def getVars(self) -> List[HighsVar]:
+        return list(self.__variables)
+
+
+    def getConstrs(self) -> List[HighsConstr]:
+        return list(self.__constraints)
+
+
+    def addMVar(self, shape: tuple, vtype: str = gp.GRB.CONTINUOUS, name: str = '') -> np.ndarray:
+        """
+        Adds a block of columns with a lower bound of zero, and an upper bound of one for binaries.
+
+        Args:
+            shape (tuple): The shape of the block.
+            vtype (str): The Gurobi type of the columns.
+            name (str): The name of the block, unused since HiGHS is handed the model without names.
+
+        Returns:
+            np.ndarray: The `HighsVar` of each column, with the given shape.
+        """
+        count = int(np.prod(shape, dtype=np.int64))
+        first = len(self.__variables)
+        variables = [HighsVar(first + offset, self.__column_keys + offset) for offset in range(count)]
+
+        self.__variables.extend(variables)
+        self.__column_keys += count
+        self.__lower = np.concatenate([self.__lower, np.zeros(count)])
+        self.__upper = np.concatenate([self.__upper, np.full(count, 1.0 if vtype == gp.GRB.BINARY else np.inf)])
+        self.__start = np.concatenate([self.__start, np.full(count, np.nan)])
+        self.__vtype = np.concatenate([self.__vtype, np.full(count, self.__vtypes[vtype], dtype=np.int8)])
+
+        block = np.empty(count, dtype=object)
+        block[:] = variables
+
+        return block.reshape(shape)
+
+
+    def addMConstr(
+        self,
+        A: sp.spmatrix,
+        x: Optional[List[HighsVar]],
+        sense: str,
+        b: np.ndarray,
+        name: str = ''
+    ) -> np.ndarray:
+        """
+        Adds the rows A @ x <sense> b.
+
+        Args:
+            A (sp.spmatrix): The coefficients, with one column per variable of x.
+            x (Optional[List[HighsVar]]): The variables of the columns of A, or None for every column of the model.
+            sense (str): The Gurobi sense of every row.
+            b (np.ndarray): The right-hand side of each row.
+            name (str): The name of the rows, numbered like Gurobi names them.
+
+        Returns:
+            np.ndarray: The `HighsConstr` of each row.
+        """
+        variables = self.__variables if x is None else x
+        matrix = sp.coo_matrix(A)
+        keys = np.array([variable.key for variable in variables], dtype=np.int64)
+        rows = self.__add_rows(matrix.shape[0], sense, b, [f'{name}[{row}]' for row in range(matrix.shape[0])])
+
+        self.__triplets.append(np.stack([
+            np.array([constr.key for constr in rows], dtype=np.float64)[matrix.row],
+            keys[matrix.col].astype(np.float64),
+            matrix.data.astype(np.float64)
+        ]))
+
+        block = np.empty(len(rows), dtype=object)
+        block[:] = rows
+
+        return block
+
+
+    def addConstr(self, constraint: HighsTempConstr, name: str = '') -> HighsConstr:
+        """
+        Adds a row bounding a linear expression.
+
+        Args:
+            constraint (HighsTempConstr): The bound, such as `expression <= rhs`.
+            name (str): The name of the row.
+
+        Returns:
+            HighsConstr: The row.
+        """
+        expression = constraint.expression
+        row = self.__add_rows(1, constraint.sense, [constraint.rhs - expression.constant], [name])[0]
+
+        self.__triplets.append(np.stack([
+            np.full(expression.size(), row.key, dtype=np.float64),
+            np.array([variable.key for variable in expression.variables], dtype=np.float64),
+            expression.coefficients
+        ]))
+        # An expression can hold a column more than once
+        self.__duplicates = True
+
+        return row
+
+
+    def chgCoeff(self, constr: HighsConstr, var: HighsVar, value: float) -> None:
+        # The last coefficient given for a row and a column replaces the previous ones
+        self.__triplets.append(np.array([[constr.key], [var.key], [value]], dtype=np.float64))
+        self.__duplicates = True
+
+
+    def remove(self, items: Union[HighsVar, HighsConstr, List[Union[HighsVar, HighsConstr]]]) -> None:
+        items = items if isinstance(items, list) else [items]
+
+        removed = {id(item) for item in items}
+        if not removed:
+            return
+
+        kept = np.array([id(variable) not in removed for variable in self.__variables], dtype=bool)
+        if not kept.all():
+            for variable in self.__variables:
+                if id(variable) in removed:
+                    variable.index = -1
+
+            self.__variables = [variable for variable, keep in zip(self.__variables, kept) if keep]
+            self.__lower, self.__upper = self.__lower[kept], self.__upper[kept]
+            self.__start, self.__vtype = self.__start[kept], self.__vtype[kept]
+
+            for index, variable in enumerate(self.__variables):
+                variable.index = index
+
+        kept = np.array([id(constr) not in removed for constr in self.__constraints], dtype=bool)
+        if not kept.all():
+            for constr in self.__constraints:
+                if id(constr) in removed:
+                    constr.index = -1
+
+            self.__constraints = [constr for constr, keep in zip(self.__constraints, kept) if keep]
+            self.__sense, self.__rhs = self.__sense[kept], self.__rhs[kept]
+
+            for index, constr in enumerate(self.__constraints):
+                constr.index = index
+
+        # The coefficients of the removed rows and columns are dropped with the next matrix
+        self.__duplicates = True
+
+
+    def setAttr(self, name: str, items: List[Union[HighsVar, HighsConstr]], values: Iterable[float]) -> None:
+        """
+        Sets the LB, UB or Start of some columns, or the RHS of some rows.
+
+        Args:
+            name (str): The name of the attribute.
+            items (List[Union[HighsVar, HighsConstr]]): The columns or rows.
+            values (Iterable[float]): The value of each one.
+
+        Raises:
+            AttributeError: If the attribute cannot be set.
+        """
+        positions = np.array([item.index for item in items], dtype=np.int64)
+        values = np.asarray(list(values), dtype=np.float64)
+
+        if name == 'LB':
+            self.__lower[positions] = values
+        elif name == 'UB':
+            self.__upper[positions] = values
+        elif name == 'Start':
+            self.__start[positions] = values
+        elif name == 'RHS':
+            self.__rhs[positions] = values
+        else:
+            raise AttributeError(f'attribute cannot be set: {name}')
+
+
+    def getAttr(self, name: str, items: List[Union[HighsVar, HighsConstr]]) -> List[Any]:
+        """
+        Reads the LB, UB, Start or VType of some columns, or the RHS or Sense of some rows.
+
+        Args:
+            name (str): The name of the attribute.
+            items (List[Union[HighsVar, HighsConstr]]): The columns or rows.
+
+        Returns:
+            List[Any]: The value of each one, with GRB.UNDEFINED for a column without a start value.
+
+        Raises:
+            AttributeError: If the attribute cannot be read.
+        """
+        positions = np.array([item.index for item in items], dtype=np.int64)
+
+        if name == 'LB':
+            return self.__lower[positions].tolist()
+        if name == 'UB':
+            return self.__upper[positions].tolist()
+        if name == 'Start':
+            return np.nan_to_num(self.__start[positions], nan=gp.GRB.UNDEFINED).tolist()
+        if name == 'VType':
+            types = {code: vtype for vtype, code in self.__vtypes.items()}
+            return [types[code] for code in self.__vtype[positions].tolist()]
+        if name == 'RHS':
+            return self.__rhs[positions].tolist()
+        if name == 'Sense':
+            return self.__sense[positions].tolist()
+
+        raise AttributeError(f'attribute cannot be read: {name}')
+
+
+    def setObjective(self, expression: HighsExpr, sense: int = gp.GRB.MINIMIZE) -> None:
+        self.__objective = expression
+        self.ModelSense = sense
+
+
+    def linear_program(self) -> highspy.HighsLp:
+        """
+        Builds the model as HiGHS takes it, with its columns in the order of `getVars`.
+
+        Returns:
+            highspy.HighsLp: The model.
+        """
+        rows, columns, values = self.__coefficients()
+        matrix = sp.csc_matrix((values, (rows, columns)), shape=(self.NumConstrs, self.NumVars))
+
+        cost = np.zeros(self.NumVars)
+        positions = np.array([variable.index for variable in self.__objective.variables], dtype=np.int64)
+        live = positions >= 0
+        np.add.at(cost, positions[live], self.__objective.coefficients[live])
+
+        rhs = self.__infinite(self.__rhs)
+
+        program = highspy.HighsLp()
+        program.num_col_ = self.NumVars
+        program.num_row_ = self.NumConstrs
+        program.col_cost_ = cost
+        program.col_lower_ = self.__infinite(self.__lower)
+        program.col_upper_ = self.__infinite(self.__upper)
+        program.row_lower_ = np.where(self.__sense == gp.GRB.LESS_EQUAL, -highspy.kHighsInf, rhs)
+        program.row_upper_ = np.where(self.__sense == gp.GRB.GREATER_EQUAL, highspy.kHighsInf, rhs)
+        program.offset_ = self.__objective.constant
+        program.sense_ = highspy.ObjSense.kMaximize if self.ModelSense < 0 else highspy.ObjSense.kMinimize
+
+        program.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        program.a_matrix_.start_ = matrix.indptr.astype(np.int32)
+        program.a_matrix_.index_ = matrix.indices.astype(np.int32)
+        program.a_matrix_.value_ = matrix.data.astype(np.float64)
+
+        # HiGHS has no binary type, so binaries are integers within [0, 1]
+        if self.IsMIP:
+            program.integrality_ = [
+                highspy.HighsVarType.kInteger if vtype > 0 else highspy.HighsVarType.kContinuous
+                for vtype in self.__vtype.tolist()
+            ]
+
+        return program
+
+
+    def start(self) -> np.ndarray:
+        # The start value of each column, NaN where it has none
+        return self.__start.copy()
+
+
+    @staticmethod
+    def __infinite(values: np.ndarray) -> np.ndarray:
+        # Bounds at or beyond GRB.INFINITY are infinite, as in Gurobi
+        return np.where(np.abs(values) >= gp.GRB.INFINITY, np.copysign(highspy.kHighsInf, values), values)
+
+
+    def __add_rows(self, count: int, sense: str, rhs: Iterable[float], names: List[str]) -> List[HighsConstr]:
+        first = len(self.__constraints)
+        rows = [
+            HighsConstr(self, first + offset, self.__row_keys + offset, name) for offset, name in enumerate(names)
+        ]
+
+        self.__constraints.extend(rows)
+        self.__row_keys += count
+        self.__sense = np.concatenate([self.__sense, np.full(count, sense, dtype='<U1')])
+        self.__rhs = np.concatenate([self.__rhs, np.broadcast_to(np.asarray(rhs, dtype=np.float64), (count,))])
+
+        return rows
+
+
+    def __coefficients(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # The rows, columns and values of the coefficients in positions. Their triplets are merged into one array of
+        # keys, which the next call starts from
+        triplets = np.concatenate(self.__triplets, axis=1) if self.__triplets else np.zeros((3, 0))
+
+        row_positions = np.full(self.__row_keys, -1, dtype=np.int64)
+        row_positions[[constr.key for constr in self.__constraints]] = np.arange(self.NumConstrs)
+        column_positions = np.full(self.__column_keys, -1, dtype=np.int64)
+        column_positions[[variable.key for variable in self.__variables]] = np.arange(self.NumVars)
+
+        if self.__duplicates:
+            # The last triplet of a row and a column wins, and removed rows, removed columns and zeros are dropped
+            combined = triplets[0].astype(np.int64) * self.__column_keys + triplets[1].astype(np.int64)
+            _, last = np.unique(combined[::-1], return_index=True)
+            triplets = triplets[:, np.sort(triplets.shape[1] - 1 - last)]
+
+            live = (
+                (row_positions[triplets[0].astype(np.int64)] >= 0)
+                & (column_positions[triplets[1].astype(np.int64)] >= 0)
+                & (triplets[2] != 0)
+            )
+            triplets = triplets[:, live]
+            self.__duplicates = False
+
+        self.__triplets = [triplets]
+
+        return (
+            row_positions[triplets[0].astype(np.int64)],
+            column_positions[triplets[1].astype(np.int64)],
+            triplets[2]
+        )
+
+
+class HighsSolver:
+    """
+    Solves a `HighsModel` with HiGHS. Every solve hands the model over in memory, with its columns in the order of
+    `model.getVars()`, so the values of the solution map back to its variables. The Start attribute of the
+    variables is the MIP start.
+    """
+    __statuses: Dict[highspy.HighsModelStatus, int] = {
+        highspy.HighsModelStatus.kNotset: gp.GRB.LOADED,
+        highspy.HighsModelStatus.kModelEmpty: gp.GRB.OPTIMAL,
+        highspy.HighsModelStatus.kOptimal: gp.GRB.OPTIMAL,
+        highspy.HighsModelStatus.kInfeasible: gp.GRB.INFEASIBLE,
+        highspy.HighsModelStatus.kUnboundedOrInfeasible: gp.GRB.INF_OR_UNBD,
+        highspy.HighsModelStatus.kUnbounded: gp.GRB.UNBOUNDED,
+        highspy.HighsModelStatus.kObjectiveBound: gp.GRB.CUTOFF,
+        highspy.HighsModelStatus.kObjectiveTarget: gp.GRB.USER_OBJ_LIMIT,
+        highspy.HighsModelStatus.kTimeLimit: gp.GRB.TIME_LIMIT,
+        highspy.HighsModelStatus.kIterationLimit: gp.GRB.ITERATION_LIMIT,
+        highspy.HighsModelStatus.kSolutionLimit: gp.GRB.SOLUTION_LIMIT,
+        highspy.HighsModelStatus.kInterrupt: gp.GRB.INTERRUPTED,
+        highspy.HighsModelStatus.kHighsInterrupt: gp.GRB.INTERRUPTED,
+        highspy.HighsModelStatus.kMemoryLimit: gp.GRB.MEM_LIMIT
+    }
+
+    time_limit: float
+    log_file: str
+    threads: int
+
+
+    def __init__(self, time_limit: float, log_file: str, threads: int = 0):
+        if threads < 0:
+            raise ValueError(f'threads must be an integer greater than or equal to 0: {str(threads)}')
+
+        self.time_limit = time_limit
+        self.log_file = log_file
+        self.threads = threads
+
+
+    def optimize(self, model: HighsModel) -> HighsResult:
+        """
+        Solves a model with HiGHS, appending its log to the log file.
+
+        Args:
+            model (HighsModel): A linear or mixed integer linear model.
+
+        Returns:
+            HighsResult: The outcome of the solve.
+        """
+        highs = highspy.Highs()
+        highs.setOptionValue('output_flag', True)
+        highs.setOptionValue('log_to_console', False)
+        highs.setOptionValue('log_file', self.log_file)
+        highs.setOptionValue('time_limit', self.time_limit)
+        if self.threads > 0:
+            highs.setOptionValue('threads', self.threads)
+
+        highs.passModel(model.linear_program())
+
+        # Variables without a start value are left to HiGHS, which completes a partial start
+        start = model.start()
+        defined = np.flatnonzero(~np.isnan(start))
+        if defined.size > 0:
+            highs.setSolution(defined.size, defined.astype(np.int32), start[defined])
+
+        highs.run()
+
+        info = highs.getInfo()
+        status = self.__statuses.get(highs.getModelStatus(), gp.GRB.NUMERIC)
+        # A primal solution status of 2 is a feasible solution
+        feasible = info.primal_solution_status == 2
+
+        if model.IsMIP:
+            bound = info.mip_dual_bound
+        else:
+            bound = info.objective_function_value if status == gp.GRB.OPTIMAL else -gp.GRB.INFINITY
+
+        return HighsResult(
+            status,
+            np.array(highs.getSolution().col_value) if feasible else None,
+            info.objective_function_value if feasible else gp.GRB.INFINITY,
+            self.__finite(bound),
+            float(max(info.mip_node_count, 0)),
+            highs.getRunTime()
+        )
+
+
+    @staticmethod
+    def __finite(value: float) -> float:
+        # HiGHS reports a missing bound as +-inf, where Gurobi reports +-GRB.INFINITY
+        return float(np.clip(value, -gp.GRB.INFINITY, gp.GRB.INFINITY))
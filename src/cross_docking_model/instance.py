@@ -1,3 +1,9 @@
+import hashlib
+import math
+import os
+import re
+import tempfile
+
 import numpy as np
 import numpy.typing as npt
 
@@ -5,330 +11,315 @@ from typing import (
     Any,
     Dict,
     List,
-    TextIO
+    Optional,
+    Tuple
 )
 
 
-def skip_first_line(file: TextIO) -> None:
-    """
-    Skips the first line of the file.
-
-    Args:
-        file (TextIO): The file to read from.
-    """
-    title = file.readline().strip()
-    if title == "":
-        raise ValueError("Expected a title for the next section")
+# Scalar sections of an instance file, in file order, with the key they are stored under
+SCALAR_SECTIONS: List[str] = [
+    'seed',
+    'number_of_suppliers',
+    'inbound_docks',
+    'outbound_docks',
+    'vehicles',
+    'vehicle_capacity',
+    'number_of_customers',
+    'number_of_products',
+    'time_to_load_one_pallet',
+    'service_time_per_pallet',
+    'changeover_time'
+]
 
 
-def go_to_next_info(file: TextIO) -> None:
+def array_sections(scalars: Dict[str, int]) -> List[Tuple[str, Tuple[int, ...], bool]]:
     """
-    Goes to the next section of the file.
+    Lists the numeric sections of an instance file that follow the scalar sections.
 
     Args:
-        file (TextIO): The file to read from.
+        scalars (Dict[str, int]): The values of the scalar sections.
 
-    Raises:
-        ValueError: If an empty line is not found after the previous section.
-        ValueError: If a title is not found for the next section.
+    Returns:
+        List[Tuple[str, Tuple[int, ...], bool]]: The key, the shape and whether the values are integers, for each
+        section in file order.
     """
-    empty_line = file.readline().strip()
-    if empty_line != "":
-        raise ValueError("Expected an empty line after the previous section")
-
-    title = file.readline().strip()
-    if title == "":
-        raise ValueError("Expected a title for the next section")
-
-
-def read_line_as_string(file: TextIO) -> str:
+    S = scalars['number_of_suppliers']
+    N = scalars['number_of_customers']
+    P = scalars['number_of_products']
+
+    return [
+        ('processing_time_for_inbound_load', (S,), True),
+        ('time_window', (N + 2, 2), True),
+        ('quantity_of_required_pallets_per_customer', (N,), True),
+        ('quantity_of_required_products_per_customer', (P, N), True),
+        ('number_of_each_product_into_inbound_loads', (P, S), True),
+        ('volume_of_each_product', (P,), False),
+        ('travel_time', (N + 2, N + 2), False),
+        ('number_to_update_the_time_windows', (), False)
+    ]
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
     """
-    Reads a line from the file and returns it as a string.
+    Splits the content of an instance file into its sections.
 
     Args:
-        file (TextIO): The file to read from.
+        text (str): The content of the file.
 
     Returns:
-        The line read from the file as a string.
+        List[Tuple[str, str]]: The title and the body of each section.
 
     Raises:
-        ValueError: If the file is closed.
-        ValueError: If the read operation fails.
+        ValueError: If a section has no title or no body.
     """
-    try:
-        line = file.readline().strip()
-        if not line:
-            raise ValueError("Empty line read from file.")
-        
-        return line
-    except ValueError as e:
-        raise e
-    except Exception as e:
-        raise ValueError(f"Error reading line from file: {e}")
+    sections = []
+
+    for section in re.split(r'\n[ \t]*\n', text.strip()):
+        title, _, body = section.partition('\n')
+
+        if title.strip() == "":
+            raise ValueError("Expected a title for the next section")
 
+        if body.strip() == "":
+            raise ValueError(f"Empty section: {title.strip()}")
 
-def read_line_as_int(file: TextIO) -> int:
+        sections.append((title.strip(), body))
+
+    return sections
+
+
+def tokenize_data(text: str) -> Tuple[npt.NDArray[np.float64], str]:
     """
-    Reads a line from the file and returns it as an integer.
+    Tokenizes the content of an instance file. The numbers of every section are converted into a single buffer
+    in one pass, after checking the size of each section against the sizes declared at the top of the file.
 
     Args:
-        file (TextIO): The file to read from.
+        text (str): The content of the file.
 
     Returns:
-        int: The line read from the file as an integer.
+        Tuple[npt.NDArray[np.float64], str]: Every number of the file in file order, and the name of the instance.
 
     Raises:
-        ValueError: If the input data is not an integer.
+        ValueError: If the file does not have the expected sections.
+        ValueError: If a section does not have the expected number of values.
+        ValueError: If a section has a non-numeric value, or a non-integer value where integers are expected.
     """
-    line = read_line_as_string(file)
+    sections = split_sections(text)
 
-    if not line.isdecimal():
-        raise ValueError(f"Input data is not an integer: {line}")
+    if len(sections) != len(SCALAR_SECTIONS) + 9:
+        raise ValueError(f"Expected {len(SCALAR_SECTIONS) + 9} sections, found {len(sections)}")
 
-    return int(line)
+    tokens = [body.split() for _, body in sections[:-1]]
 
+    scalars = {}
+    for (title, _), key, values in zip(sections, SCALAR_SECTIONS, tokens):
+        if len(values) != 1 or not values[0].isdecimal():
+            raise ValueError(f"Input data is not an integer in section '{title}': {' '.join(values)}")
 
-def read_line_as_float(file: TextIO) -> float:
-    """
-    Reads a line from the file handler and returns it as a float.
+        scalars[key] = int(values[0])
 
-    Args:
-        file (TextIO): The file to read from.
+    integers = len(SCALAR_SECTIONS)
+    for (title, _), (_, shape, integer), values in zip(
+        sections[len(SCALAR_SECTIONS):],
+        array_sections(scalars),
+        tokens[len(SCALAR_SECTIONS):]
+    ):
+        if len(values) != math.prod(shape):
+            raise ValueError(f"Expected {math.prod(shape)} values in section '{title}', found {len(values)}")
 
-    Returns:
-        float: The line read from the file as a float.
+        if integer:
+            integers += len(values)
 
-    Raises:
-        ValueError: If the input data is not a float.
-    """
-    line: str = read_line_as_string(file)
+    try:
+        buffer = np.array([value for values in tokens for value in values], dtype=np.float64)
+    except ValueError as e:
+        raise ValueError(f"Input data is not numeric: {e}")
 
-    if not line.replace('.', '', 1).isdecimal():
-        raise ValueError(f"Input data is not a float: {line}")
+    if np.any(buffer[:integers] != np.trunc(buffer[:integers])):
+        raise ValueError("Input data is not an integer")
 
-    return float(line)
+    return buffer, sections[-1][1].strip()
 
 
-def read_line_as_list(file: TextIO) -> List[str]:
+def parse_data(text: str) -> Dict[str, Any]:
     """
-    Reads a line from the file and returns it as a list of strings.
+    Parses the content of an instance file.
 
     Args:
-        file (TextIO): The file to read from.
+        text (str): The content of the file.
 
     Returns:
-        List[str]: The line read from the file as a list of strings.
+        Dict[str, Any]: A dictionary containing the data read from the file.
     """
-    return read_line_as_string(file).split()
+    return unpack_data(*tokenize_data(text))
 
 
-def read_line_as_int_array(file: TextIO) -> npt.NDArray[np.int64]:
+def unpack_data(buffer: npt.NDArray[np.float64], instance: str) -> Dict[str, Any]:
     """
-    Reads a line from a file handler and returns it as a NumPy array of integers.
+    Builds the instance data from the numbers of an instance file.
 
     Args:
-        file (TextIO): The file to read from.
+        buffer (npt.NDArray[np.float64]): Every number of the file, in file order.
+        instance (str): The name of the instance.
 
     Returns:
-        npt.NDArray[np.int64]: A NumPy integer array containing the read values.
-
-    Raises:
-        ValueError: If the line contains non-integer values.
+        Dict[str, Any]: A dictionary containing the data read from the file.
     """
-    try:
-        return np.array([int(x) for x in read_line_as_list(file)], dtype=int)
-    except ValueError as e:
-        raise ValueError(f"Error reading line as integer array: {e}")
+    data: Dict[str, Any] = dict(zip(SCALAR_SECTIONS, buffer[:len(SCALAR_SECTIONS)].astype(np.int64).tolist()))
 
+    offset = len(SCALAR_SECTIONS)
+    for key, shape, integer in array_sections(data):
+        size = math.prod(shape)
+        values = buffer[offset:offset + size].reshape(shape)
+        offset += size
 
-def read_line_as_float_array(file: TextIO) -> npt.NDArray[np.float64]:
-    """
-    Reads a line of floating-point numbers from a file and returns a NumPy float array.
+        data[key] = values.astype(np.int64) if integer else np.array(values)
 
-    Args:
-        file (TextIO): The file to read from.
+    time_window = np.transpose(data.pop('time_window'))
+    data['time_window_start'] = time_window[0]
+    data['time_window_end'] = time_window[1]
+    data['number_to_update_the_time_windows'] = float(data['number_to_update_the_time_windows'])
+    data['instance'] = instance
 
-    Returns:
-        npt.NDArray[np.float64]: A NumPy float array containing the read values.
+    volume_of_each_product = data['volume_of_each_product']
+    inbound_docks = data['inbound_docks']
+    outbound_docks = data['outbound_docks']
 
-    Raises:
-        ValueError: If the line contains non-numeric values.
-    """
-    try:
-        return np.array([float(x) for x in read_line_as_list(file)], dtype=np.float64)
-    except ValueError as e:
-        raise ValueError(f"Error reading line as float array: {e}")
+    volume_expanded = volume_of_each_product[:, np.newaxis, np.newaxis]
+    inbound_docks_expanded = np.arange(inbound_docks)[:, np.newaxis]
+    outbound_docks_expanded = np.arange(outbound_docks)
 
+    # Calculate transfer time matrix
+    matrix = 0.4 * volume_expanded * (
+        10 + 2 * (inbound_docks_expanded - outbound_docks_expanded)
+    )
 
-def read_lines_as_int_matrix(
-        file: TextIO,
-        rows: int,
-        cols: int
-    ) -> npt.NDArray[np.int64]:
-    """
-    Reads a matrix of integers from the given file.
+    data['transfer_time_for_each_product'] = matrix.astype(np.float64)
 
-    Args:
-        file (TextIO): The file to read from.
-        rows (int): The number of rows in the matrix.
-        cols (int): The number of columns in the matrix.
+    return data
 
-    Returns:
-        npt.NDArray[np.int64]: The matrix of integers read from the file.
 
-    Raises:
-        ValueError: If the matrix shape does not match the expected shape.
-        ValueError: If there is an error reading a line as an integer array.
+def read_data(filename: str, cache: bool = False) -> Dict[str, Any]:
     """
-    try:
-        matrix = np.empty((rows, cols), dtype=np.int64)
-
-        for row_index in range(rows):
-            matrix[row_index] = read_line_as_int_array(file)
-        
-        if matrix.shape != (rows, cols):
-            raise ValueError(f"Matrix shape {matrix.shape} does not match expected shape ({rows}, {cols})")
-        
-        return matrix
-    except Exception as e:
-        raise ValueError(f"Error reading lines as int matrix: {e}")
-
-
-def read_lines_as_float_matrix(
-        file: TextIO,
-        rows: int,
-        cols: int
-    ) -> npt.NDArray[np.float64]:
-    """
-    Reads a matrix of floats from the given file.
+    Reads data from a file and returns a dictionary.
 
     Args:
-        file (TextIO): A text file to read from.
-        rows (int): The number of rows in the matrix.
-        cols (int): The number of columns in the matrix.
+        filename (str): The name of the file to read data from.
+        cache (bool): Whether to keep the numbers of the file in a binary sidecar next to it, so later reads skip
+            the parsing. The sidecar is discarded when the size or modification time of the file change.
 
     Returns:
-        npt.NDArray[np.float64]: The matrix of floats as a numpy array.
-
-    Raises:
-        ValueError: If the matrix shape does not match the expected shape.
-        ValueError: If there is an error reading a line as a float array.
+        A dictionary containing the data read from the file.
     """
-    try:
-        matrix = np.empty((rows, cols), dtype=np.float64)
-        
-        for row_index in range(rows):
-            array = read_line_as_float_array(file)
-            matrix[row_index] = np.array(array, dtype=np.float64)
-
-        if matrix.shape != (rows, cols):
-            raise ValueError(f"Matrix shape {matrix.shape} does not match expected shape ({rows}, {cols})")
-    
-        return matrix
-    except ValueError as e:
-        raise ValueError(f"Error reading lines as float array: {e}")
+    if cache:
+        sidecar = read_sidecar(filename)
+
+        if sidecar is not None:
+            return unpack_data(*sidecar)
+
+    with open(filename, 'r') as file:
+        buffer, instance = tokenize_data(file.read())
+
+    if cache:
+        write_sidecar(filename, buffer, instance)
+
+    return unpack_data(buffer, instance)
 
 
-def read_data(filename: str) -> Dict[str, Any]:
+def sidecar_path(filename: str) -> str:
     """
-    Reads data from a file and returns a dictionary.
+    Returns the path of the sidecar of an instance file.
 
     Args:
-        filename (str): The name of the file to read data from.
+        filename (str): The name of the instance file.
 
     Returns:
-        A dictionary containing the data read from the file.
+        str: The path of the sidecar.
     """
-    data = {}
+    return f'{filename}.bin'
 
-    with open(filename, 'r') as file:
-        skip_first_line(file)
-        data['seed'] = read_line_as_int(file)
 
-        go_to_next_info(file)
-        data['number_of_suppliers'] = read_line_as_int(file)
+def _file_signature(filename: str) -> List[int]:
+    stat = os.stat(filename)
 
-        go_to_next_info(file)
-        data['inbound_docks'] = read_line_as_int(file)
+    return [stat.st_size, stat.st_mtime_ns]
 
-        go_to_next_info(file)
-        data['outbound_docks'] = read_line_as_int(file)
 
-        go_to_next_info(file)
-        data['vehicles'] = read_line_as_int(file)
+# A sidecar holds the size and modification time of its file and the number of values as little-endian int64,
+# followed by the values as little-endian float64 and the name of the instance as UTF-8
+SIDECAR_HEADER: int = 3 * 8
 
-        go_to_next_info(file)
-        data['vehicle_capacity'] = read_line_as_int(file)
 
-        go_to_next_info(file)
-        data['number_of_customers'] = read_line_as_int(file)
+def read_sidecar(filename: str) -> Optional[Tuple[npt.NDArray[np.float64], str]]:
+    """
+    Reads the numbers of an instance file from its sidecar.
 
-        go_to_next_info(file)
-        data['number_of_products'] = read_line_as_int(file)
+    Args:
+        filename (str): The name of the instance file.
 
-        go_to_next_info(file)
-        data['time_to_load_one_pallet'] = read_line_as_int(file)
+    Returns:
+        Optional[Tuple[npt.NDArray[np.float64], str]]: Every number of the file and the name of the instance, or
+        None if the sidecar does not exist, cannot be read or does not match the file.
+    """
+    try:
+        with open(sidecar_path(filename), 'rb') as file:
+            raw = file.read()
 
-        go_to_next_info(file)
-        data['service_time_per_pallet'] = read_line_as_int(file)
+        size, modified, count = np.frombuffer(raw, dtype='<i8', count=3).tolist()
+        if [size, modified] != _file_signature(filename):
+            return None
 
-        go_to_next_info(file)
-        data['changeover_time'] = read_line_as_int(file)
+        buffer = np.frombuffer(raw, dtype='<f8', count=count, offset=SIDECAR_HEADER)
+        instance = raw[SIDECAR_HEADER + 8 * count:].decode()
+    except (OSError, ValueError):
+        return None
 
-        go_to_next_info(file)
-        data['processing_time_for_inbound_load'] = read_line_as_int_array(file)
+    return buffer, instance
 
-        go_to_next_info(file)
-        rows, cols = data['number_of_customers'] + 2, 2
-        time_window = np.transpose(read_lines_as_int_matrix(file, rows, cols))
-        data['time_window_start'] = time_window[0]
-        data['time_window_end'] = time_window[1]
 
-        go_to_next_info(file)
-        data['quantity_of_required_pallets_per_customer'] = read_line_as_int_array(file)
+def write_sidecar(filename: str, buffer: npt.NDArray[np.float64], instance: str) -> None:
+    """
+    Writes the numbers of an instance file to its sidecar, together with the size and modification time of the
+    file. The sidecar is written to a temporary file first, so concurrent runs never read a partial sidecar.
 
-        go_to_next_info(file)
-        rows, cols = data['number_of_products'], data['number_of_customers']
-        data['quantity_of_required_products_per_customer'] = read_lines_as_int_matrix(
-            file,
-            rows,
-            cols
-        )
+    Args:
+        filename (str): The name of the instance file.
+        buffer (npt.NDArray[np.float64]): Every number of the file, in file order.
+        instance (str): The name of the instance.
+    """
+    header = np.array(_file_signature(filename) + [buffer.size], dtype='<i8')
 
-        go_to_next_info(file)
-        rows, cols = data['number_of_products'], data['number_of_suppliers']
-        data['number_of_each_product_into_inbound_loads'] = read_lines_as_int_matrix(
-            file,
-            rows,
-            cols
-        )
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix='.tmp')
 
-        go_to_next_info(file)
-        data['volume_of_each_product'] = read_line_as_float_array(file)
+    with os.fdopen(fd, 'wb') as file:
+        file.write(header.tobytes())
+        file.write(buffer.astype('<f8').tobytes())
+        file.write(instance.encode())
 
-        go_to_next_info(file)
-        rows, cols = data['number_of_customers'] + 2, data['number_of_customers'] + 2
-        data['travel_time'] = read_lines_as_float_matrix(file, rows, cols)
+    os.replace(temporary, sidecar_path(filename))
 
-        go_to_next_info(file)
-        data['number_to_update_the_time_windows'] = read_line_as_float(file)
 
-        go_to_next_info(file)
-        data['instance'] = read_line_as_string(file)
+def hash_data(data: Dict[str, Any]) -> str:
+    """
+    Computes a content hash of the instance data returned by `read_data`, so equal instances get the same hash
+    regardless of the file they were read from.
 
-        volume_of_each_product = data['volume_of_each_product']
-        inbound_docks = data['inbound_docks']
-        outbound_docks = data['outbound_docks']
+    Args:
+        data (Dict[str, Any]): The instance data.
 
-        volume_expanded = volume_of_each_product[:, np.newaxis, np.newaxis]
-        inbound_docks_expanded = np.arange(inbound_docks)[:, np.newaxis]
-        outbound_docks_expanded = np.arange(outbound_docks)
+    Returns:
+        str: The hexadecimal SHA-256 digest of the data.
+    """
+    digest = hashlib.sha256()
 
-        # Calculate transfer time matrix
-        matrix = 0.4 * volume_expanded * (
-            10 + 2 * (inbound_docks_expanded - outbound_docks_expanded)
-        )
+    for key in sorted(data):
+        value = data[key]
+        digest.update(key.encode())
 
-        data['transfer_time_for_each_product'] = matrix.astype(np.float64)
+        if isinstance(value, np.ndarray):
+            digest.update(f"{value.dtype.str}{value.shape}".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
 
-    return data
+    return digest.hexdigest()
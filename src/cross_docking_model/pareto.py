@@ -0,0 +1,92 @@
+import json
+import os
+
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List
+)
+
+
+class ParetoArchive:
+    """
+    Non-dominated set of solutions of the two objectives of the model, oc and nv, both minimized. Points are kept
+    in ascending order of oc, so nv descends along the archive. Two values closer than `tolerance`, relative to
+    their magnitude, are equal, so duplicates of an archived point are rejected.
+    """
+    tolerance: float
+    points: List[Dict[str, Any]]
+
+
+    def __init__(self, tolerance: float = 1e-6):
+        if tolerance < 0:
+            raise ValueError(f'tolerance must be a float greater than or equal to 0: {str(tolerance)}')
+
+        self.tolerance = tolerance
+        self.points = []
+
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.points)
+
+
+    def dominates(self, point: Dict[str, Any], other: Dict[str, Any]) -> bool:
+        """
+        Checks whether a point is at least as good as another in both objectives, within the tolerance.
+
+        Args:
+            point (Dict[str, Any]): The point, with its 'oc' and 'nv' values.
+            other (Dict[str, Any]): The point it is compared to.
+
+        Returns:
+            bool: Whether point dominates or duplicates other.
+        """
+        return all(point[name] <= other[name] + self.__slack(other[name]) for name in ['oc', 'nv'])
+
+
+    def add(self, oc: float, nv: float, **tags: Any) -> bool:
+        """
+        Adds a point unless an archived point dominates or duplicates it, removing the points it dominates.
+
+        Args:
+            oc (float): The value of the operational cost objective.
+            nv (float): The value of the vehicles objective.
+            **tags (Any): Extra fields kept with the point, such as the solve that found it.
+
+        Returns:
+            bool: Whether the point was added.
+        """
+        point = {'oc': oc, 'nv': nv, **tags}
+
+        if any(self.dominates(archived, point) for archived in self.points):
+            return False
+
+        self.points = [archived for archived in self.points if not self.dominates(point, archived)]
+        self.points.append(point)
+        self.points.sort(key=lambda archived: (archived['oc'], archived['nv']))
+
+        return True
+
+
+    def write(self, path: str) -> None:
+        """
+        Writes the archive as a JSON list of points.
+
+        Args:
+            path (str): The file to write.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, 'w') as file:
+            json.dump(self.points, file, indent=2)
+
+
+    def __slack(self, value: float) -> float:
+        return self.tolerance * max(1.0, abs(value))
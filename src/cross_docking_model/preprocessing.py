@@ -0,0 +1,177 @@
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple
+)
+
+import numpy as np
+import numpy.typing as npt
+
+
+def admissible_flows(
+        data: Dict[str, Any],
+        pairs: Optional[npt.NDArray[np.bool_]] = None
+    ) -> npt.NDArray[np.bool_]:
+    """
+    Computes which (product, supplier, customer) triples can carry flow in the transfer variables.
+
+    A supplier can only ship a product it brings in an inbound load, and the vehicle of a customer can only
+    receive a product that is required by the customer itself or by another customer that can share its
+    vehicle.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        pairs (Optional[npt.NDArray[np.bool_]]): A (customers, customers) mask where entry [j, i] tells whether
+            customer j can travel in the vehicle of customer i. Every pair of distinct customers is allowed when
+            omitted.
+
+    Returns:
+        npt.NDArray[np.bool_]: A (products, suppliers, customers) mask of the admissible triples.
+    """
+    supplied = data['number_of_each_product_into_inbound_loads'] > 0
+    required = data['quantity_of_required_products_per_customer'] > 0
+
+    if pairs is None:
+        pairs = ~np.eye(data['number_of_customers'], dtype=bool)
+
+    reachable = required | (required.astype(np.int64) @ pairs.astype(np.int64) > 0)
+
+    return supplied[:, :, np.newaxis] & reachable[:, np.newaxis, :]
+
+
+def transfer_factors(data: Dict[str, Any]) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Splits the transfer time of each product between a pair of docks into the volume of the product and a time
+    per unit of volume of the pair of docks.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+
+    Returns:
+        Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]: The (products,) volumes and the (inbound docks,
+        outbound docks) times per unit of volume, whose outer product is the transfer time.
+
+    Raises:
+        ValueError: If the transfer times are not the product of a volume and a time of the pair of docks.
+    """
+    TR = data['transfer_time_for_each_product']
+    volume = data['volume_of_each_product'].astype(np.float64)
+
+    largest = int(np.argmax(np.abs(volume)))
+    if volume[largest] != 0:
+        docks = TR[largest] / volume[largest]
+    else:
+        docks = np.zeros(TR.shape[1:])
+
+    if not np.allclose(TR, volume[:, np.newaxis, np.newaxis] * docks[np.newaxis, :, :]):
+        raise ValueError('the transfer times are not separable into volumes and times between docks')
+
+    return volume, docks
+
+
+def compatible_pairs(data: Dict[str, Any]) -> npt.NDArray[np.bool_]:
+    """
+    Computes which pairs of distinct customers can share a vehicle, as their pallets must fit in it together.
+
+    Time windows are not used, since the model only penalizes visits outside of them.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+
+    Returns:
+        npt.NDArray[np.bool_]: A (customers, customers) mask where entry [j, i] tells whether customer j can
+        travel in the vehicle of customer i, in the layout taken by `admissible_flows`. It is symmetric.
+    """
+    Q = data['quantity_of_required_pallets_per_customer']
+
+    return (Q[:, np.newaxis] + Q[np.newaxis, :] <= data['vehicle_capacity']) & ~np.eye(Q.size, dtype=bool)
+
+
+def big_m_values(data: Dict[str, Any], limit: float = 1000, tight: bool = True) -> Dict[str, npt.NDArray[np.float64]]:
+    """
+    Computes the big-M constant of every row of the disjunctive scheduling and routing constraints.
+
+    The constants come from bounds on the times of a schedule without idle time. Unloading times are bounded by
+    the processing time of every inbound load, ready times add the longest transfer of a supplier, departure
+    times add the changeover and loading of every vehicle, and visiting times add the service and travel along
+    the longest route that fits in a vehicle, after waiting for the latest time window. Waiting is only needed
+    up to the start of a time window, so every optimal solution keeps its routes and assignments with these
+    times. The constant of a row is what makes its relaxed side implied by those bounds and by a lower bound on
+    the time it constrains.
+
+    Args:
+        data (Dict[str, Any]): The instance data returned by `instance.read_data`.
+        limit (float): The largest constant used, the one of the original formulation, so the model is never
+            looser than it.
+        tight (bool): Whether to derive the constants from the instance, or use `limit` for every row.
+
+    Returns:
+        Dict[str, npt.NDArray[np.float64]]: The constants of the families 'unloading_time_order' (suppliers,
+        suppliers), '8' (customers, customers), '12' (suppliers, customers), '13' (customers,), '15'
+        (customers,) and '22' (customers, customers), indexed like the model with the dock nodes of the
+        customer index at positions 0 and N + 1.
+    """
+    S = data['number_of_suppliers']
+    N = data['number_of_customers']
+    C = N + 2
+
+    shapes = {
+        'unloading_time_order': (S, S),
+        '8': (C, C),
+        '12': (S, C),
+        '13': (C,),
+        '15': (C,),
+        '22': (C, C)
+    }
+
+    if not tight:
+        return {family: np.full(shape, float(limit)) for family, shape in shapes.items()}
+
+    PT = data['processing_time_for_inbound_load'].astype(np.float64)
+    R = data['number_of_each_product_into_inbound_loads'].astype(np.float64)
+    Q = data['quantity_of_required_pallets_per_customer'].astype(np.float64)
+    ST = np.concatenate(([0.0], Q * 2, [0.0]))
+    TR = data['transfer_time_for_each_product'].astype(np.float64)
+    TT = data['travel_time'].astype(np.float64)
+    A = data['time_window_start'].astype(np.float64)
+
+    CAP = data['vehicle_capacity']
+    LT = data['time_to_load_one_pallet']
+    CT_ = data['changeover_time']
+
+    c = np.arange(1, C - 1)
+
+    # Upper bounds on the unloading, ready and departure times: loads unloaded one after the other, the
+    # longest transfer of a supplier, and every vehicle loaded one after the other on the same dock
+    ut_max = PT.sum()
+    rt_max = ut_max + (R * TR.max(axis=(1, 2))[:, None]).sum(axis=0).max(initial=0)
+    dt_max = rt_max + LT * Q.sum() + max(N - 1, 0) * CT_
+
+    # Upper bound on the visiting times: the longest route that fits in a vehicle, starting after the latest
+    # departure or the latest time window
+    stops = np.count_nonzero(np.cumsum(np.sort(Q)) <= CAP)
+    t_max = (
+        max(A[c].max(initial=0), dt_max + TT[0, c].max(initial=0))
+        + 2 * min(CAP, Q.sum())
+        + max(stops - 1, 0) * TT[np.ix_(c, c)].max(initial=0)
+    )
+
+    # Lower bound on the visiting times: every node is reached from the inbound dock, after loading its own
+    # pallets, or from another customer
+    arrival = ST[c, None] + TT[c, :]
+    arrival[c - 1, c] = np.inf
+    t_min = arrival.min(axis=0, initial=np.inf)
+    t_min[c] = np.minimum(t_min[c], LT * Q + TT[0, c])
+    t_min[0] = 0
+
+    derived = {
+        'unloading_time_order': np.full(shapes['unloading_time_order'], ut_max),
+        '8': np.full(shapes['8'], dt_max + CT_),
+        '12': np.full(shapes['12'], ut_max),
+        '13': dt_max + TT[0, :] - t_min,
+        '15': np.full(shapes['15'], ut_max),
+        '22': t_max + ST[:, None] + TT - t_min[None, :]
+    }
+
+    return {family: np.minimum(values, limit) for family, values in derived.items()}
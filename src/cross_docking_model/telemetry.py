@@ -0,0 +1,177 @@
+import json
+import os
+import time
+
+import gurobipy as gp
+
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    TextIO
+)
+
+
+class Telemetry:
+    """
+    Streams the progress of the solves of a model as JSON lines, one event per line.
+
+    A 'start' and an 'end' event enclose every solve. In between, an 'incumbent' event is written whenever a new
+    incumbent is found, and a 'progress' event at most once per `interval` seconds. Every event holds the phase
+    of the solve, the tags of the stream and of the solve, the elapsed time, the incumbent, the best bound, the
+    gap and the number of explored nodes. A decomposition solve also writes a 'bounds' event whenever a routing is
+    priced, with the best priced solution as the incumbent and the bound of the master problem.
+    """
+    path: str
+    interval: float
+    tags: Dict[str, Any]
+
+
+    def __init__(self, path: str, interval: float = 1.0, tags: Optional[Dict[str, Any]] = None):
+        if interval < 0:
+            raise ValueError(f'interval must be a float greater than or equal to 0: {str(interval)}')
+
+        self.path = path
+        self.interval = interval
+        self.tags = dict(tags or {})
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.__file: TextIO = open(path, 'a', buffering=1)
+        self.__solve_tags: Dict[str, Any] = {}
+        self.__last_write = float('-inf')
+
+
+    def start(self, phase: str, **tags: Any) -> None:
+        """
+        Opens the events of a new solve.
+
+        Args:
+            phase (str): The phase of the solve, 'reference' or 'final'.
+            **tags (Any): Extra fields written in every event of the solve, such as the alpha or epsilon value.
+        """
+        self.__solve_tags = {'phase': phase, **tags}
+        self.__last_write = float('-inf')
+
+        self.__write('start', elapsed=0.0)
+
+
+    def callback(self, model: gp.Model, where: int) -> None:
+        """
+        Writes the events of a Gurobi callback. It is meant to be called from the callback passed to `optimize`.
+
+        Args:
+            model (gp.Model): The model being solved.
+            where (int): Where the callback was called from.
+        """
+        if where == gp.GRB.Callback.MIPSOL:
+            # The best objective still excludes the solution being reported
+            found = model.cbGet(gp.GRB.Callback.MIPSOL_OBJ)
+            best = model.cbGet(gp.GRB.Callback.MIPSOL_OBJBST)
+
+            self.__write(
+                'incumbent',
+                elapsed=model.cbGet(gp.GRB.Callback.RUNTIME),
+                incumbent=found if model.ModelSense * (found - best) < 0 else best,
+                bound=model.cbGet(gp.GRB.Callback.MIPSOL_OBJBND),
+                nodes=int(model.cbGet(gp.GRB.Callback.MIPSOL_NODCNT))
+            )
+
+        elif where == gp.GRB.Callback.MIP:
+            if time.monotonic() - self.__last_write < self.interval:
+                return
+
+            self.__write(
+                'progress',
+                elapsed=model.cbGet(gp.GRB.Callback.RUNTIME),
+                incumbent=model.cbGet(gp.GRB.Callback.MIP_OBJBST),
+                bound=model.cbGet(gp.GRB.Callback.MIP_OBJBND),
+                nodes=int(model.cbGet(gp.GRB.Callback.MIP_NODCNT))
+            )
+
+
+    def bounds(self, elapsed: float, incumbent: Optional[float], bound: float, routings: int) -> None:
+        """
+        Writes the bounds of a decomposition solve.
+
+        Args:
+            elapsed (float): The elapsed time of the master problem.
+            incumbent (Optional[float]): The objective of the best priced solution, if any.
+            bound (float): The best bound of the master problem.
+            routings (int): The number of routings priced so far.
+        """
+        self.__write('bounds', elapsed=elapsed, incumbent=incumbent, bound=bound, routings=routings)
+
+
+    def finish(self, model: gp.Model, cached: bool = False) -> None:
+        """
+        Closes the events of a solve with its outcome.
+
+        Args:
+            model (gp.Model): The solved model, or the `highs.HighsResult` of a HiGHS solve.
+            cached (bool): Whether the solve was skipped because its result was cached.
+        """
+        if cached:
+            self.__write('end', cached=True)
+            return
+
+        nodes = self.__attribute(model, 'NodeCount')
+
+        self.__write(
+            'end',
+            elapsed=model.Runtime,
+            status=model.Status,
+            incumbent=self.__attribute(model, 'ObjVal') if model.SolCount > 0 else None,
+            bound=self.__attribute(model, 'ObjBound'),
+            nodes=int(nodes) if nodes is not None else None
+        )
+
+
+    def close(self) -> None:
+        """
+        Closes the stream.
+        """
+        self.__file.close()
+
+
+    def __write(self, event: str, **fields: Any) -> None:
+        fields = {key: self.__finite(value) for key, value in fields.items()}
+
+        if 'incumbent' in fields and 'bound' in fields:
+            fields['gap'] = self.__gap(fields['incumbent'], fields['bound'])
+
+        record = {'event': event, 'timestamp': time.time(), **self.tags, **self.__solve_tags, **fields}
+        self.__file.write(json.dumps(record) + '\n')
+
+        self.__last_write = time.monotonic()
+
+
+    @staticmethod
+    def __attribute(model: gp.Model, name: str) -> Any:
+        # Some attributes, such as the bound of a multi-objective solve, are not available after every solve
+        try:
+            return model.getAttr(name)
+        except (AttributeError, gp.GurobiError):
+            return None
+
+
+    @staticmethod
+    def __finite(value: Any) -> Any:
+        # Gurobi reports a missing incumbent or bound as +-GRB.INFINITY
+        if isinstance(value, float) and abs(value) >= gp.GRB.INFINITY:
+            return None
+
+        return value
+
+
+    @staticmethod
+    def __gap(incumbent: Optional[float], bound: Optional[float]) -> Optional[float]:
+        if incumbent is None or bound is None:
+            return None
+
+        if incumbent == 0:
+            return 0.0 if bound == 0 else None
+
+        return abs(incumbent - bound) / abs(incumbent)
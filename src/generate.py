@@ -0,0 +1,165 @@
+#!/usr/bin/python3 python3.11
+
+import argparse
+import os
+from typing import Tuple
+
+from cross_docking_model.generator import (
+    PRESETS,
+    generate_instances,
+    instance_grid
+)
+
+
+def main(args):
+    grid = dict(PRESETS[args.preset])
+    for key in ['customers', 'demands', 'products', 'suppliers', 'inbound_docks', 'outbound_docks', 'product_types']:
+        if getattr(args, key) is not None:
+            grid[key] = getattr(args, key)
+
+    if args.adjustments is not None:
+        grid['adjustments'] = args.adjustments
+
+    instances = instance_grid(args.files, max_products=args.max_products, seed=args.seed, **grid)
+
+    count = 0
+    for filename in generate_instances(instances, args.output_dir, jobs=args.jobs):
+        count += 1
+
+        if args.verbose:
+            print(filename)
+
+    print(f'{count} instance(s) written to {args.output_dir}')
+
+
+def demand(value: str) -> Tuple[int, int, int]:
+    try:
+        first, last, vehicles = (int(part) for part in value.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected <min pallets>:<max pallets>:<vehicles>: {value}')
+
+    if not 0 < first <= last:
+        raise argparse.ArgumentTypeError(f'expected 0 < min pallets <= max pallets: {value}')
+
+    return first, last, vehicles
+
+
+def get_cli_args():
+    parser = argparse.ArgumentParser(
+        prog='Cross Docking Instance Generator',
+        description='Generate instances of the cross-docking model from Solomon instances, like the C++ generators '
+                    'in generation'
+    )
+
+    parser.add_argument(
+        'files',
+        nargs='+',
+        type=str,
+        help='Solomon instances, e.g. generation/In/r101.txt, or inputs of the C++ generators, which hold a seed'
+    )
+    parser.add_argument(
+        '-p',
+        '--preset',
+        choices=list(PRESETS),
+        default='C50',
+        type=str,
+        help='Parameter grid of one of the C++ generators, the other options override its values'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        default=None,
+        type=int,
+        help='Seed of every file, required for Solomon instances and overriding the seed of generator inputs'
+    )
+    parser.add_argument(
+        '-c',
+        '--customers',
+        default=None,
+        nargs='+',
+        type=int,
+        help='Numbers of customers, taken from the start of each file'
+    )
+    parser.add_argument(
+        '-d',
+        '--demands',
+        default=None,
+        nargs='+',
+        type=demand,
+        help='Demand intervals as <min pallets>:<max pallets>:<vehicles>, e.g. 2:8:10 4:16:10'
+    )
+    parser.add_argument(
+        '--products',
+        default=None,
+        nargs='+',
+        type=int,
+        help='Numbers of products'
+    )
+    parser.add_argument(
+        '--suppliers',
+        default=None,
+        nargs='+',
+        type=int,
+        help='Numbers of inbound loads'
+    )
+    parser.add_argument(
+        '--inbound-docks',
+        default=None,
+        nargs='+',
+        type=int,
+        help='Numbers of inbound docks'
+    )
+    parser.add_argument(
+        '--outbound-docks',
+        default=None,
+        nargs='+',
+        type=int,
+        help='Numbers of outbound docks'
+    )
+    parser.add_argument(
+        '--product-types',
+        default=None,
+        nargs='+',
+        type=int,
+        help='Max percentages of the products required by a customer'
+    )
+    parser.add_argument(
+        '--adjustments',
+        default=None,
+        nargs='+',
+        type=float,
+        help='Shares of the average processing time of an inbound dock added to the time windows, named as a prefix'
+    )
+    parser.add_argument(
+        '--max-products',
+        default=3,
+        type=int,
+        help='Max number of products of an inbound load besides its first one'
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        default=1,
+        type=int,
+        help='Number of instances generated in parallel, each in its own process'
+    )
+    parser.add_argument(
+        '-o',
+        '--output-dir',
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'generation', 'generated'),
+        type=str,
+        help='Directory where the instances are written'
+    )
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        action='store_true',
+        help='Print the name of every instance written'
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_cli_args()
+    main(args)
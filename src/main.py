@@ -1,87 +1,344 @@
 #!/usr/bin/python3 python3.11
 
 import argparse
+import json
 import os
+import shutil
+import tempfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    as_completed,
+    wait
+)
 from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional
+)
 
 from cross_docking_model import (
     instance as Instance,
     CrossDockingSolver as Model
 )
+from cross_docking_model.alns import AdaptiveLargeNeighbourhoodSearch
+from cross_docking_model.cache import (
+    ModelCache,
+    ReferenceCache
+)
+from cross_docking_model.estimate import (
+    build_estimate,
+    lighter_formulation
+)
+from cross_docking_model.telemetry import Telemetry
 
 
 def main(args):
-    for instance in args.instances:
-        data = Instance.read_data(instance)
-
-        for mode in args.mode:
-            if mode == 'wsm':
-                for alpha in args.alpha:
-                    output = f'{args.output_dir}/{mode}/alpha/{alpha}/{instance}'
-
-                    model = Model.CrossDockingSolver(
-                        data=data,
-                        mode=mode,
-                        alpha=alpha,
-                        time_limit=args.time_limit,
-                        time_unit=args.time_unit
-                    )
-
-                    model.solve()
-                    model.print_solution()
-                    model.clear()
-
-                    write_instance_to_file(output)
-
-            elif mode == 'r-e':
-                for epsilon in args.epsilon:
-                    output = f'{args.output_dir}/{mode}/epsilon/{epsilon}'
-
-                    model = Model.CrossDockingSolver(
-                        data=data,
-                        mode=mode,
-                        epsilon=epsilon,
-                        time_limit=args.time_limit,
-                        time_unit=args.time_unit
-                    )
-
-                    model.solve()
-                    model.print_solution()
-                    model.clear()
-
-                    write_instance_to_file(output)
-
-            else:
-                output = f'{args.output_dir}/{mode}'
-
-                model = Model.CrossDockingSolver(
-                    data=data,
-                    mode=mode,
-                    time_limit=args.time_limit,
-                    time_unit=args.time_unit
+    cache = None
+    if args.reference_cache is not None:
+        cache = ReferenceCache(args.reference_cache, max_bytes=args.reference_cache_size)
+
+        if args.clear_reference_cache:
+            cache.invalidate()
+
+    model_cache = None
+    if args.model_cache is not None:
+        model_cache = ModelCache(args.model_cache, max_bytes=args.model_cache_size)
+
+    jobs = [(instance, mode) for instance in args.instances for mode in args.mode]
+
+    if args.estimate:
+        for instance, mode in jobs:
+            print(json.dumps({'instance': instance, 'mode': mode, **estimate_job(args, instance, mode)}))
+
+        return
+
+    if args.jobs <= 1:
+        for instance, mode in jobs:
+            run_job(args, cache, model_cache, instance, mode, log_file_path, 0)
+
+        return
+
+    # Every job gets its own log file and an equal share of the machine's threads
+    threads = max(1, (os.cpu_count() or 1) // args.jobs)
+    log_dir = tempfile.mkdtemp(prefix='grbtune-')
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            def submit(index: int):
+                instance, mode = jobs[index]
+
+                return executor.submit(
+                    run_job, args, cache, model_cache, instance, mode, os.path.join(log_dir, f'{index}.log'), threads
                 )
 
-                model.solve()
+            if args.memory_limit is None:
+                for future in as_completed([submit(index) for index in range(len(jobs))]):
+                    future.result()
+
+                return
+
+            # The largest builds start first, and each job starts as soon as the estimated memory of the running
+            # builds leaves room for it; a job larger than the limit runs alone
+            memory = [estimate_job(args, instance, mode)['memory'] for instance, mode in jobs]
+            waiting = sorted(range(len(jobs)), key=lambda index: memory[index], reverse=True)
+            running = {}
+
+            while waiting or running:
+                for index in list(waiting):
+                    if len(running) >= args.jobs:
+                        break
+
+                    used = sum(memory[job] for job in running.values())
+                    if running and used + memory[index] > args.memory_limit:
+                        continue
+
+                    waiting.remove(index)
+                    running[submit(index)] = index
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    future.result()
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+def estimate_job(args: argparse.Namespace, instance: str, mode: str) -> Dict[str, Any]:
+    # The estimated size and peak build memory of the model of a job, after the downgrades its budget allows
+    if mode == 'alns':
+        # The search does not build the model
+        return {'variables': 0, 'constraints': 0, 'nonzeros': 0, 'memory': 0, 'downgrades': []}
+
+    data = Instance.read_data(instance, cache=args.instance_cache)
+    options = {
+        'builder': args.builder,
+        'sparse_rho': args.sparse_rho,
+        'lazy': args.lazy,
+        'eliminate_pairs': args.eliminate_pairs,
+        'aggregate_flows': args.aggregate_flows,
+        'tight_big_m': not args.loose_big_m
+    }
+    estimate, downgrades = build_estimate(data, **options), []
+
+    if args.memory_budget is not None and args.downgrade and estimate['memory'] > args.memory_budget:
+        _, downgrades, estimate = lighter_formulation(
+            data, args.memory_budget, options, allow_lazy=args.backend == 'gurobi'
+        )
+
+    return {**estimate, 'downgrades': downgrades}
+
+
+def run_job(
+    args: argparse.Namespace,
+    cache: Optional[ReferenceCache],
+    model_cache: Optional[ModelCache],
+    instance: str,
+    mode: str,
+    log_file: str,
+    threads: int
+):
+    data = Instance.read_data(instance, cache=args.instance_cache)
+
+    telemetry = None
+    if args.telemetry is not None:
+        telemetry = Telemetry(
+            os.path.join(args.telemetry, mode, f'{Path(instance).stem}.jsonl'),
+            interval=args.telemetry_interval,
+            tags={'instance': instance, 'mode': mode}
+        )
+
+    # What the job gives to the solver of every mode besides the options of the command line
+    resources = {
+        'cache': cache,
+        'model_cache': model_cache,
+        'log_file': log_file,
+        'threads': threads,
+        'telemetry': telemetry
+    }
+
+    if mode == 'wsm':
+        model = build_solver(args, data, mode, **resources, alpha=args.alpha[0])
+        report_build(args, model)
+
+        if args.scenarios:
+            # The scenarios share one solve, so its log is written to the output of every alpha
+            outputs = []
+            for alpha in model.solve_scenarios(args.alpha):
+                outputs.append(f'{args.output_dir}/{mode}/alpha/{alpha}/{instance}')
+
+                model.print_solution()
+
+            for output in outputs:
+                write_instance_to_file(output, log_file, remove=output == outputs[-1])
+
+        else:
+            for alpha in model.sweep(args.alpha, warm_start=not args.no_warm_start):
+                output = f'{args.output_dir}/{mode}/alpha/{alpha}/{instance}'
+
                 model.print_solution()
-                model.clear()
 
-                write_instance_to_file(output)
+                write_instance_to_file(output, log_file)
+
+        write_front(args, model, mode, instance)
+        model.clear()
+
+    elif mode == 'r-e':
+        model = build_solver(args, data, mode, **resources, epsilon=args.epsilon[0])
+        report_build(args, model)
+
+        for epsilon in model.sweep(args.epsilon, warm_start=not args.no_warm_start):
+            output = f'{args.output_dir}/{mode}/epsilon/{epsilon}'
+
+            model.print_solution()
 
+            write_instance_to_file(output, log_file)
 
-def write_instance_to_file(filename: str):
+        write_front(args, model, mode, instance)
+        model.clear()
+
+    elif mode == 'alns':
+        # The search does not build the model, so it also runs on instances too large for it
+        search = AdaptiveLargeNeighbourhoodSearch(
+            data,
+            time_unit=args.time_unit,
+            seed=args.alns_seed,
+            log_file=log_file
+        )
+        search.run(args.alns_iterations, args.time_limit)
+        search.print_solution()
+        search.close()
+
+        write_instance_to_file(f'{args.output_dir}/{mode}', log_file)
+
+    elif mode == 'pareto':
+        model = build_solver(args, data, mode, **resources)
+        report_build(args, model)
+
+        for _ in model.frontier(args.pareto_solves, args.pareto_tolerance):
+            model.print_solution()
+
+        model.front.write(f'{args.output_dir}/{mode}/{instance}.json')
+        model.clear()
+
+        write_instance_to_file(f'{args.output_dir}/{mode}/{instance}', log_file)
+
+    else:
+        output = f'{args.output_dir}/{mode}'
+
+        model = build_solver(args, data, mode, **resources)
+        report_build(args, model)
+
+        model.solve()
+        model.print_solution()
+
+        for update in args.updates:
+            apply_update(model, update)
+            model.solve()
+            model.print_solution()
+
+        write_front(args, model, mode, instance)
+        model.clear()
+
+        write_instance_to_file(output, log_file)
+
+    if telemetry is not None:
+        telemetry.close()
+
+
+def build_solver(args: argparse.Namespace, data: Dict, mode: str, **overrides) -> Model.CrossDockingSolver:
+    # The command line options shared by every mode that builds the model, the caller gives the rest
+    options = {
+        'time_limit': args.time_limit,
+        'time_unit': args.time_unit,
+        'builder': args.builder,
+        'backend': args.backend,
+        'sparse_rho': args.sparse_rho,
+        'lazy': args.lazy,
+        'tight_big_m': not args.loose_big_m,
+        'eliminate_pairs': args.eliminate_pairs,
+        'aggregate_flows': args.aggregate_flows,
+        'decomposition': args.decomposition,
+        'pool_solutions': args.pool_solutions,
+        'heuristic_start': args.heuristic_start,
+        'alns_iterations': args.alns_iterations if args.alns_start else 0,
+        'instrument': args.profile_build,
+        'memory_budget': args.memory_budget,
+        'downgrade': args.downgrade
+    }
+    options.update(overrides)
+
+    return Model.CrossDockingSolver(data=data, mode=mode, **options)
+
+
+def report_build(args: argparse.Namespace, model: Model.CrossDockingSolver):
+    if args.memory_budget is not None:
+        model.print_estimate()
+
+    if args.profile_build:
+        model.print_build_profile()
+
+    if args.eliminate_pairs:
+        model.print_elimination()
+
+
+def apply_update(model: Model.CrossDockingSolver, update: Dict[str, Any]):
+    arguments = dict(update)
+    operation = arguments.pop('operation')
+
+    getattr(model, operation)(**arguments)
+
+    print(f'Update {operation}: {model.update_time:.4f} seconds')
+
+
+def write_front(args: argparse.Namespace, model: Model.CrossDockingSolver, mode: str, instance: str):
+    # The front harvested from the solution pools of every solve of the instance
+    if args.pool_solutions <= 0:
+        return
+
+    output = f'{args.output_dir}/front/{mode}/{instance}.json'
+    model.front.write(output)
+
+    print(f'Front of {len(model.front)} non-dominated points written to {output}')
+
+
+def write_instance_to_file(filename: str, log_path: str = 'grbtune.log', remove: bool = True):
     os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-    with open(log_file_path, 'r') as log_file:
+    with open(log_path, 'r') as log_file:
         with open(filename, 'w') as output_file:
             for line in log_file:
                 output_file.write(line)
 
+    if not remove:
+        return
+
     try:
-        os.remove(log_file_path)
+        os.remove(log_path)
     except OSError:
         pass
 
 
+def updates(value: str) -> List[Dict[str, Any]]:
+    # One change of the instance per line, as a JSON object with the operation and the arguments of the method of
+    # the solver that applies it
+    try:
+        with open(value, 'r') as file:
+            changes = [json.loads(line) for line in file if line.strip()]
+    except (OSError, ValueError) as error:
+        raise argparse.ArgumentTypeError(f'cannot read the updates of {value}: {error}')
+
+    for change in changes:
+        if not isinstance(change, dict) or change.get('operation') not in UPDATE_OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"expected an object whose operation is one of {', '.join(UPDATE_OPERATIONS)}: {json.dumps(change)}"
+            )
+
+    return changes
+
+
 def get_cli_args():
     parser = argparse.ArgumentParser(
         prog='Cross Docking Linear Model',
@@ -103,6 +360,13 @@ def get_cli_args():
         type=int,
         help='Time unit value'
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        default=1,
+        type=int,
+        help='Number of instance and mode combinations solved in parallel, each one with its share of the threads'
+    )
     parser.add_argument(
         '-o',
         '--output-dir',
@@ -113,12 +377,120 @@ def get_cli_args():
     parser.add_argument(
         '-m',
         '--mode',
-        choices=['single', 'multi', 'wsm', 'r-e'],
+        choices=['single', 'multi', 'wsm', 'r-e', 'pareto', 'alns'],
         default=['single'],
         nargs='*',
         type=str,
         help='Select the desired solution method'
     )
+    parser.add_argument(
+        '-b',
+        '--builder',
+        choices=['quicksum', 'matrix'],
+        default='quicksum',
+        type=str,
+        help='Select how the model is built: expression by expression or from sparse coefficient matrices'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['gurobi', 'highs'],
+        default='gurobi',
+        type=str,
+        help='Select the solver of the built model: Gurobi, or HiGHS in the single, wsm, r-e and pareto modes'
+    )
+    parser.add_argument(
+        '--sparse-rho',
+        action='store_true',
+        help='Only create flow variables for the product, supplier and customer combinations that can carry flow'
+    )
+    parser.add_argument(
+        '--lazy',
+        choices=['19', '6', 'sort_inbound_loads'],
+        default=[],
+        nargs='+',
+        type=str,
+        help='Constraint families left out of the model and added as lazy constraints when a solution violates them'
+    )
+    parser.add_argument(
+        '--aggregate-flows',
+        action='store_true',
+        help='Split the flow variables into product flows and volume flows between docks, which is exact because '
+             'the transfer time is the volume of a product times a time of the pair of docks'
+    )
+    parser.add_argument(
+        '--eliminate-pairs',
+        action='store_true',
+        help='Fix to zero the arcs and vehicle assignments of customers whose pallets do not fit in one vehicle'
+    )
+    parser.add_argument(
+        '--loose-big-m',
+        action='store_true',
+        help='Use M = 1000 in every disjunctive constraint instead of the constants derived from the instance'
+    )
+    parser.add_argument(
+        '--decomposition',
+        action='store_true',
+        help='Solve by Benders decomposition: a master problem picks the routes and each one is priced by a dock '
+             'scheduling subproblem, printing the lower and upper bounds as they improve; not available in '
+             '\'multi\' mode'
+    )
+    parser.add_argument(
+        '--memory-budget',
+        default=None,
+        type=float,
+        help='Max estimated peak memory of a build in bytes, larger builds are refused unless --downgrade is set'
+    )
+    parser.add_argument(
+        '--downgrade',
+        action='store_true',
+        help='Switch a build over the memory budget to lighter formulation options that solve the same problem'
+    )
+    parser.add_argument(
+        '--memory-limit',
+        default=None,
+        type=float,
+        help='Max estimated memory in bytes of the builds running in parallel with --jobs, the largest start first'
+    )
+    parser.add_argument(
+        '--estimate',
+        action='store_true',
+        help='Print the estimated size and peak build memory of every job as JSON lines, without building anything'
+    )
+    parser.add_argument(
+        '--instance-cache',
+        action='store_true',
+        help='Keep a binary copy of each parsed instance next to its file, so later runs skip the parsing'
+    )
+    parser.add_argument(
+        '--reference-cache',
+        default=None,
+        type=str,
+        help='Directory where the reference solves of oc in \'wsm\' and \'r-e\' modes are cached between runs'
+    )
+    parser.add_argument(
+        '--reference-cache-size',
+        default=1 << 30,
+        type=int,
+        help='Max size of the reference cache in bytes, the least recently used entries are evicted first'
+    )
+    parser.add_argument(
+        '--clear-reference-cache',
+        action='store_true',
+        help='Remove every entry of the reference cache before running'
+    )
+    parser.add_argument(
+        '--model-cache',
+        default=None,
+        type=str,
+        help='Directory where the built models are cached as MPS files, so later runs with the same instance and '
+             'build options read them instead of building them'
+    )
+    parser.add_argument(
+        '--model-cache-size',
+        default=1 << 32,
+        type=int,
+        help='Max size of the model cache in bytes, the least recently used entries are evicted first'
+    )
     parser.add_argument(
         '-a',
         '--alpha',
@@ -135,6 +507,85 @@ def get_cli_args():
         type=float,
         help='When \'r-e\' mode is selected, it will adjust the gap on the objective function result when it turns into a restriction'
     )
+    parser.add_argument(
+        '--pareto-solves',
+        default=20,
+        type=int,
+        help='When \'pareto\' mode is selected, the max number of solves spent on the front, at least 4'
+    )
+    parser.add_argument(
+        '--pareto-tolerance',
+        default=0.01,
+        type=float,
+        help='When \'pareto\' mode is selected, the smallest difference between two points of the front, relative '
+             'to the range of each objective'
+    )
+    parser.add_argument(
+        '--scenarios',
+        action='store_true',
+        help='When \'wsm\' mode is selected, solve every alpha in a single optimization, as the objective '
+             'scenarios of one multi-scenario model'
+    )
+    parser.add_argument(
+        '--no-warm-start',
+        action='store_true',
+        help='Solve every \'wsm\' alpha or \'r-e\' epsilon from scratch instead of starting from the previous one'
+    )
+    parser.add_argument(
+        '--heuristic-start',
+        action='store_true',
+        help='Seed the solver with a solution built by a constructive heuristic'
+    )
+    parser.add_argument(
+        '--alns-start',
+        action='store_true',
+        help='Seed the solver with the best solution of an adaptive large neighbourhood search'
+    )
+    parser.add_argument(
+        '--alns-iterations',
+        default=1000,
+        type=int,
+        help='Number of iterations of the adaptive large neighbourhood search, in alns mode and for --alns-start'
+    )
+    parser.add_argument(
+        '--alns-seed',
+        default=0,
+        type=int,
+        help='Seed of the random choices of the adaptive large neighbourhood search in alns mode'
+    )
+    parser.add_argument(
+        '--pool-solutions',
+        default=0,
+        type=int,
+        help='Keep up to this many solutions in the pool of every solve and write the oc and nv values of the '
+             'non-dominated ones as an approximate front, 0 disables it'
+    )
+    parser.add_argument(
+        '--profile-build',
+        action='store_true',
+        help='Print the time, rows, nonzeros and Python memory added by each constraint family of the model'
+    )
+    parser.add_argument(
+        '--telemetry',
+        default=None,
+        type=str,
+        help='Directory where the progress of every solve is streamed as JSON lines, one file per mode and instance'
+    )
+    parser.add_argument(
+        '--telemetry-interval',
+        default=1.0,
+        type=float,
+        help='Min amount of seconds between two progress events of the telemetry'
+    )
+    parser.add_argument(
+        '--updates',
+        default=[],
+        type=updates,
+        help='When \'single\' or \'multi\' mode is selected, JSON lines file of changes to the instance, such as '
+             '{"operation": "set_demand", "customer": 2, "pallets": 4}, each applied to the built model after the '
+             'previous solve and solved again from its solution. Every inbound load is shipped in full, so '
+             'remove_customer needs the "loads" of each product and supplier without the demand of the customer'
+    )
     parser.add_argument(
         'instances',
         nargs='+',
@@ -146,6 +597,7 @@ def get_cli_args():
 
 
 log_file_path: str = 'grbtune.log'
+UPDATE_OPERATIONS: List[str] = ['add_customer', 'remove_customer', 'set_demand', 'set_time_window', 'set_supplier_load']
 
 
 if __name__ == '__main__':